@@ -0,0 +1,146 @@
+"""Scaling of the CPACS generation with the fuselage resolution
+
+cpacs_generate (and its streaming mode) is timed for an increasing number of
+sections and profile points. A straight line is fitted to the run times for
+each number of profile points, its slope (time per section) and coefficient
+of determination show how linear the scaling is. The results are written as
+JSON.
+
+Usage (from the root of the repository)
+-----
+    python benchmarks/bench_generate_scaling.py
+    python benchmarks/bench_generate_scaling.py --sections 6 100 200 400 \
+        --points 82 328 --repeat 5 --output scaling.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import simplifiedgeometry as sg
+from ceasiompy.utils.ceasiomlogger import configure_logging
+
+DEFAULT_SECTIONS = [6, 25, 50, 100, 200, 400]
+DEFAULT_POINTS = [82, 328]
+FUSE_LENGTH = 40.0
+MODES = ['dom', 'stream']
+
+
+def time_generate(mode, num_sections, num_points, validation):
+    """Returns the run time [s] of one generation"""
+    start = time.perf_counter()
+    if mode == 'stream':
+        sg.cpacs_generate_stream('scaling', FUSE_LENGTH,
+                                 num_sections=num_sections,
+                                 num_points=num_points, validation=validation)
+    else:
+        sg.cpacs_generate('scaling', FUSE_LENGTH, num_sections=num_sections,
+                          num_points=num_points, validation=validation)
+    return time.perf_counter() - start
+
+
+def linear_fit(sections, times):
+    """Fits times = slope * sections + intercept
+
+    Returns
+    -------
+    fit : dict
+        Slope [s/section], intercept [s] and coefficient of determination
+    """
+    x = np.array(sections, dtype=float)
+    y = np.array(times)
+    slope, intercept = np.polyfit(x, y, 1)
+    residuals = y - (slope*x + intercept)
+    total = np.sum((y - y.mean())**2)
+    r2 = 1.0 - np.sum(residuals**2)/total if total > 0 else 1.0
+    return {'slope': slope, 'intercept': intercept, 'r2': r2}
+
+
+def run(sections, points, number, validation):
+    """Runs the benchmark and returns the results as a dictionary"""
+    # The profile and the schema are prepared once, as in a real study
+    for num_points in points:
+        sg.circle_profile_points(num_points)
+    if validation != 'skip':
+        sg.get_validator()
+
+    results = []
+    for mode in MODES:
+        for num_points in points:
+            medians = []
+            for num_sections in sections:
+                times = [time_generate(mode, num_sections, num_points,
+                                       validation)
+                         for _ in range(number)]
+                medians.append(statistics.median(times))
+                results.append({'mode': mode, 'sections': num_sections,
+                                'points': num_points, 'times': times,
+                                'min': min(times), 'median': medians[-1]})
+            fit = linear_fit(sections, medians)
+            print(f'{mode}, {num_points} points: '
+                  f'{1e3*fit["slope"]:.3f} ms/section, R2 = {fit["r2"]:.4f}',
+                  file=sys.stderr)
+            results.append({'mode': mode, 'points': num_points, 'fit': fit})
+
+    return {'meta': {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                     'python': platform.python_version(),
+                     'numpy': np.__version__,
+                     'platform': platform.platform(),
+                     'repeat': number, 'validation': validation},
+            'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sections', type=int, nargs='+',
+                        default=DEFAULT_SECTIONS,
+                        help='numbers of fuselage sections')
+    parser.add_argument('--points', type=int, nargs='+',
+                        default=DEFAULT_POINTS,
+                        help='numbers of profile points')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of runs of each generation')
+    parser.add_argument('--validation', default='skip',
+                        choices=['sync', 'skip'],
+                        help='schema validation of the generated files')
+    parser.add_argument('--output', default=None,
+                        help='JSON output file (default: standard output)')
+    parser.add_argument('--verbose', action='store_true',
+                        help='keep the log messages of the tool')
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        configure_logging(quiet=True)
+
+    output = os.path.abspath(args.output) if args.output else None
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix='cpacs_scaling_')
+    try:
+        os.chdir(work_dir)
+        report = run(args.sections, args.points, args.repeat,
+                     args.validation)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,379 @@
+"""Benchmark of the simplified geometry tool on synthetic CPACS models
+
+Fuselages made of a given number of sections (6, 50, 500 and 5000 by
+default) are generated with one or more wings, then the resizing and the
+geometry analysis are timed end to end and stage by stage. The results are
+written as JSON, so they can be compared between releases.
+
+Usage (from the root of the repository)
+-----
+    python benchmarks/bench_simplifiedgeometry.py
+    python benchmarks/bench_simplifiedgeometry.py --sections 6 50 \
+        --wings 1 3 --repeat 5 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import simplifiedgeometry as sg
+from ceasiompy.utils.ceasiomlogger import configure_logging
+from ceasiompy.utils.cpacsfunctions import CpacsSession, close_tixi, add_uid
+from ceasiompy.utils.cpacsfunctions import new_tixi
+from ceasiompy.utils.WB.ConvGeometry import geometry
+from ceasiompy.utils.WB.ConvGeometry.Fuselage.fusegeom import fuse_geom_eval
+from ceasiompy.utils.WB.ConvGeometry.Wings.winggeom import wing_geom_eval
+from ceasiompy.utils.InputClasses.Conventional.aircraftgeometryclass\
+    import AircraftGeometry
+
+DEFAULT_SECTIONS = [6, 50, 500, 5000]
+DEFAULT_WINGS = [1, 3]
+FUSE_LENGTH = 40.0
+MODEL_XPATH = '/cpacs/vehicles/aircraft/model'
+
+
+def build_model(path, num_sections, num_wings, fuse_length=FUSE_LENGTH):
+    """Writes a synthetic CPACS aircraft with a fuselage and wings
+
+    Parameters
+    ----------
+    path : str
+        Location of the CPACS file to be written
+    num_sections : int
+        Number of sections of the fuselage (at least 4)
+    num_wings : int
+        Number of wings, all symmetric about the x-z plane
+    fuse_length : float
+        Total length of the fuselage
+    """
+    tixi_handle = new_tixi()
+    tixi_handle.create('cpacs')
+    tixi_handle = sg.generate_cpacs_structure(tixi_handle, 'benchmark')
+    sg.check_resolution(num_sections, sg.NUM_PROFILE_POINTS)
+    tixi_handle = sg.build_fuselage(tixi_handle, fuse_length, 0.1, 0.1,
+                                    'Fuselage', num_sections)
+    for w in range(1, num_wings+1):
+        tixi_handle = build_wing(tixi_handle, w, num_wings, fuse_length)
+    close_tixi(tixi_handle, path)
+
+
+def build_wing(tixi_handle, wing_num, num_wings, fuse_length):
+    """Adds a trapezoidal wing of three sections and two segments
+
+    The first wing is the largest one, the next wings are smaller and
+    placed further aft along the fuselage.
+
+    Parameters
+    ----------
+    tixi_handle : tixi handle object
+        A tixi handle to the cpacs file to be created
+    wing_num : int
+        Index of the wing
+    num_wings : int
+        Total number of wings
+    fuse_length : float
+        Total length of the fuselage
+
+    Returns
+    -------
+    tixi_handle : tixi handle object
+    """
+    airfoil_id = add_symmetric_airfoil(tixi_handle)
+    wings_xpath = MODEL_XPATH + '/wings'
+    if not tixi_handle.checkElement(wings_xpath):
+        tixi_handle.createElement(MODEL_XPATH, 'wings')
+
+    name = f'Wing{wing_num}'
+    size = 1.0 / wing_num
+    root_chord = 0.2 * fuse_length * size
+    half_span = 0.5 * fuse_length * size
+    x_root = fuse_length * (0.35 + 0.55 * (wing_num-1) / num_wings)
+
+    tixi_handle.createElement(wings_xpath, 'wing')
+    wing_xpath = wings_xpath + f'/wing[{wing_num}]'
+    add_uid(tixi_handle, wing_xpath, name + 'ID')
+    tixi_handle.addTextAttribute(wing_xpath, 'symmetry', 'x-z-plane')
+    tixi_handle.addTextElement(wing_xpath, 'name', name)
+    add_transformation(tixi_handle, wing_xpath, name, (1.0, 1.0, 1.0),
+                       (x_root, 0.0, 0.0))
+
+    tixi_handle.createElement(wing_xpath, 'sections')
+    tixi_handle.createElement(wing_xpath, 'positionings')
+    tixi_handle.createElement(wing_xpath, 'segments')
+    chords = [root_chord, 0.6*root_chord, 0.3*root_chord]
+    lengths = [0.0, 0.4*half_span, 0.6*half_span]
+    for i in range(1, 4):
+        sec_xpath = wing_xpath + f'/sections/section[{i}]'
+        tixi_handle.createElement(wing_xpath + '/sections', 'section')
+        section_uid = f'{name}_section{i}ID'
+        add_uid(tixi_handle, sec_xpath, section_uid)
+        tixi_handle.addTextElement(sec_xpath, 'name', f'{name}_section{i}')
+        add_transformation(tixi_handle, sec_xpath, section_uid,
+                           (1.0, 1.0, 1.0), (0.0, 0.0, 0.0))
+        tixi_handle.createElement(sec_xpath, 'elements')
+        tixi_handle.createElement(sec_xpath + '/elements', 'element')
+        elem_xpath = sec_xpath + '/elements/element'
+        element_uid = f'{name}_section{i}_element1ID'
+        add_uid(tixi_handle, elem_xpath, element_uid)
+        tixi_handle.addTextElement(elem_xpath, 'name',
+                                   f'{name}_section{i}_element1')
+        tixi_handle.addTextElement(elem_xpath, 'airfoilUID', airfoil_id)
+        add_transformation(tixi_handle, elem_xpath, element_uid,
+                           (chords[i-1], 1.0, chords[i-1]), (0.0, 0.0, 0.0))
+
+        pos_xpath = wing_xpath + f'/positionings/positioning[{i}]'
+        tixi_handle.createElement(wing_xpath + '/positionings', 'positioning')
+        add_uid(tixi_handle, pos_xpath, f'{name}_positioning{i}ID')
+        tixi_handle.addTextElement(pos_xpath, 'name', f'{name}_positioning{i}')
+        tixi_handle.addDoubleElement(pos_xpath, 'length', lengths[i-1], '%g')
+        tixi_handle.addDoubleElement(pos_xpath, 'sweepAngle', 25, '%g')
+        tixi_handle.addDoubleElement(pos_xpath, 'dihedralAngle', 5, '%g')
+        if i > 1:
+            tixi_handle.addTextElement(pos_xpath, 'fromSectionUID',
+                                       f'{name}_section{i-1}ID')
+        tixi_handle.addTextElement(pos_xpath, 'toSectionUID', section_uid)
+
+        if i > 1:
+            seg_xpath = wing_xpath + f'/segments/segment[{i-1}]'
+            tixi_handle.createElement(wing_xpath + '/segments', 'segment')
+            add_uid(tixi_handle, seg_xpath, f'{name}_segment{i-1}ID')
+            tixi_handle.addTextElement(seg_xpath, 'name',
+                                       f'{name}_segment{i-1}')
+            tixi_handle.addTextElement(seg_xpath, 'fromElementUID',
+                                       previous_element)
+            tixi_handle.addTextElement(seg_xpath, 'toElementUID', element_uid)
+        previous_element = element_uid
+
+    return tixi_handle
+
+
+def add_transformation(tixi_handle, xpath, uid, scaling, translation):
+    """Adds a transformation with the given scaling and translation"""
+    tixi_handle.createElement(xpath, 'transformation')
+    xpath += '/transformation'
+    add_uid(tixi_handle, xpath, uid + '_transformation1')
+    values = {'scaling': scaling, 'rotation': (0.0, 0.0, 0.0),
+              'translation': translation}
+    for name in ['scaling', 'rotation', 'translation']:
+        tixi_handle.createElement(xpath, name)
+        if name == 'translation':
+            tixi_handle.addTextAttribute(f'{xpath}/{name}', 'refType',
+                                         'absLocal')
+        add_uid(tixi_handle, f'{xpath}/{name}',
+                f'{uid}_transformation1_{name}1')
+        for axis, value in zip('xyz', values[name]):
+            tixi_handle.addDoubleElement(f'{xpath}/{name}', axis, value,
+                                         '%g')
+
+
+def add_symmetric_airfoil(tixi_handle):
+    """Adds a NACA 0012 airfoil (once) and returns its uID"""
+    airfoil_id = 'NACA0012ID'
+    profiles_xpath = '/cpacs/vehicles/profiles'
+    airfoils_xpath = profiles_xpath + '/wingAirfoils'
+    if tixi_handle.checkElement(airfoils_xpath):
+        return airfoil_id
+
+    tixi_handle.createElement(profiles_xpath, 'wingAirfoils')
+    tixi_handle.createElement(airfoils_xpath, 'wingAirfoil')
+    xpath = airfoils_xpath + '/wingAirfoil'
+    add_uid(tixi_handle, xpath, airfoil_id)
+    tixi_handle.addTextElement(xpath, 'name', 'NACA0012')
+    tixi_handle.createElement(xpath, 'pointList')
+
+    # From the trailing edge along the upper side, back along the lower side
+    x = (1 - np.cos(np.linspace(0.0, np.pi, 41))) / 2
+    z = 0.6 * (0.2969*np.sqrt(x) - 0.1260*x - 0.3516*x**2 + 0.2843*x**3
+               - 0.1036*x**4)
+    x_vec = np.concatenate((x[::-1], x[1:]))
+    z_vec = np.concatenate((z[::-1], -z[1:]))
+    y_vec = np.zeros(len(x_vec))
+    for name, vec in zip('xyz', (x_vec, y_vec, z_vec)):
+        tixi_handle.addFloatVector(xpath + '/pointList', name, list(vec),
+                                   len(vec), '%.8f')
+
+    return airfoil_id
+
+
+def time_call(function, *args, **kwargs):
+    """Returns the value returned by function and its run time [s]"""
+    start = time.perf_counter()
+    value = function(*args, **kwargs)
+    return value, time.perf_counter() - start
+
+
+def bench_transformer(path, out_path, fuse_length):
+    """Times the resizing of a CPACS file, end to end and per stage
+
+    Returns
+    -------
+    times : dict
+        Run time [s] of each stage
+    """
+    times = {}
+    _, times['transformer'] = time_call(
+        sg.transformer, path, out_path, {'fuse_length': fuse_length})
+
+    session, times['open'] = time_call(CpacsSession, path)
+    (length, sec_uids), times['fuselage_reference'] = time_call(
+        sg.fuselage_reference, session)
+    scale = fuse_length / length
+    _, times['section_transformer'] = time_call(
+        sg.section_transformer, session.tixi, scale, sec_uids)
+    _, times['positioning_transformer'] = time_call(
+        sg.positioning_transformer, session.tixi, scale)
+    _, times['save'] = time_call(session.close, out_path)
+
+    return times
+
+
+def bench_geometry_eval(path):
+    """Times the TiGL geometry analysis, end to end and per stage
+
+    Returns
+    -------
+    times : dict
+        Run time [s] of each stage
+    """
+    times = {}
+    _, times['geometry_eval'] = time_call(
+        geometry.geometry_eval, path, 'benchmark', use_cache=False)
+
+    session, times['open'] = time_call(CpacsSession, path, read_only=True)
+    _, times['tigl_open'] = time_call(getattr, session, 'tigl')
+    ag, times['fuse_geom_eval'] = time_call(
+        fuse_geom_eval, AircraftGeometry(), path, session)
+    _, times['wing_geom_eval'] = time_call(wing_geom_eval, ag, path, session)
+    session.close()
+
+    return times
+
+
+def bench_cpacs_generate():
+    """Times cpacs_generate, the file is written in the current directory
+
+    Returns
+    -------
+    times : dict
+        Run time [s] of each stage
+    """
+    times = {}
+    _, times['cpacs_generate'] = time_call(
+        sg.cpacs_generate, 'benchmark_generate', FUSE_LENGTH)
+
+    return times
+
+
+def repeat(function, args, number):
+    """Runs a benchmark function several times
+
+    Returns
+    -------
+    stats : dict
+        For each stage, the run times [s] and their minimum and median
+    """
+    runs = [function(*args) for _ in range(number)]
+    stats = {}
+    for stage in runs[0]:
+        times = [run[stage] for run in runs]
+        stats[stage] = {'times': times, 'min': min(times),
+                        'median': statistics.median(times)}
+    return stats
+
+
+def run(sections, wings, number, max_tigl_sections):
+    """Runs all the benchmarks and returns the results as a dictionary"""
+    results = []
+    results.append({'benchmark': 'cpacs_generate', 'sections': 6,
+                    'wings': 0,
+                    'stages': repeat(bench_cpacs_generate, (), number)})
+
+    for num_sections in sections:
+        for num_wings in wings:
+            path = os.path.abspath(f'model_{num_sections}_{num_wings}.xml')
+            out_path = os.path.abspath(f'out_{num_sections}_{num_wings}.xml')
+            _, build_time = time_call(build_model, path, num_sections,
+                                      num_wings)
+            print(f'{num_sections} sections, {num_wings} wing(s): model '
+                  f'built in {build_time:.3f} s', file=sys.stderr)
+            results.append({'benchmark': 'build_model',
+                            'sections': num_sections, 'wings': num_wings,
+                            'stages': {'build_model': {
+                                'times': [build_time], 'min': build_time,
+                                'median': build_time}}})
+
+            results.append({'benchmark': 'transformer',
+                            'sections': num_sections, 'wings': num_wings,
+                            'stages': repeat(bench_transformer,
+                                             (path, out_path, 30.0), number)})
+
+            if num_sections > max_tigl_sections:
+                results.append({'benchmark': 'geometry_eval',
+                                'sections': num_sections,
+                                'wings': num_wings, 'skipped': True})
+                continue
+            results.append({'benchmark': 'geometry_eval',
+                            'sections': num_sections, 'wings': num_wings,
+                            'stages': repeat(bench_geometry_eval, (path,),
+                                             number)})
+
+    return {'meta': {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                     'python': platform.python_version(),
+                     'numpy': np.__version__,
+                     'platform': platform.platform(),
+                     'repeat': number},
+            'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sections', type=int, nargs='+',
+                        default=DEFAULT_SECTIONS,
+                        help='numbers of fuselage sections')
+    parser.add_argument('--wings', type=int, nargs='+', default=DEFAULT_WINGS,
+                        help='numbers of wings')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of runs of each benchmark')
+    parser.add_argument('--max-tigl-sections', type=int, default=500,
+                        help='largest fuselage analysed with TiGL')
+    parser.add_argument('--output', default=None,
+                        help='JSON output file (default: standard output)')
+    parser.add_argument('--verbose', action='store_true',
+                        help='keep the log messages of the tool')
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        configure_logging(quiet=True)
+
+    output = os.path.abspath(args.output) if args.output else None
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix='cpacs_bench_')
+    try:
+        os.chdir(work_dir)
+        report = run(args.sections, args.wings, args.repeat,
+                     args.max_tigl_sections)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -17,15 +17,14 @@ weight and Balance analysis.
 #   IMPORTS
 #=============================================================================
 
-
-""" No Inports Required """
+from ceasiompy.utils.InputClasses.geometrystorageclass import GeometryStorage
 
 
 #=============================================================================
 #   CLASSES
 #=============================================================================
 
-class AircraftGeometry:
+class AircraftGeometry(GeometryStorage):
     """
     The class contains all the information about the geometry of
     the aircraft analyzed.
@@ -57,7 +56,9 @@ class AircraftGeometry:
     (float_array) fuse_nose_length  --Att.: Length of each fuselage nose [m].
     (float_array) fuse_cabin_length --Att.: Length of each fuselage cabin [m].
     (float_array) fuse_tail_length  --Att.: Length of each fuselage tail [m].
-    (float_array) fuse_mean_width   --Att.: Mean fuselage width [m].
+    (float) fuse_mean_width         --Att.: Mean width of the main (first)
+                                            fuselage [m].
+    (float_array) fuse_mean_widths  --Att.: Mean width of each fuselage [m].
     (floar_array) fuse_center_seg_point --Att.: 3D array containing the
                                                 position of the point
                                                 at the center of each segment
@@ -114,8 +115,41 @@ class AircraftGeometry:
     (boolean_array) is_horiz --Att.: Define if a wing is horizontal [-].
     METHODS
     Name            Description
+    compact         Convert the lists to numpy arrays.
+    ragged          Return a padded array as a RaggedArray.
+    to_npz          Export the attributes to a .npz file.
+    from_npz        Build an AircraftGeometry from a .npz file.
     """
 
+    # The attributes are fixed, no __dict__ is allocated for each object
+    __slots__ = ('tot_length',
+                 'fus_nb', 'fuse_nb', 'fuse_sym', 'fuse_sec_nb', 'fuse_seg_nb',
+                 'fuse_seg_index', 'cabin_nb', 'cabin_seg', 'fuse_length',
+                 'fuse_sec_circ', 'fuse_sec_width', 'fuse_sec_abs_dist',
+                 'fuse_sec_rel_dist', 'fuse_seg_length', 'fuse_nose_length',
+                 'fuse_cabin_length', 'fuse_tail_length', 'fuse_mean_width',
+                 'fuse_mean_widths',
+                 'fuse_center_seg_point', 'fuse_center_sec_point',
+                 'fuse_seg_vol', 'fuse_cabin_vol', 'fuse_vol', 'f_seg_sec',
+                 'w_nb', 'wing_nb', 'main_wing_index', 'wing_sym',
+                 'wing_sec_nb', 'wing_seg_nb', 'wing_span', 'wing_seg_length',
+                 'wing_sec_thicknes', 'wing_sec_mean_thick', 'wing_max_chord',
+                 'wing_min_chord', 'wing_mac', 'wing_center_seg_point',
+                 'wing_plt_area', 'wing_plt_area_main', 'wing_seg_vol',
+                 'wing_vol', 'wing_tot_vol', 'wing_fuel_vol',
+                 'wing_fuel_seg_vol', 'w_seg_sec', 'is_horiz')
+
+    # Padded arrays with one column per fuselage (or wing, without symmetry)
+    _RAGGED = {'fuse_sec_circ': 'fuse_sec_nb',
+               'fuse_sec_width': 'fuse_sec_nb',
+               'fuse_sec_rel_dist': 'fuse_sec_nb',
+               'fuse_seg_index': 'fuse_sec_nb',
+               'fuse_seg_length': 'fuse_seg_nb',
+               'fuse_seg_vol': 'fuse_seg_nb',
+               'cabin_seg': 'fuse_seg_nb',
+               'wing_seg_vol': 'wing_seg_nb',
+               'wing_fuel_seg_vol': 'wing_seg_nb'}
+
     def __init__(self):
         # General
         self.tot_length = 0
@@ -133,11 +167,13 @@ class AircraftGeometry:
         self.fuse_sec_circ = 0
         self.fuse_sec_width = 0
         self.fuse_sec_abs_dist = 0
+        self.fuse_sec_rel_dist = 0
         self.fuse_seg_length = 0
         self.fuse_nose_length = []
         self.fuse_cabin_length = []
         self.fuse_tail_length = []
-        self.fuse_mean_width = []
+        self.fuse_mean_width = 0
+        self.fuse_mean_widths = []
         self.fuse_center_seg_point = 0  # Balance Analysis Only
         self.fuse_center_sec_point = 0  # Balance Analysis Only
         self.fuse_seg_vol = 0
@@ -23,9 +23,9 @@ TODO:
 
 from ceasiompy.utils.ceasiomlogger import get_logger
 
-from ceasiompy.utils.cpacsfunctions import open_tixi, close_tixi,add_uid, \
-                                           create_branch, get_value,      \
-                                           get_value_or_default
+from ceasiompy.utils.cpacsfunctions import open_tixi, close_tixi_readonly,\
+                                           add_uid, create_branch,        \
+                                           get_value, get_value_or_default
 
 
 log = get_logger(__file__.split('.')[0])
@@ -94,6 +94,7 @@ class UserInputs:
 
         The function 'get_user_inputs' extracts from the CPACS file the required
         input data, the code will use the default value when they are missing.
+        The CPACS file itself is not modified.
 
         Args:
             cpacs_path (str): Path to CPACS file
@@ -124,7 +125,7 @@ class UserInputs:
 
         add_uid(tixi, F_XPATH, 'kerosene')
 
-        close_tixi(tixi, cpacs_path)
+        close_tixi_readonly(tixi)
 
 
 class InsideDimensions:
@@ -181,7 +182,7 @@ class InsideDimensions:
 
         The function 'get_inside_dim' extracts from the CPACS file the required
         aircraft inside dimension, the code will use the default value when they are
-        missing.
+        missing. The CPACS file itself is not modified.
 
         Args:
             cpacs_path (str): Path to CPACS file
@@ -197,7 +198,7 @@ class InsideDimensions:
         self.fuse_thick = get_value_or_default(tixi,GEOM_XPATH+'/fuseThick',6.63)
         self.toilet_length = get_value_or_default(tixi,GEOM_XPATH+'/toiletLength',self.toilet_length)
 
-        close_tixi(tixi, cpacs_path)
+        close_tixi_readonly(tixi)
 
 class MassesWeights:
     """
@@ -18,14 +18,14 @@ Python version: >=3.6
 #   IMPORTS
 #=============================================================================
 
-""" No import """
+from ceasiompy.utils.InputClasses.geometrystorageclass import GeometryStorage
 
 
 #=============================================================================
 #   CLASSES
 #=============================================================================
 
-class AircraftWingGeometry:
+class AircraftWingGeometry(GeometryStorage):
     """
     The class contains all the geometry information extracted for the wings.
 
@@ -54,6 +54,8 @@ class AircraftWingGeometry:
         tail_wings_surface (float_array): Wetted surface area of the tail wings. [m^2]
         total_wings_surface (float): Wings wetted area total [m^2].
         wing_seg_vol (float_array): Wing segments volume [m^3].
+        wing_fuel_seg_vol (float_array): Wing segments volume available for
+                                         fuel storage [m^3].
         wing_vol (float_array): Volume of each wing [m^3].
         wing_tot_vol (float): Total wing volume [m^3].
         w_seg_sec (float_array): Reordered segments with respective start and
@@ -70,6 +72,21 @@ class AircraftWingGeometry:
 
     """
 
+    # The attributes are fixed, no __dict__ is allocated for each object
+    __slots__ = ('is_horiz', 'w_nb', 'wing_nb', 'main_wing_index', 'wing_sym',
+                 'wing_sec_nb', 'wing_seg_nb', 'wing_span', 'wing_seg_length',
+                 'wing_sec_thicknes', 'wing_sec_mean_thick', 'wing_max_chord',
+                 'wing_min_chord', 'wing_mac', 'wing_center_seg_point',
+                 'wing_plt_area', 'wing_plt_area_main', 'main_wing_surface',
+                 'tail_wings_surface', 'total_wings_surface', 'wing_seg_vol',
+                 'wing_fuel_seg_vol', 'wing_vol', 'wing_tot_vol', 'w_seg_sec',
+                 'cabin_span', 'y_max_cabin', 'cabin_area', 'fuse_vol',
+                 'cabin_vol', 'fuse_fuel_vol', 'wing_fuel_vol', 'fuel_vol_tot')
+
+    # Padded arrays with one column per wing (without symmetry)
+    _RAGGED = {'wing_seg_vol': 'wing_seg_nb',
+               'wing_fuel_seg_vol': 'wing_seg_nb'}
+
     def __init__(self):
         self.is_horiz = []
         self.w_nb = 0
@@ -92,6 +109,7 @@ class AircraftWingGeometry:
         self.tail_wings_surface = []
         self.total_wings_surface = 0
         self.wing_seg_vol = 0
+        self.wing_fuel_seg_vol = 0
         self.wing_vol = []
         self.wing_tot_vol = 0
         self.w_seg_sec = 0
@@ -107,7 +125,7 @@ class AircraftWingGeometry:
         self.fuel_vol_tot = 0
 
 
-class AircraftFuseGeometry:
+class AircraftFuseGeometry(GeometryStorage):
     """
     The class contains all the geometry information extracted for the fuselage.
 
@@ -147,9 +165,36 @@ class AircraftFuseGeometry:
         fuse_vol (float_array): Fuselage volume [m^3].
         f_seg_sec (float_array): Reordered segments with respective start
                                      and end sections for each fuselage.
+        fuse_sec_height (float_array): Height of fuselage sections [m].
+        fuse_center_section_point (float_array): 3D array containing the
+                                                 position of the point at the
+                                                 center of each section of
+                                                 each fuselage [m,m,m].
+        cabin_length (float_array): Length of the cabin of each fuselage [m].
 
     """
 
+    # The attributes are fixed, no __dict__ is allocated for each object
+    __slots__ = ('tot_length', 'fus_nb', 'fuse_nb', 'fuse_sym', 'fuse_sec_nb',
+                 'fuse_seg_nb', 'fuse_seg_index', 'cabin_nb', 'cabin_seg',
+                 'fuse_length', 'fuse_sec_per', 'fuse_sec_width',
+                 'fuse_sec_height', 'fuse_sec_abs_dist', 'fuse_seg_length',
+                 'fuse_sec_rel_dist', 'fuse_nose_length', 'fuse_cabin_length',
+                 'fuse_tail_length', 'fuse_mean_width', 'fuse_center_seg_point',
+                 'fuse_center_sec_point', 'fuse_center_section_point',
+                 'cabin_area', 'cabin_length', 'fuse_surface', 'fuse_seg_vol',
+                 'fuse_cabin_vol', 'fuse_fuel_vol', 'fuse_vol', 'f_seg_sec')
+
+    # Padded arrays with one column per fuselage (without symmetry)
+    _RAGGED = {'fuse_sec_per': 'fuse_sec_nb',
+               'fuse_sec_width': 'fuse_sec_nb',
+               'fuse_sec_height': 'fuse_sec_nb',
+               'fuse_sec_rel_dist': 'fuse_sec_nb',
+               'fuse_seg_index': 'fuse_sec_nb',
+               'fuse_seg_length': 'fuse_seg_nb',
+               'fuse_seg_vol': 'fuse_seg_nb',
+               'cabin_seg': 'fuse_seg_nb'}
+
     def __init__(self, fus_nb):
 
         self.tot_length = 0
@@ -164,6 +209,7 @@ class AircraftFuseGeometry:
         self.fuse_length = []
         self.fuse_sec_per = 0
         self.fuse_sec_width = 0
+        self.fuse_sec_height = 0
         self.fuse_sec_abs_dist = 0
         self.fuse_seg_length = 0
         self.fuse_sec_rel_dist = 0
@@ -174,7 +220,9 @@ class AircraftFuseGeometry:
         self.fuse_mean_width = []
         self.fuse_center_seg_point = 0
         self.fuse_center_sec_point = 0
+        self.fuse_center_section_point = 0
         self.cabin_area = 0
+        self.cabin_length = 0
         self.fuse_surface = []
         self.fuse_seg_vol = 0
         self.fuse_cabin_vol = []
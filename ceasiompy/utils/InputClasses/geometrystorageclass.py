@@ -0,0 +1,257 @@
+"""
+CEASIOMpy: Conceptual Aircraft Design Software
+
+Developed for CFS ENGINEERING, 1015 Lausanne, Switzerland
+
+Compact storage of the aircraft geometry classes. The geometry classes
+declare their attributes in '__slots__' and share the methods of
+'GeometryStorage' to convert their lists to numpy arrays, to get their
+padded arrays as ragged arrays and to export them to .npz files.
+
+Python version: >=3.6
+
+| Author : CEASIOMpy contributors
+| Creation: 2026-10-18
+| Last modifiction: 2026-10-18
+
+"""
+
+#=============================================================================
+#   IMPORTS
+#=============================================================================
+
+import numpy as np
+
+
+#=============================================================================
+#   CLASSES
+#=============================================================================
+
+class RaggedArray:
+    """
+    The class contains the values of several parts (fuselages or wings)
+    which have not the same number of values (sections or segments).
+
+    The values of all the parts are stored one after the other in a single
+    array, the values of the part i are data[offsets[i]:offsets[i+1]].
+
+    Attributes:
+        data (ndarray): Values of all the parts, the first axis is the one
+                        of the values, the others are the ones of each value
+                        (e.g. x,y,z coordinates).
+        offsets (int_array): Start index of each part in data, followed by
+                             the total number of values.
+
+    """
+
+    __slots__ = ('data', 'offsets')
+
+    def __init__(self, data, offsets):
+        self.data = np.asarray(data)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+    @classmethod
+    def from_padded(cls, padded, counts):
+        """ Build the ragged array of an array padded with one column per part.
+
+        Args:
+            padded (ndarray): Array of shape (max count, part number, ...)
+            counts (int_array): Number of values of each part
+
+        Returns:
+            ragged (RaggedArray): Ragged array of the values of each part
+        """
+
+        padded = np.asarray(padded)
+        counts = np.minimum(np.asarray(counts, dtype=np.int64).reshape(-1),
+                            np.shape(padded)[0])
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        if len(counts) == 0:
+            return cls(np.zeros((0,) + padded.shape[2:], dtype=padded.dtype),
+                       offsets)
+        data = np.concatenate([padded[:c,i] for (i,c) in enumerate(counts)])
+        return cls(data, offsets)
+
+    @classmethod
+    def from_list(cls, arrays):
+        """ Build the ragged array of a list with the values of each part. """
+
+        arrays = [np.asarray(array) for array in arrays]
+        offsets = np.concatenate(([0], np.cumsum([len(a) for a in arrays],
+                                                 dtype=np.int64)))
+        if not arrays:
+            return cls(np.zeros(0), offsets)
+        return cls(np.concatenate(arrays), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        """ Return the values of the part i (a view of data). """
+
+        n = len(self)
+        if not -n <= i < n:
+            raise IndexError('Part index ' + str(i) + ' out of range for '
+                             + str(n) + ' parts')
+        if i < 0:
+            i += n
+        return self.data[self.offsets[i]:self.offsets[i+1]]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def counts(self):
+        """ Number of values of each part. """
+
+        return np.diff(self.offsets)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.offsets.nbytes
+
+    def to_padded(self, rows=None):
+        """ Return the array padded with zeros, with one column per part.
+
+        Args:
+            rows (int): Number of rows, the largest count if None
+
+        Returns:
+            padded (ndarray): Array of shape (rows, part number, ...)
+        """
+
+        if rows is None:
+            rows = int(np.amax(self.counts, initial=0))
+        padded = np.zeros((rows, len(self)) + self.data.shape[1:],
+                          dtype=self.data.dtype)
+        for (i, values) in enumerate(self):
+            padded[:len(values),i] = values
+        return padded
+
+
+class GeometryStorage:
+    """
+    The class contains the storage methods shared by the geometry classes.
+
+    A geometry class declares its attributes in '__slots__' and the padded
+    arrays which can be stored as ragged arrays in '_RAGGED', as a dict
+    {attribute name: name of the attribute with the number of rows of each
+    column}.
+
+    """
+
+    __slots__ = ()
+
+    _RAGGED = {}
+
+    def compact(self):
+        """ Convert the lists of values to numpy arrays (fixed dtype).
+
+        The lists are grown with 'append' during the geometry evaluation,
+        they are converted once the evaluation is done. Lists which are not
+        made of values of the same shape are kept.
+
+        Returns:
+            self
+        """
+
+        for name in self._slot_names():
+            value = getattr(self, name, None)
+            if isinstance(value, list):
+                try:
+                    array = np.asarray(value)
+                except ValueError:
+                    continue
+                if array.dtype != object:
+                    setattr(self, name, array)
+        return self
+
+    def ragged(self, name):
+        """ Return a padded array attribute as a RaggedArray.
+
+        Args:
+            name (str): Name of the attribute, one of '_RAGGED'
+
+        Returns:
+            ragged (RaggedArray): Values of each fuselage or wing
+        """
+
+        return RaggedArray.from_padded(getattr(self, name),
+                                       getattr(self, self._RAGGED[name]))
+
+    def to_npz(self, path, compressed=False):
+        """ Export the attributes to a .npz file.
+
+        The numpy arrays are written from their own memory, without copy.
+        The arrays of '_RAGGED' are written as ragged arrays, in the entries
+        'name.data', 'name.offsets' and 'name.shape'.
+
+        Args:
+            path (str): Path of the .npz file
+            compressed (bool): If True the file is compressed
+        """
+
+        arrays = {}
+        for name in self._slot_names():
+            if not hasattr(self, name):
+                continue
+            value = getattr(self, name)
+            if name in self._RAGGED and np.ndim(value) >= 2:
+                ragged = self.ragged(name)
+                arrays[name + '.data'] = ragged.data
+                arrays[name + '.offsets'] = ragged.offsets
+                arrays[name + '.shape'] = np.shape(value)
+            else:
+                arrays[name] = np.asarray(value)
+
+        if compressed:
+            np.savez_compressed(path, **arrays)
+        else:
+            np.savez(path, **arrays)
+
+    @classmethod
+    def from_npz(cls, path):
+        """ Build a geometry object from a .npz file written by 'to_npz'.
+
+        The lists are read as numpy arrays.
+
+        Args:
+            path (str): Path of the .npz file
+
+        Returns:
+            geometry: Object of the class with the attributes of the file
+        """
+
+        geometry = cls.__new__(cls)
+        with np.load(path) as npz:
+            for name in npz.files:
+                if name.endswith('.data'):
+                    name = name[:-len('.data')]
+                    ragged = RaggedArray(npz[name + '.data'],
+                                         npz[name + '.offsets'])
+                    rows = int(npz[name + '.shape'][0])
+                    setattr(geometry, name, ragged.to_padded(rows))
+                elif '.' not in name:
+                    value = npz[name]
+                    if value.ndim == 0:
+                        value = value.item()
+                    setattr(geometry, name, value)
+        return geometry
+
+    @classmethod
+    def _slot_names(cls):
+        """ Return the attribute names declared by the class and its bases. """
+
+        names = []
+        for klass in reversed(cls.__mro__):
+            names.extend(getattr(klass, '__slots__', ()))
+        return names
+
+
+#=============================================================================
+#    MAIN
+#=============================================================================
+
+if __name__ == '__main__':
+
+    print('Nothing to execute!')
@@ -18,10 +18,16 @@ This file will analyse the fuselage geometry from cpacs file.
 
 import numpy as np
 import math
+from concurrent.futures import ProcessPoolExecutor
 
 from ceasiompy.utils.ceasiomlogger import get_logger
+from ceasiompy.utils.profiling import profiled
 
-from ceasiompy.utils.cpacsfunctions import open_tixi, open_tigl, close_tixi
+from ceasiompy.utils.cpacsfunctions import CpacsSession
+from ceasiompy.utils.WB.geometryfunctions import section_half_widths,\
+                                                 order_segments,\
+                                                 cabin_width_factor,\
+                                                 SYMMETRY_FACTORS
 
 log = get_logger(__file__.split('.')[0])
 
@@ -37,6 +43,7 @@ log = get_logger(__file__.split('.')[0])
 #   FUNCTIONS
 #==============================================================================
 
+@profiled()
 def check_segment_connection(fus_nb, fuse_seg_nb, fuse_sec_nb, tigl):
     """ The function checks for each segment the start and end section index
         and it reorders them.
@@ -65,7 +72,6 @@ def check_segment_connection(fus_nb, fuse_seg_nb, fuse_sec_nb, tigl):
     seg_sec = np.zeros((nbmax,fus_nb,3))
     seg_sec_reordered = np.zeros(np.shape(seg_sec))
     sec_index = np.zeros((nbmax,fus_nb))
-    fuse_sec_index = []
     start_index = []
     sec_nb = []
 
@@ -76,42 +82,35 @@ def check_segment_connection(fus_nb, fuse_seg_nb, fuse_sec_nb, tigl):
     # The code works if a section is defined and not used in the segment
     # definition and if the segments are not defined
     # with a significant order.
-    # WARNING The code does not work if a segment is defined
-    #         and then not used.
-    #         The aircraft should be designed along the x-axis
+    # A segment defined and then not used is reported (order_segments).
+    # WARNING The aircraft should be designed along the x-axis
     #         and on the x-y plane
 
-    for j in range(1,fuse_seg_nb[fus_nb-1]+1):
-        (s0,e) = tigl.fuselageGetStartSectionAndElementIndex(fus_nb,j)
-        (s1,e) = tigl.fuselageGetEndSectionAndElementIndex(fus_nb,j)
-        seg_sec[j-1,fus_nb-1,0] = s0
-        seg_sec[j-1,fus_nb-1,1] = s1
-        seg_sec[j-1,fus_nb-1,2] = j
-    (slpx,slpy,slpz) = tigl.fuselageGetPoint(fus_nb,1,0.0,0.0)
-    seg_sec_reordered[0,fus_nb-1,:] = seg_sec[0,fus_nb-1,:]
-    start_index.append(1)
-    for j in range(2,fuse_seg_nb[fus_nb-1]+1):
-        (x,y,z) = tigl.fuselageGetPoint(fus_nb,j,1.0,0.0)
-        if x < slpx:
-            (slpx,slpy,slpz) = (x,y,z)
-            start_index.append(j)
-            seg_sec_reordered[0,fus_nb-1,:] = seg_sec[j-1,fus_nb-1,:]
-    for j in range(2,fuse_seg_nb[fus_nb-1]+1):
-        end_sec = seg_sec_reordered[j-2,fus_nb-1,1]
-        start_next = np.where(seg_sec[:,fus_nb-1,0]==end_sec)
-        seg_sec_reordered[j-1,fus_nb-1,:] = seg_sec[start_next[0],:]
-    fuse_sec_index.append(seg_sec[0,0,0])
-    for j in range(2,fuse_seg_nb[fus_nb-1]+1):
-         if (seg_sec_reordered[j-1,fus_nb-1,0] in fuse_sec_index) == False:
-            fuse_sec_index.append(seg_sec_reordered[j-1,fus_nb-1,0])
-    if (seg_sec_reordered[j-1,fus_nb-1,1] in fuse_sec_index) == False:
-        fuse_sec_index.append(seg_sec_reordered[j-1,fus_nb-1,1])
-    nb = np.shape(fuse_sec_index)
-    if nb[0] > nbmax:
-        nbmax = nb[0]
-    sec_index.resize(nbmax,fus_nb)
-    sec_index[0:nb[0],fus_nb-1] = fuse_sec_index[0:nb[0]]
-    sec_nb.append(nb[0])
+    for i in range(1,fus_nb+1):
+        for j in range(1,fuse_seg_nb[i-1]+1):
+            (s0,e) = tigl.fuselageGetStartSectionAndElementIndex(i,j)
+            (s1,e) = tigl.fuselageGetEndSectionAndElementIndex(i,j)
+            seg_sec[j-1,i-1,0] = s0
+            seg_sec[j-1,i-1,1] = s1
+            seg_sec[j-1,i-1,2] = j
+        (slpx,slpy,slpz) = tigl.fuselageGetPoint(i,1,0.0,0.0)
+        first_seg = 0
+        for j in range(2,fuse_seg_nb[i-1]+1):
+            (x,y,z) = tigl.fuselageGetPoint(i,j,1.0,0.0)
+            if x < slpx:
+                (slpx,slpy,slpz) = (x,y,z)
+                first_seg = j-1
+        # One start segment per fuselage
+        start_index.append(first_seg+1)
+        (seg_ordered, fuse_sec_index) = order_segments(
+            seg_sec[0:fuse_seg_nb[i-1],i-1,:], first_seg)
+        seg_sec_reordered[0:fuse_seg_nb[i-1],i-1,:] = seg_ordered
+        nb = np.shape(fuse_sec_index)
+        if nb[0] > nbmax:
+            nbmax = nb[0]
+            sec_index.resize(nbmax,fus_nb)
+        sec_index[0:nb[0],i-1] = fuse_sec_index[0:nb[0]]
+        sec_nb.append(nb[0])
 
     return(sec_nb, start_index, seg_sec_reordered, sec_index)
 
@@ -119,6 +118,7 @@ def check_segment_connection(fus_nb, fuse_seg_nb, fuse_sec_nb, tigl):
 # -----------------------------------------------------------------------------
 # -----------------------------------------------------------------------------
 
+@profiled()
 def rel_dist(fus_nb, sec_nb, seg_nb, tigl, seg_sec, start_index):
     """ The function evaluates the relative distance of each section
         used from the start section.
@@ -166,13 +166,158 @@ def rel_dist(fus_nb, sec_nb, seg_nb, tigl, seg_sec, start_index):
 # -----------------------------------------------------------------------------
 # -----------------------------------------------------------------------------
 
-def fuse_geom_eval(ag, cpacs_in):
+@profiled()
+def fuselage_eval(tigl, i, sec_nb, seg_nb, seg_sec, start_index):
+    """ The function evaluates the sections and segments of one fuselage.
+
+    ARGUMENTS
+    (char) tigl         -- Arg.: Tigl handle.
+    (int) i             -- Arg.: Index of the fuselage (from 1).
+    (int) sec_nb        -- Arg.: Number of sections of the fuselage.
+    (int) seg_nb        -- Arg.: Number of segments of the fuselage.
+    (float-array) seg_sec -- Arg.: Reordered segments with respective start
+                                   and end section of the fuselage.
+    (int) start_index   -- Arg.: Start segment index of the fuselage.
+
+    RETURN
+    (float-array) sec_rel_dist  --Out.: Relative distance of each section [m].
+    (float-array) seg_index     --Out.: Segment index of each section.
+    (float-array) sec_circ      --Out.: Circumference of each section [m].
+    (float-array) sec_width     --Out.: Width of each section [m].
+    (float-array) seg_vol       --Out.: Volume of each segment [m^3].
+    (float-array) seg_length    --Out.: Length of each segment [m].
+    (float-array) center_sec_point --Out.: Center point of each section [m].
+    """
+
+    (sec_rel_dist, seg_index)\
+        = rel_dist(i, sec_nb, seg_nb, tigl, seg_sec, start_index)
+    sec_circ = np.zeros(sec_nb)
+    sec_width = np.zeros(sec_nb)
+    seg_vol = np.zeros(seg_nb)
+    seg_length = np.zeros(seg_nb)
+    center_sec_point = np.zeros((sec_nb,3))
+
+    # Section 0 is the start of the first segment, section j the end of the
+    # jth segment
+    sec_seg = [(int(seg_index[1]),0.0)]\
+              + [(int(seg_index[j]),1.0) for j in range(1,seg_nb+1)]
+    for (j,(k,eta)) in enumerate(sec_seg):
+        sec_circ[j] = tigl.fuselageGetCircumference(i,k,eta)
+        p1 = tigl.fuselageGetPoint(i,k,eta,0.0)
+        p2 = tigl.fuselageGetPoint(i,k,eta,0.5)
+        center_sec_point[j] = (np.array(p1) + np.array(p2)) / 2
+        (hw1,hw2,p1,p2) = section_half_widths(tigl,i,k,eta,\
+                                              center_sec_point[j])
+        sec_width[j] = hw1 + hw2
+        if j > 0:
+            seg_vol[j-1] = abs(tigl.fuselageGetSegmentVolume(i,k))
+            (fslpx,fslpy,fslpz) = tigl.fuselageGetPoint(i,k,0.0,0.0)
+            (fslpx2,fslpy2,fslpz2) = tigl.fuselageGetPoint(i,k,1.0,0.0)
+            seg_length[j-1] = abs(fslpx2-fslpx)
+
+    return(sec_rel_dist, seg_index, sec_circ, sec_width, seg_vol,\
+           seg_length, center_sec_point)
+
+
+# Read-only session of a worker process of fuse_geom_eval
+_worker_session = None
+
+
+def _init_worker(cpacs_string):
+    global _worker_session
+    _worker_session = CpacsSession.from_string(cpacs_string)
+
+
+def _fuselage_eval_job(args):
+    return fuselage_eval(_worker_session.tigl, *args)
+
+
+@profiled()
+def cabin_eval(sec_width, seg_length, seg_vol, fuse_length, mean_width):
+    """ The function evaluates the cabin, nose and tail of one fuselage.
+
+    ARGUMENTS
+    (float-array) sec_width  -- Arg.: Width of each section [m].
+    (float-array) seg_length -- Arg.: Length of each segment [m].
+    (float-array) seg_vol    -- Arg.: Volume of each segment [m^3].
+    (float) fuse_length      -- Arg.: Length of the fuselage [m].
+    (float) mean_width       -- Arg.: Mean width of the fuselage [m].
+
+    RETURN
+    (int) cabin_nb            --Out.: 1 if the cabin is made of the sections
+                                      with maximum width, else 0.
+    (int-array) cabin_seg     --Out.: 1 for the segments of the cabin.
+    (float) nose_length       --Out.: Nose length [m].
+    (float) cabin_length      --Out.: Cabin length [m].
+    (float) tail_length       --Out.: Tail length [m].
+    (float) cabin_volume      --Out.: Cabin volume [m^3].
+    """
+
+    seg_nb = len(seg_length)
+    cabin_seg = np.zeros(seg_nb)
+    cabin_nb = 0
+    c = False
+    cabin_length = 0
+    cabin_volume = 0
+    nose_length = 0
+    tail_length = 0
+    for j in range(1,seg_nb+1):
+        if (round(sec_width[j],3) == round(np.amax(sec_width),3)):
+            cabin_length += seg_length[j-1]
+            cabin_volume += seg_vol[j-1]
+            cabin_seg[j-1] = 1
+            c = True
+        elif not c:
+            nose_length += seg_length[j-1]
+    if cabin_length >= 0.65 * fuse_length:
+    # If the aircraft is designed with 1 or more sections with
+    # maximum width and the sun of their length is greater the 65%
+    # of the total length, the cabin will be considered only in those
+    # sections
+        tail_length = fuse_length - cabin_length - nose_length
+        cabin_nb = 1
+    else:
+    # Largest width factor (from 1.25, by steps of 0.05) which gives a cabin
+    # length of at least 20% of the fuselage length
+        corr = cabin_width_factor(sec_width[1:seg_nb+1], seg_length,\
+                                  mean_width, fuse_length, 1.25)
+        c = False
+        cabin_seg = np.zeros(seg_nb)
+        nose_length = 0
+        tail_length = 0
+        cabin_length = 0
+        cabin_volume = 0
+        for j in range(1,seg_nb+1):
+            if (sec_width[j] >= (corr * mean_width)):
+                cabin_length += seg_length[j-1]
+                cabin_volume += seg_vol[j-1]
+                cabin_seg[j-1] = 1
+                c = True
+            elif c:
+                tail_length += seg_length[j-1]
+            else:
+                nose_length += seg_length[j-1]
+
+    return(cabin_nb, cabin_seg, nose_length, cabin_length, tail_length,\
+           cabin_volume)
+
+
+# -----------------------------------------------------------------------------
+# -----------------------------------------------------------------------------
+
+@profiled()
+def fuse_geom_eval(ag, cpacs_in, session=None, workers=1):
     """ Main function to evaluate the fuselage geometry.
 
     INPUT
     (class) ag    --Arg.: AircraftGeometry class.
     ##======= Class is defined in the InputClasses folder =======##
     (char) cpacs_in  -- Arg.: Cpacs xml file location
+    (class) session  -- Arg.: CpacsSession to use, if None a read-only
+                              session is opened (and closed) for cpacs_in.
+    (int) workers    -- Arg.: Number of processes evaluating the fuselages,
+                              each one opens a copy of the document of
+                              the session.
     OUTPUT
     (class) ag  --Out.: AircraftGeometry class updated .
     """
@@ -182,9 +327,12 @@ def fuse_geom_eval(ag, cpacs_in):
     log.info('-------- Analysing fuselage geometry --------')
     log.info('---------------------------------------------')
 
-    # Opening tixi and tigl
-    tixi = open_tixi(cpacs_in)
-    tigl = open_tigl(tixi)
+    # Opening tixi and tigl (or using the ones of the given session)
+    own_session = session is None
+    if own_session:
+        session = CpacsSession(cpacs_in, read_only=True)
+    tixi = session.tixi
+    tigl = session.tigl
 
 ## ----------------------------------------------------------------------------
 ## COUNTING 1 -----------------------------------------------------------------
@@ -199,21 +347,21 @@ def fuse_geom_eval(ag, cpacs_in):
 
     ag.fus_nb = fus_nb
     ag.fuse_nb = fus_nb
-    i = ag.fus_nb
 
 ## ----------------------------------------------------------------------------
 ## COUNTING 2 -----------------------------------------------------------------
 ## Counting sections and segments----------------------------------------------
 ## ----------------------------------------------------------------------------
 
-    double = 1
-    ag.fuse_sym.append(tigl.fuselageGetSymmetry(i))
-    if ag.fuse_sym[i-1] != 0:
-        ag.fuse_nb += 1
-        double = 2
-    ag.fuse_sec_nb.append(tigl.fuselageGetSectionCount(i))
-    ag.fuse_seg_nb.append(tigl.fuselageGetSegmentCount(i))
-    ag.fuse_vol.append(tigl.fuselageGetVolume(i) * double)
+    for i in range(1, fus_nb+1):
+        double = 1
+        ag.fuse_sym.append(tigl.fuselageGetSymmetry(i))
+        if ag.fuse_sym[i-1] != 0:
+            ag.fuse_nb += 1
+            double = 2
+        ag.fuse_sec_nb.append(tigl.fuselageGetSectionCount(i))
+        ag.fuse_seg_nb.append(tigl.fuselageGetSegmentCount(i))
+        ag.fuse_vol.append(tigl.fuselageGetVolume(i) * double)
 
 ## Checking segment and section connection and reordering them
     (ag.fuse_sec_nb, start_index, seg_sec, fuse_sec_index)\
@@ -244,159 +392,80 @@ def fuse_geom_eval(ag, cpacs_in):
 
     ag.tot_length = tigl.configurationGetLength()
 
-## Evaluating fuselage: sections circumference, segments volume and length ---
-    (ag.fuse_sec_rel_dist[:,i-1],ag.fuse_seg_index[:,i-1])\
-        = rel_dist(i,ag.fuse_sec_nb[i-1],ag.fuse_seg_nb[i-1],\
-                   tigl,seg_sec[:,i-1,:],start_index[i-1])
-    ag.fuse_length.append(ag.fuse_sec_rel_dist[-1,i-1])
-    for j in range(1, ag.fuse_seg_nb[i-1]+1):
-        k = int(ag.fuse_seg_index[j][i-1])
-        ag.fuse_sec_circ[j][i-1]\
-            = tigl.fuselageGetCircumference(i,k,1.0)
-        (fpx,fpy,fpz) = tigl.fuselageGetPoint(i,k,1.0,0.0)
-        (fpx2,fpy2,fpz2) = tigl.fuselageGetPoint(i,k,1.0,0.5)
-        ag.fuse_seg_vol[j-1][i-1] = abs(tigl.fuselageGetSegmentVolume(i,k))
-        fuse_center_section_point[j][i-1][0] = (fpx+fpx2) / 2
-        fuse_center_section_point[j][i-1][1] = (fpy+fpy2) / 2
-        fuse_center_section_point[j][i-1][2] = (fpz+fpz2) / 2
-        hw1 = 0
-        hw2 = 0
-        for zeta in np.arange(0.0, 1.0, 0.001):
-            (fpx,fpy,fpz) = tigl.fuselageGetPoint(i,k,1.0,zeta)
-            if abs(fpz-fuse_center_section_point[j][i-1][2])< 0.01:
-                if (fpy>fuse_center_section_point[j][i-1][1] and hw1 == 0):
-                    hw1 = abs(fpy-fuse_center_section_point[j][i-1][1])
-                elif (fpy<fuse_center_section_point[j][i-1][1] and hw2 == 0):
-                    hw2 = abs(fpy-fuse_center_section_point[j][i-1][1])
-                    break
-        ag.fuse_sec_width[j][i-1] = hw1+hw2
-        (fslpx,fslpy,fslpz) = tigl.fuselageGetPoint(1,k,0.0,0.0)
-        (fslpx2,fslpy2,fslpz2) = tigl.fuselageGetPoint(1,k,1.0,0.0)
-        ag.fuse_seg_length[j-1][i-1] = abs(fslpx2-fslpx)
-    k = int(ag.fuse_seg_index[1][i-1])
-    ag.fuse_sec_circ[0][i-1] = tigl.fuselageGetCircumference(i,k,0.0)
-    (fpx,fpy,fpz) = tigl.fuselageGetPoint(i,k,0.0,0.0)
-    (fpx2,fpy2,fpz2) = tigl.fuselageGetPoint(i,k,0.0,0.5)
-    fuse_center_section_point[0][i-1][0] = (fpx+fpx2) / 2
-    fuse_center_section_point[0][i-1][1] = (fpy+fpy2) / 2
-    fuse_center_section_point[0][i-1][2] = (fpz+fpz2) / 2
-    hw1 = 0
-    hw2 = 0
-    for zeta in np.arange(0.0, 1.0, 0.001):
-        (fpx,fpy,fpz) = tigl.fuselageGetPoint(i,k,0.0,zeta)
-        if abs(fpz-fuse_center_section_point[0][i-1][2])< 0.01:
-            if (fpy>fuse_center_section_point[0][i-1][1] and hw1 ==0):
-                hw1 = abs(fpy-fuse_center_section_point[0][i-1][1])
-            elif (fpy<fuse_center_section_point[0][i-1][1] and hw2 ==0):
-                hw2 = abs(fpy-fuse_center_section_point[0][i-1][1])
-                break
-    ag.fuse_sec_width[0][i-1] = hw1 + hw2
-    ag.fuse_mean_width.append(np.mean(ag.fuse_sec_width[:,i-1]))
+## Evaluating fuselages: sections circumference, segments volume and length --
+## The fuselages are independent, with workers > 1 each one is evaluated in
+## a worker process with its own read-only session of the document in memory
+## (which may differ from cpacs_in on disk).
+
+    jobs = [(i, ag.fuse_sec_nb[i-1], ag.fuse_seg_nb[i-1], seg_sec[:,i-1,:],\
+             start_index[i-1]) for i in range(1, fus_nb+1)]
+    if workers > 1 and fus_nb > 1:
+        cpacs_string = tixi.exportDocumentAsString()
+        with ProcessPoolExecutor(max_workers=min(workers, fus_nb),\
+                                 initializer=_init_worker,\
+                                 initargs=(cpacs_string,)) as executor:
+            results = list(executor.map(_fuselage_eval_job, jobs))
+    else:
+        results = [fuselage_eval(tigl, *job) for job in jobs]
+
+    for (i, result) in enumerate(results, 1):
+        (sec_rel_dist, seg_index, sec_circ, sec_width, seg_vol, seg_length,\
+         center_sec_point) = result
+        sec_nb = ag.fuse_sec_nb[i-1]
+        seg_nb = ag.fuse_seg_nb[i-1]
+        ag.fuse_sec_rel_dist[:sec_nb,i-1] = sec_rel_dist
+        ag.fuse_seg_index[:sec_nb,i-1] = seg_index
+        ag.fuse_sec_circ[:sec_nb,i-1] = sec_circ
+        ag.fuse_sec_width[:sec_nb,i-1] = sec_width
+        ag.fuse_seg_vol[:seg_nb,i-1] = seg_vol
+        ag.fuse_seg_length[:seg_nb,i-1] = seg_length
+        fuse_center_section_point[:sec_nb,i-1,:] = center_sec_point
+        ag.fuse_length.append(sec_rel_dist[-1])
+        ag.fuse_mean_widths.append(np.mean(sec_width))
 
 ## Evaluating the point at the center of each segment, symmetry is considered
-
-    a = 0
-    cs = False
-    for i in range(int(ag.fuse_nb)):
-        if cs:
-            cs = False
-            continue
-        for j in range(1, ag.fuse_seg_nb[i-a-1]+1):
-            ag.fuse_center_seg_point[j-1][i-1][0]\
-                = (fuse_center_section_point[j-1][i-a-1][0]\
-                   + fuse_center_section_point[j][i-a-1][0])/2
-            ag.fuse_center_seg_point[j-1][i-1][1]\
-                = (fuse_center_section_point[j-1][i-a-1][1]\
-                   + fuse_center_section_point[j][i-a-1][1])/2
-            ag.fuse_center_seg_point[j-1][i-1][2]\
-                = (fuse_center_section_point[j-1][i-a-1][2]\
-                   + fuse_center_section_point[j][i-a-1][2])/2
-            ag.fuse_center_sec_point[j-1][i-1][:]\
-                = fuse_center_section_point[j-1][i-a-1][:]
-        if ag.fuse_sym[i-1-a] != 0:
-            if ag.fuse_sym[i-1-a] == 1:
-                symy = 1
-                symx = 1
-                symz = -1
-            if ag.fuse_sym[i-1-a] == 2:
-                symy = -1
-                symx = 1
-                symz = 1
-            if ag.fuse_sym[i-1-a] == 3:
-                symy = 1
-                symx = -1
-                symz = 1
-            ag.fuse_center_seg_point[:,i,0]\
-                = ag.fuse_center_seg_point[:,i-1,0] * symx
-            ag.fuse_center_seg_point[:,i,1]\
-                = ag.fuse_center_seg_point[:,i-1,1] * symy
-            ag.fuse_center_seg_point[:,i,2]\
-                = ag.fuse_center_seg_point[:,i-1,2] * symz
-            ag.fuse_center_sec_point[j-1][i][:]\
-                = fuse_center_section_point[j-1][i-a-1][:]
-            cs = True
-            a += 1
+## Each fuselage has its column, followed by the one of its mirror image.
+
+    fuse_sym = np.array(ag.fuse_sym, dtype=int)
+    sym = fuse_sym != 0
+    col = np.arange(fus_nb) + np.concatenate(([0], np.cumsum(sym)[:-1]))
+    seg_mask = np.arange(max_seg_nb)[:,None] < np.array(ag.fuse_seg_nb)
+    center_seg_point = (fuse_center_section_point[0:max_seg_nb]\
+                        + fuse_center_section_point[1:max_seg_nb+1]) / 2\
+                       * seg_mask[:,:,None]
+    ag.fuse_center_seg_point[:,col,:] = center_seg_point
+    ag.fuse_center_sec_point[:,col,:] = fuse_center_section_point
+    factors = SYMMETRY_FACTORS[fuse_sym[sym]]
+    ag.fuse_center_seg_point[:,col[sym]+1,:] = center_seg_point[:,sym,:]\
+                                               * factors
+    ag.fuse_center_sec_point[:,col[sym]+1,:]\
+        = fuse_center_section_point[:,sym,:] * factors
 
 # Evaluating cabin length and volume, nose length and tail_length ------------
-    ex = False
-    corr = 1.25 + np.zeros((1,fus_nb))
-    c = False
-    cabin_nb = np.zeros((1,fus_nb))
+    cabin_nb = np.zeros(fus_nb)
     cabin_seg = np.zeros((max_seg_nb,fus_nb))
-    cabin_length = 0
-    cabin_volume = 0
-    nose_length = 0
-    tail_length = 0
-    for j in range(1,ag.fuse_seg_nb[i-1]+1):
-        if (round(ag.fuse_sec_width[j][i-1],3)\
-            == round(np.amax(ag.fuse_sec_width[:,i-1]),3)):
-            cabin_length += ag.fuse_seg_length[j-1,i-1]
-            cabin_volume += ag.fuse_seg_vol[j-1,i-1]
-            cabin_seg[j-1][i-1] = 1
-            c = True
-        elif not c:
-            nose_length += ag.fuse_seg_length[j-1,i-1]
-    if cabin_length >= 0.65 * ag.fuse_length[i-1]:
-    # If the aircraft is designed with 1 or more sections with
-    # maximum width and the sun of their length is greater the 65%
-    # of the total length, the cabin will be considered only in those
-    # sections
-        tail_length = ag.fuse_length[i-1] - cabin_length - nose_length
-        cabin_nb[i-1] = 1
-        ex = True
-    while ex is False:
-        c = False
-        cabin_seg = np.zeros((max_seg_nb,fus_nb))
-        nose_length = 0
-        tail_length = 0
-        cabin_length = 0
-        cabin_volume = 0
-        for j in range(1,ag.fuse_seg_nb[i-1]+1):
-            if (ag.fuse_sec_width[j][i-1] >= (corr[i-1]\
-                * ag.fuse_mean_width[i-1])):
-                cabin_length += ag.fuse_seg_length[j-1,i-1]
-                cabin_volume += ag.fuse_seg_vol[j-1,i-1]
-                cabin_seg[j-1][i-1] = 1
-                c = True
-            elif c:
-                tail_length += ag.fuse_seg_length[j-1,i-1]
-            else:
-                nose_length += ag.fuse_seg_length[j-1,i-1]
-        if corr[i-1] > 0.0 and cabin_length < (0.20 * ag.fuse_length[i-1]):
-            corr[i-1] -= 0.05
-        else:
-            ex = True
-
-    ag.fuse_nose_length.append(nose_length)
-    ag.fuse_tail_length.append(tail_length)
-    ag.fuse_cabin_length.append(cabin_length)
-    ag.fuse_cabin_vol.append(cabin_volume)
+    for i in range(1, fus_nb+1):
+        seg_nb = ag.fuse_seg_nb[i-1]
+        (cabin_nb[i-1], cabin_seg[:seg_nb,i-1], nose_length, cabin_length,\
+         tail_length, cabin_volume)\
+            = cabin_eval(ag.fuse_sec_width[:seg_nb+1,i-1],\
+                         ag.fuse_seg_length[:seg_nb,i-1],\
+                         ag.fuse_seg_vol[:seg_nb,i-1],\
+                         ag.fuse_length[i-1], ag.fuse_mean_widths[i-1])
+        ag.fuse_nose_length.append(nose_length)
+        ag.fuse_tail_length.append(tail_length)
+        ag.fuse_cabin_length.append(cabin_length)
+        ag.fuse_cabin_vol.append(cabin_volume)
+
     ag.f_seg_sec = seg_sec
     ag.cabin_nb = cabin_nb
     ag.cabin_seg = cabin_seg
-    ag.fuse_mean_width = ag.fuse_mean_width[0]
+    # As before the evaluation of all the fuselages, the mean width is the
+    # one of the main (first) fuselage
+    ag.fuse_mean_width = ag.fuse_mean_widths[0]
 
-    close_tixi(tixi, cpacs_in)
+    if own_session:
+        session.close()
 
 # log info display ------------------------------------------------------------
 
@@ -410,31 +479,32 @@ def fuse_geom_eval(ag, cpacs_in):
              + '2 = x-z, 3 = y-z planes')
     log.info('---------------------------------------------')
     log.info('---------- Fuselage Results -----------------')
-    log.info('Number of fuselage [-]: ' + str(ag.fuse_nb))
-    log.info('Fuselage symmetry plane [-]: ' + str(ag.fuse_sym))
-    log.info('Number of fuselage sections (not counting symmetry) [-]: '\
-             + str(ag.fuse_sec_nb))
-    log.info('Number of fuselage segments (not counting symmetry) [-]: '\
-             + str(ag.fuse_seg_nb))
+    log.info('Number of fuselage [-]: %s', ag.fuse_nb)
+    log.info('Fuselage symmetry plane [-]: %s', ag.fuse_sym)
+    log.info('Number of fuselage sections (not counting symmetry) [-]: %s',
+             ag.fuse_sec_nb)
+    log.info('Number of fuselage segments (not counting symmetry) [-]: %s',
+             ag.fuse_seg_nb)
     # log.info('Cabin segments array [-]: ' + str(cabin_seg))
-    log.info('Fuse Length [m]: ' + str(ag.fuse_length))
-    log.info('Fuse nose Length [m]: ' + str(ag.fuse_nose_length))
-    log.info('Fuse cabin Length [m]: ' + str(ag.fuse_cabin_length))
-    log.info('Fuse tail Length [m]: ' + str(ag.fuse_tail_length))
-    log.info('Aircraft Length [m]: ' + str(ag.tot_length))
+    log.info('Fuse Length [m]: %s', ag.fuse_length)
+    log.info('Fuse nose Length [m]: %s', ag.fuse_nose_length)
+    log.info('Fuse cabin Length [m]: %s', ag.fuse_cabin_length)
+    log.info('Fuse tail Length [m]: %s', ag.fuse_tail_length)
+    log.info('Aircraft Length [m]: %s', ag.tot_length)
     # log.info('Circumference of each section of each fuselage [m]: \n'\
              # + str(ag.fuse_sec_circ))
     # log.info('Relative distance of each section of each fuselage [m]: \n'\
     #          + str(ag.fuse_sec_rel_dist))
     # log.info('Length of each segment of each fuselage [m]: \n'\
     #          + str(ag.fuse_seg_length))
-    log.info('Mean fuselage width [m]: ' + str(ag.fuse_mean_width))
+    log.info('Mean fuselage width [m]: %s', ag.fuse_mean_width)
+    log.info('Mean width of each fuselage [m]: %s', ag.fuse_mean_widths)
     # log.info('Width of each section of each fuselage [m]: \n'\
     #          + str(ag.fuse_sec_width))
     # log.info('Volume of all the segmetns of each fuselage [m^3]: \n'\
     #          + str(ag.fuse_seg_vol))
-    log.info('Volume of each cabin [m^3]: ' + str(ag.fuse_cabin_vol))
-    log.info('Volume of each fuselage [m^3]: ' + str(ag.fuse_vol))
+    log.info('Volume of each cabin [m^3]: %s', ag.fuse_cabin_vol)
+    log.info('Volume of each fuselage [m^3]: %s', ag.fuse_vol)
     log.info('---------------------------------------------')
 
     return(ag)
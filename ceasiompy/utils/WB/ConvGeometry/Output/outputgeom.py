@@ -18,6 +18,8 @@ This file will generate the output.txt for the geometry analysis.
 
 import numpy as np
 
+from ceasiompy.utils.profiling import profiled
+
 
 #=============================================================================
 #   CLASSES
@@ -30,6 +32,7 @@ import numpy as np
 #   FUNCTIONS
 #=============================================================================
 
+@profiled()
 def produce_output_txt(ag, NAME):
     """ Function to generate the output file with all the geometry data
         evaluated.
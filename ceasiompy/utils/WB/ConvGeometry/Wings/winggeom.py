@@ -20,8 +20,10 @@ import numpy as np
 import math
 
 from ceasiompy.utils.ceasiomlogger import get_logger
+from ceasiompy.utils.profiling import profiled
+from ceasiompy.utils.WB.geometryfunctions import order_segments
 
-from ceasiompy.utils.cpacsfunctions import open_tixi, open_tigl, close_tixi
+from ceasiompy.utils.cpacsfunctions import CpacsSession
 
 log = get_logger(__file__.split('.')[0])
 
@@ -37,6 +39,7 @@ log = get_logger(__file__.split('.')[0])
 #   FUNCTIONS
 #==============================================================================
 
+@profiled()
 def check_segment_connection(wing_plt_area_xz, wing_plt_area_yz, ag, tigl):
     """ The function checks for each segment the start and end section index
         and to reorder them.
@@ -75,13 +78,11 @@ def check_segment_connection(wing_plt_area_xz, wing_plt_area_yz, ag, tigl):
     # for horizontal wings, or z, for vertical wings position
     # The code works if a section is defined and not used and if the segments
     # are not define with a consequential order.
-    # WARNING The code does not work if a segment is defined
-    #         and then not used.
-    #         The aircraft should be designed along the x-axis
+    # A segment defined and then not used is reported (order_segments).
+    # WARNING The aircraft should be designed along the x-axis
     #         and on the x-y plane
 
     for i in range(1,ag.w_nb+1):
-        wing_sec_index = []
         for j in range(1,ag.wing_seg_nb[i-1]+1):
             (s0,e) = tigl.wingGetInnerSectionAndElementIndex(i,j)
             (s1,e) = tigl.wingGetOuterSectionAndElementIndex(i,j)
@@ -89,7 +90,7 @@ def check_segment_connection(wing_plt_area_xz, wing_plt_area_yz, ag, tigl):
             seg_sec[j-1,i-1,1] = s1
             seg_sec[j-1,i-1,2] = j
         (slpx,slpy,slpz) = tigl.wingGetChordPoint(i,1,0.0,0.0)
-        seg_sec_reordered[0,i-1,:] = seg_sec[0,i-1,:]
+        first_seg = 0
         start_index.append(1)
         for j in range(2,ag.wing_seg_nb[i-1]+1):
             (x,y,z) = tigl.wingGetChordPoint(i,j,1.0,0.0)
@@ -98,22 +99,15 @@ def check_segment_connection(wing_plt_area_xz, wing_plt_area_yz, ag, tigl):
                 if y < slpy:
                     (slpx,slpy,slpz) = (x,y,z)
                     start_index.append(j)
-                    seg_sec_reordered[0,i-1,:] = seg_sec[j-1,i-1,:]
+                    first_seg = j-1
             else:
                 if z < slpz:
                     (slpx,slpy,slpz) = (x,y,z)
                     start_index.append(j)
-                    seg_sec_reordered[0,i-1,:] = seg_sec[j-1,i-1,:]
-        for j in range(2,ag.wing_seg_nb[i-1]+1):
-            end_sec = seg_sec_reordered[j-2,i-1,1]
-            start_next = np.where(seg_sec[:,i-1,0] == end_sec)
-            seg_sec_reordered[j-1,i-1,:] = seg_sec[start_next[0],i-1,:]
-        wing_sec_index.append(seg_sec_reordered[0,0,0])
-        for j in range(2,ag.wing_seg_nb[i-1]+1):
-            if (seg_sec_reordered[j-1,i-1,0] in wing_sec_index) == False:
-                wing_sec_index.append(seg_sec_reordered[j-1,i-1,0])
-        if (seg_sec_reordered[j-1,i-1,1] in wing_sec_index) == False:
-            wing_sec_index.append(seg_sec_reordered[j-1,i-1,1])
+                    first_seg = j-1
+        (seg_ordered, wing_sec_index) = order_segments(
+            seg_sec[0:ag.wing_seg_nb[i-1],i-1,:], first_seg)
+        seg_sec_reordered[0:ag.wing_seg_nb[i-1],i-1,:] = seg_ordered
         nb = np.shape(wing_sec_index)
         if nb[0] > nbmax:
             nbmax = nb[0]
@@ -127,6 +121,7 @@ def check_segment_connection(wing_plt_area_xz, wing_plt_area_yz, ag, tigl):
 # -----------------------------------------------------------------------------
 # -----------------------------------------------------------------------------
 
+@profiled()
 def get_wing_segment_length(ag, wing_center_section_point):
     """ The function evaluates the length of each segment of each wing,
         also considering the ones defined using symmetry.
@@ -168,13 +163,16 @@ def get_wing_segment_length(ag, wing_center_section_point):
 # -----------------------------------------------------------------------------
 # -----------------------------------------------------------------------------
 
-def wing_geom_eval(ag, cpacs_in):
+@profiled()
+def wing_geom_eval(ag, cpacs_in, session=None):
     """ Main function to evaluate the wings geometry
 
     ARGUMENTS
     (class) ag         --Arg.: AircraftGeometry class.
     ##======= Class are defined in the InputClasses folder =======##
     (char) cpacs_in    -- Arg.: Cpacs xml file location.
+    (class) session    -- Arg.: CpacsSession to use, if None a read-only
+                                session is opened (and closed) for cpacs_in.
 
     RETURN
     (class) ag  --Out.: AircraftGeometry class updated.
@@ -185,9 +183,12 @@ def wing_geom_eval(ag, cpacs_in):
     log.info('---------- Analysing wing geometry ----------')
     log.info('---------------------------------------------')
 
-    # Opening tixi and tigl
-    tixi = open_tixi(cpacs_in)
-    tigl = open_tigl(tixi)
+    # Opening tixi and tigl (or using the ones of the given session)
+    own_session = session is None
+    if own_session:
+        session = CpacsSession(cpacs_in, read_only=True)
+    tixi = session.tixi
+    tigl = session.tigl
 
 ## ----------------------------------------------------------------------------
 ## COUNTING 1 -----------------------------------------------------------------
@@ -386,33 +387,31 @@ def wing_geom_eval(ag, cpacs_in):
             a += 1
 
     ag.w_seg_sec = seg_sec
-    close_tixi(tixi, cpacs_in)
+    if own_session:
+        session.close()
 
 # log info display ------------------------------------------------------------
     log.info('---------------------------------------------')
     log.info('--------------- Wing Results ----------------')
-    log.info('Number of Wings [-]: ' + str(ag.wing_nb))
-    log.info('Wing symmetry plane [-]: ' + str(ag.wing_sym))
-    log.info('Number of wing sections (not counting symmetry) [-]: '\
-             + str(ag.wing_sec_nb))
-    log.info('Number of wing segments (not counting symmetry) [-]: '\
-             + str(ag.wing_seg_nb))
-    log.info('Wing Span [m]: ' + str(ag.wing_span))
-    log.info('Wing MAC length [m]: ' + str(ag.wing_mac[0,]))
-    log.info('Wing MAC x,y,z coordinate [m]: \n' + str(ag.wing_mac[1:4,]))
-    log.info('Wings sections thicknes [m]: ' + str(ag.wing_sec_thicknes))
-    log.info('Wings sections mean thicknes [m]: '\
-            + str(ag.wing_sec_mean_thick))
-    log.info('Wing segments length [m]: ' + str(ag.wing_seg_length))
-    log.info('Wing max chord length [m]: ' + str(ag.wing_max_chord))
-    log.info('Wing min chord length [m]: ' + str(ag.wing_min_chord))
-    log.info('Main wing plantform area [m^2]: ' + str(ag.wing_plt_area_main))
-    log.info('Wings plantform area [m^2]: '\
-             + str(ag.wing_plt_area))
-    log.info('Volume of each wing [m^3]: ' + str(ag.wing_vol))
-    log.info('Total wing volume [m^3]: ' + str(ag.wing_tot_vol))
-    log.info('Wing volume for fuel storage [m^3]: '\
-             + str(ag.wing_fuel_vol))
+    log.info('Number of Wings [-]: %s', ag.wing_nb)
+    log.info('Wing symmetry plane [-]: %s', ag.wing_sym)
+    log.info('Number of wing sections (not counting symmetry) [-]: %s',
+             ag.wing_sec_nb)
+    log.info('Number of wing segments (not counting symmetry) [-]: %s',
+             ag.wing_seg_nb)
+    log.info('Wing Span [m]: %s', ag.wing_span)
+    log.info('Wing MAC length [m]: %s', ag.wing_mac[0,])
+    log.info('Wing MAC x,y,z coordinate [m]: \n%s', ag.wing_mac[1:4,])
+    log.info('Wings sections thicknes [m]: %s', ag.wing_sec_thicknes)
+    log.info('Wings sections mean thicknes [m]: %s', ag.wing_sec_mean_thick)
+    log.info('Wing segments length [m]: %s', ag.wing_seg_length)
+    log.info('Wing max chord length [m]: %s', ag.wing_max_chord)
+    log.info('Wing min chord length [m]: %s', ag.wing_min_chord)
+    log.info('Main wing plantform area [m^2]: %s', ag.wing_plt_area_main)
+    log.info('Wings plantform area [m^2]: %s', ag.wing_plt_area)
+    log.info('Volume of each wing [m^3]: %s', ag.wing_vol)
+    log.info('Total wing volume [m^3]: %s', ag.wing_tot_vol)
+    log.info('Wing volume for fuel storage [m^3]: %s', ag.wing_fuel_vol)
     log.info('---------------------------------------------')
 
     return(ag)
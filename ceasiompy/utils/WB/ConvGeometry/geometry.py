@@ -17,6 +17,10 @@ This file will connect the wing/fuse/output modules.
 #=============================================================================
 
 from ceasiompy.utils.ceasiomlogger import get_logger
+from ceasiompy.utils.cpacsfunctions import CpacsSession
+from ceasiompy.utils.profiling import profiled
+from ceasiompy.utils.WB.geometrycache import get_geometry_cache
+from ceasiompy.utils.WB.geometryexport import export_geometry
 from .Fuselage.fusegeom import fuse_geom_eval
 from .Wings.winggeom import wing_geom_eval
 from .Output.outputgeom import produce_output_txt
@@ -38,28 +42,63 @@ log = get_logger(__file__.split('.')[0])
 #   FUNCTIONS
 #=============================================================================
 
-def geometry_eval(cpacs_in, NAME):
+@profiled()
+def geometry_eval(cpacs_in, NAME, session=None, use_cache=True, workers=1,
+                  export_path=None):
     """This function exectute the functions to analyze the cpacs file and
        evaluate the wings and fuselage geometry.
 
     ARGUMENTS
     (char) cpacs_in    -- Arg.: Cpacs xml file location.
     (char) NAME        -- Arg.: Name of the aircraft.
+    (class) session    -- Arg.: CpacsSession shared by the fuselage and wing
+                                analysis, if None a read-only session is
+                                opened (and closed) for cpacs_in.
+    (boolean) use_cache -- Arg.: If True (default) the result is read from (or
+                                 stored in) the geometry cache, see
+                                 geometrycache.py.
+    (int) workers      -- Arg.: Number of processes evaluating the fuselages,
+                                see fuse_geom_eval.
+    (char) export_path -- Arg.: If given, the results are appended to this
+                                .jsonl, .npz or Parquet export, see
+                                geometryexport.py.
 
     OUTPUTS
     (class) AircraftGeometry    --Out.: Updated aircraft_geometry class.
     ##======= Class are defined in the InputClasses folder =======##
     """
-    ag = AircraftGeometry()
+    own_session = session is None
+    if own_session:
+        session = CpacsSession(cpacs_in, read_only=True)
+
+    # The handles of an own session are released even if the analysis fails
+    try:
+        ag = None
+        if use_cache:
+            cache = get_geometry_cache()
+            key = cache.key(session.tixi, 'geometry_eval')
+            ag = cache.get(key)
+
+        if ag is None:
+            ag = AircraftGeometry()
 
 ##================================= FUSELAGES ==============================##
-    ag = fuse_geom_eval(ag, cpacs_in)
+            ag = fuse_geom_eval(ag, cpacs_in, session, workers)
 
 #==================================== WINGS ===============================##
-    ag = wing_geom_eval(ag, cpacs_in)
+            ag = wing_geom_eval(ag, cpacs_in, session)
+            ag.compact()
+
+            if use_cache:
+                cache.put(key, ag)
+    finally:
+        if own_session:
+            session.close()
 
 ##======================== OUTPUT TXT FILE GENERATION ======================##
     produce_output_txt(ag, NAME)
+    if export_path:
+        export_geometry(export_path, NAME, {'': ag})
 
     return(ag)
 
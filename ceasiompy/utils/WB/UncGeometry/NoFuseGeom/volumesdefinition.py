@@ -23,7 +23,7 @@ import math
 
 from ceasiompy.utils.ceasiomlogger import get_logger
 
-from ceasiompy.utils.cpacsfunctions import open_tixi,open_tigl, close_tixi
+from ceasiompy.utils.cpacsfunctions import CpacsSession
 
 log = get_logger(__file__.split('.')[0])
 
@@ -40,7 +40,8 @@ log = get_logger(__file__.split('.')[0])
 #   FUNCTIONS
 #=============================================================================
 
-def wing_check_thickness(h_min, awg, cpacs_in, TP, FUEL_ON_CABIN=0):
+def wing_check_thickness(h_min, awg, cpacs_in, TP, FUEL_ON_CABIN=0,
+                         session=None):
     """ The fuction subdivides the main wing into nodes and defines
         the fuel and cabin volumes.
 
@@ -52,6 +53,8 @@ def wing_check_thickness(h_min, awg, cpacs_in, TP, FUEL_ON_CABIN=0):
         TP (boolean): True if the aircraft is a turboprop.
         FUEL_ON_CABIN (float): Percentage of the cabin volume used for fuel
                            storaging instead for passengers. (default 0%)
+        session (class): CpacsSession to use, if None a read-only
+                         session is opened (and closed) for cpacs_in.
 
     Returns:
         wing_nodes (float-array): 3D array containing the nodes coordinates (x,y,z) [m,m,m].
@@ -63,141 +66,105 @@ def wing_check_thickness(h_min, awg, cpacs_in, TP, FUEL_ON_CABIN=0):
     log.info('----------- Evaluating fuselage and wing volume -----------')
     log.info('-----------------------------------------------------------')
 
-    tixi = open_tixi(cpacs_in)
-    tigl = open_tigl(tixi)
+    own_session = session is None
+    if own_session:
+        session = CpacsSession(cpacs_in, read_only=True)
+    tigl = session.tigl
 
     SPACING = 0.1
     subd_c = 30  # Number of subdivisions along the perimeter on eachsurface,
                  # total number of points for each section subd_c * 2
     DEN = 0.0
     w = awg.main_wing_index - 1
-    wing_nodes  = 0
-    c = False
 
     for d in range(1,subd_c+2):
         DEN += d
     zeta = 1.0/DEN
+
+    # Zeta of the nodes, the distance between two nodes grows from the
+    # leading edge (ze_0 if the leading edge is at zeta = 0.0, ze_1 otherwise)
+    steps = np.arange(0,subd_c+2) * zeta
+    ze_0 = np.cumsum(np.concatenate(([0.0], steps)))[1:]
+    ze_1 = np.cumsum(np.concatenate(([1.0], -steps)))[1:]
+
+    # Number of subdivisions along the longitudinal axis of each segment,
+    # used to preallocate the nodes array
+    seg_subd = []
     for i in awg.w_seg_sec[:,w,2]:
         if i == 0.0:
             break
-        w_temp=np.zeros((2,subd_c+2,3))
-        #Number of subdivisions along the longitudinal axis
         subd_l = math.ceil((awg.wing_seg_length[int(i)-1][w]/SPACING))
         if subd_l == 0:
             subd_l = 1
+        seg_subd.append((int(i), subd_l))
+    nb_stations = sum(int(subd_l)-1 for (i, subd_l) in seg_subd)
+    wing_nodes = np.zeros((2*nb_stations,subd_c+2,3))
+
+    r = 0
+    for (i, subd_l) in seg_subd:
         eta = 1.0/subd_l
         et = 0.0
-        (xc,yc,zc) = awg.wing_center_seg_point[int(i)-1][w][:]
         for j in range(0,int(subd_l)-1):
-            (xle,yle,zle) =  tigl.wingGetLowerPoint(w+1,int(i),et,0.0)
-            (xle2,yle2,zle2) =  tigl.wingGetLowerPoint(w+1,int(i),et,1.0)
+            (xle,yle,zle) =  tigl.wingGetLowerPoint(w+1,i,et,0.0)
+            (xle2,yle2,zle2) =  tigl.wingGetLowerPoint(w+1,i,et,1.0)
             if xle < xle2:
-                ZLE = 0.0
-                ze = 0.0
-            else:
-                ZLE = 1.0
-                ze = 1.0
-            for k in range(0,subd_c+2):
-                if ZLE == 0.0:
-                    ze += float(k)*zeta
-                elif ZLE == 1.0:
-                    ze -= float(k)*zeta
-                (xl,yl,zl) =  tigl.wingGetLowerPoint(w+1,int(i),et,ze)
-                (xu,yu,zu) =  tigl.wingGetUpperPoint(w+1,int(i),et,ze)
-                w_temp[0, k, :] = (xu,yu,zu)
-                w_temp[1, k, :] = (xl,yl,zl)
-            if c is False:
-                wing_nodes = w_temp
-                c = True
+                ze_nodes = ze_0
             else:
-                wing_nodes = np.concatenate((wing_nodes, w_temp), axis=0)
+                ze_nodes = ze_1
+            for k, ze in enumerate(ze_nodes):
+                wing_nodes[r, k, :] = tigl.wingGetUpperPoint(w+1,i,et,ze)
+                wing_nodes[r+1, k, :] = tigl.wingGetLowerPoint(w+1,i,et,ze)
+            r += 2
             et = j * eta
     (rows, columns, pages) = wing_nodes.shape
 
+    if own_session:
+        session.close()
+
     # wing_nodes 3D matrix: the even rows and the zero row correspond
     # to the upper profile of the wing, while all the odd rows correspond
     # to the lower profile. The columns contain the coordinates of each nodes.
     # The page 0,1 and 2 contain respectively the x,y and z coordinate.
-    h_max = []
-    h_mean = []
-    y_sec = []
-
-    for r in range(0,rows-1,2):
-        h_max_temp = 0
-        z_min = 9999
-        z_max = 0
-        h = []
-        for c in range(0,columns):
-            (xu, yu, zu) = wing_nodes[r,c,:]
-            (xl, yl, zl) = wing_nodes[r+1,c,:]
-            h.append(abs(zu-zl))
-            if abs(zu-zl) > h_max_temp:
-                h_max_temp = abs(zu-zl)
-            if r == 0:
-                if zl < z_min:
-                    (x13, y13, z13) = (xl, yl, zl)
-                    z_min = zl
-                if zu > z_max:
-                    (x14, y14, z14) = (xu, yu, zu)
-                    z_max = zu
-            else:
-                if zl < z_min:
-                    (x23_t,y23_t,z23_t) = (xl,yl,zl)
-                    z_min = zl
-                if zu > z_max:
-                    (x24_t,y24_t,z24_t) = (xu,yu,zu)
-                    z_max = zu
-        h_max.append(h_max_temp)
-        h_mean.append(np.mean(h))
-        y_sec.append(yl)
-        if np.mean(h) >= h_min:
-            h_mean_cabin = np.mean(h_mean)
-            awg.y_max_cabin = yl
-            seg = r
-            if r != 0:
-                (x23,y23,z23) = (x23_t,y23_t,z23_t)
-                (x24,y24,z24) = (x24_t,y24_t,z24_t)
-        else:
-            (x11, y11, z11) =  wing_nodes[0,0,:]
-            (x12, y12, z12) =  wing_nodes[0,-1,:]
-            (x21, y21, z21) =  wing_nodes[seg,0,:]
-            (x22, y22, z22) =  wing_nodes[seg,-1,:]
-            break
-
-    for c in range(0, columns):
-        (xu,yu,zu) = wing_nodes[0,c,:]
-        (xl,yl,zl) = wing_nodes[1,c,:]
-        if abs(zu-zl) >= h_min:
-            xs1 = xu
-            zs1u = zu
-            zs1l = zl
-            yse1 = yl
-            break
-    for c in range(0, columns):
-        (xu,yu,zu) = wing_nodes[seg,c,:]
-        (xl,yl,zl) = wing_nodes[seg+1,c,:]
-        if abs(zu-zl) >= h_min:
-            xs2 = xu
-            zs2u = zu
-            zs2l = zl
-            yse2 = yl
-            break
-    for c in range(columns-1, -1, -1):
-        (xu,yu,zu) = wing_nodes[0,c,:]
-        (xl,yl,zl) = wing_nodes[1,c,:]
-        if abs(zu-zl) >= h_min:
-            xe1 = xu
-            ze1u = zu
-            ze1l = zl
-            break
-    for c in range(columns-1, -1, -1):
-        (xu,yu,zu) = wing_nodes[seg,c,:]
-        (xl,yl,zl) = wing_nodes[seg+1,c,:]
-        if abs(zu-zl) >= h_min:
-            xe2 = xu
-            ze2u = zu
-            ze2l = zl
-            break
+    upper = wing_nodes[0::2]
+    lower = wing_nodes[1::2]
+    h = abs(upper[:,:,2] - lower[:,:,2])
+    h_mean = np.mean(h, axis=1)
+
+    # The cabin ends at the last station before the first one with a mean
+    # height lower than h_min
+    low_stations = np.nonzero(h_mean < h_min)[0]
+    if not low_stations.size or low_stations[0] == 0:
+        raise ValueError('The cabin of the main wing cannot be defined '
+                         + 'with a minimum height of ' + str(h_min) + ' m')
+    cabin_end = low_stations[0] - 1
+    seg = 2 * cabin_end
+    awg.y_max_cabin = lower[cabin_end,-1,1]
+
+    # Lowest node of the lower profile and highest node of the upper profile
+    # of each station (the z_min/z_max bounds of 9999 and 0 are kept)
+    stations = np.arange(upper.shape[0])
+    z_min_nodes = lower[stations, np.argmin(lower[:,:,2], axis=1)]
+    z_max_nodes = upper[stations, np.argmax(upper[:,:,2], axis=1)]
+    z_min_found = z_min_nodes[:,2] < 9999
+    z_max_found = z_max_nodes[:,2] > 0
+    (x13, y13, z13) = _last_extreme_node(z_min_nodes, z_min_found, 0, 0)
+    (x14, y14, z14) = _last_extreme_node(z_max_nodes, z_max_found, 0, 0)
+    (x23, y23, z23) = _last_extreme_node(z_min_nodes, z_min_found, 1,\
+                                         cabin_end)
+    (x24, y24, z24) = _last_extreme_node(z_max_nodes, z_max_found, 1,\
+                                         cabin_end)
+
+    (x11, y11, z11) =  wing_nodes[0,0,:]
+    (x12, y12, z12) =  wing_nodes[0,-1,:]
+    (x21, y21, z21) =  wing_nodes[seg,0,:]
+    (x22, y22, z22) =  wing_nodes[seg,-1,:]
+
+    # First and last nodes along the chord where the wing is thick enough
+    # for the cabin, at the first and the last cabin stations
+    (xs1, zs1u, zs1l, yse1, xe1, ze1u, ze1l) = _cabin_edges(upper[0],\
+                                                            lower[0], h_min)
+    (xs2, zs2u, zs2l, yse2, xe2, ze2u, ze2l)\
+        = _cabin_edges(upper[cabin_end], lower[cabin_end], h_min)
 
     awg.cabin_area = 0.5 * abs(xs1*yse2 + xs2*yse2 + xe2*yse1 + xe1*yse1\
                                - xs2*yse1 - xe2*yse2 - xe1*yse2 - xs1*yse1)
@@ -229,19 +196,67 @@ def wing_check_thickness(h_min, awg, cpacs_in, TP, FUEL_ON_CABIN=0):
 
     # log info display ------------------------------------------------------------
     log.info('--------------------- Main wing Volumes -------------------')
-    log.info('Wing volume [m^3]: ' + str(awg.wing_vol[w]))
-    log.info('Cabin volume [m^3]: ' + str(awg.cabin_vol))
-    log.info('Volume of the wing as fuselage [m^3]: ' + str(awg.fuse_vol))
-    log.info('Volume of the remaining portion of the wing [m^3]: '\
-             + str(awg.wing_vol[w] - awg.fuse_vol))
-    log.info('Fuel volume in the fuselage [m^3]: ' + str(awg.fuse_fuel_vol))
-    log.info('Fuel volume in the wing [m^3]: ' + str(awg.wing_fuel_vol))
-    log.info('Total fuel Volume [m^3]: ' + str(awg.fuel_vol_tot))
+    log.info('Wing volume [m^3]: %s', awg.wing_vol[w])
+    log.info('Cabin volume [m^3]: %s', awg.cabin_vol)
+    log.info('Volume of the wing as fuselage [m^3]: %s', awg.fuse_vol)
+    log.info('Volume of the remaining portion of the wing [m^3]: %s',
+             awg.wing_vol[w] - awg.fuse_vol)
+    log.info('Fuel volume in the fuselage [m^3]: %s', awg.fuse_fuel_vol)
+    log.info('Fuel volume in the wing [m^3]: %s', awg.wing_fuel_vol)
+    log.info('Total fuel Volume [m^3]: %s', awg.fuel_vol_tot)
     log.info('-----------------------------------------------------------')
 
     return(awg, wing_nodes)
 
 
+def _last_extreme_node(nodes, found, first, last):
+    """ The function returns the extreme node of the last station between
+        'first' and 'last' (included) for which it has been found.
+
+    Args:
+        nodes (float-array): Extreme node (x,y,z) of each station.
+        found (boolean-array): True if the extreme node of the station
+                               has been found.
+        first (int): Index of the first station.
+        last (int): Index of the last station.
+
+    Returns:
+        node (float-array): Coordinates (x,y,z) of the extreme node.
+    """
+
+    (index,) = np.nonzero(found[first:last+1])
+    if not index.size:
+        raise ValueError('The main wing has no node above or under its '
+                         + 'cabin stations, its volume cannot be evaluated')
+
+    return nodes[first + index[-1]]
+
+
+def _cabin_edges(upper, lower, h_min):
+    """ The function finds the first and last nodes of a station where
+        the wing is thicker than h_min.
+
+    Args:
+        upper (float-array): Nodes (x,y,z) of the upper profile.
+        lower (float-array): Nodes (x,y,z) of the lower profile.
+        h_min (float): Minimum height for the fuselage [m].
+
+    Returns:
+        xs, zsu, zsl, yse (float): x, upper z, lower z and lower y
+                                   of the first node [m].
+        xe, zeu, zel (float): x, upper z and lower z of the last node [m].
+    """
+
+    (index,) = np.nonzero(abs(upper[:,2] - lower[:,2]) >= h_min)
+    if not index.size:
+        raise ValueError('The main wing is nowhere thicker than the '
+                         + 'minimum height of ' + str(h_min) + ' m')
+    (s, e) = (index[0], index[-1])
+
+    return(upper[s,0], upper[s,2], lower[s,2], lower[s,1],\
+           upper[e,0], upper[e,2], lower[e,2])
+
+
 #=============================================================================
 #    MAIN
 #=============================================================================
@@ -25,6 +25,9 @@ import math
 import ceasiompy.utils.cpacsfunctions as cpsf
 
 from ceasiompy.utils.ceasiomlogger import get_logger
+from ceasiompy.utils.WB.geometryfunctions import section_half_widths,\
+                                                 order_segments,\
+                                                 cabin_width_factor
 
 log = get_logger(__file__.split('.')[0])
 
@@ -79,13 +82,11 @@ def check_segment_connection(fus_nb, fuse_seg_nb, fuse_sec_nb, tigl):
     # The code works if a section is defined and not used in the segment
     # definition and if the segments are not defined
     # with a consequential order.
-    # WARNING The code does not work if a segment is defined
-    #         and then not used.
-    #         The aircraft should be designed along the x axis
+    # A segment defined and then not used is reported (order_segments).
+    # WARNING The aircraft should be designed along the x axis
     #         and on the x-y plane
 
     for i in range(1,fus_nb+1):
-        fuse_sec_index = []
         for j in range(1,fuse_seg_nb[i-1]+1):
             (seg_sec[j-1,i-1,0],e)\
                 = tigl.fuselageGetStartSectionAndElementIndex(i,j)
@@ -93,24 +94,17 @@ def check_segment_connection(fus_nb, fuse_seg_nb, fuse_sec_nb, tigl):
                 = tigl.fuselageGetEndSectionAndElementIndex(i,j)
             seg_sec[j-1,i-1,2] = j
         (slpx,slpy,slpz) = tigl.fuselageGetPoint(i,1,0.0,0.0)
-        seg_sec_reordered[0,i-1,:] = seg_sec[0,i-1,:]
+        first_seg = 0
         start_index.append(1)
         for j in range(2,fuse_seg_nb[i-1]+1):
             (x,y,z) = tigl.fuselageGetPoint(i,j,1.0,0.0)
             if x < slpx:
                 (slpx,slpy,slpz) = (x,y,z)
                 start_index.append(j)
-                seg_sec_reordered[0,i-1,:] = seg_sec[j-1,i-1,:]
-        for j in range(2,fuse_seg_nb[i-1]+1):
-            end_sec = seg_sec_reordered[j-2,i-1,1]
-            start_next = np.where(seg_sec[:,i-1,0]==end_sec)
-            seg_sec_reordered[j-1,i-1,:] = seg_sec[start_next[0],i-1,:]
-        fuse_sec_index.append(seg_sec[0,i-1,0])
-        for j in range(2,fuse_seg_nb[i-1]+1):
-            if (seg_sec_reordered[j-1,i-1,0] in fuse_sec_index) == False:
-                fuse_sec_index.append(seg_sec_reordered[j-1,i-1,0])
-        if (seg_sec_reordered[-1,i-1,1] in fuse_sec_index) == False:
-            fuse_sec_index.append(seg_sec_reordered[-1,i-1,1])
+                first_seg = j-1
+        (seg_ordered, fuse_sec_index) = order_segments(
+            seg_sec[0:fuse_seg_nb[i-1],i-1,:], first_seg)
+        seg_sec_reordered[0:fuse_seg_nb[i-1],i-1,:] = seg_ordered
         nb = np.shape(fuse_sec_index)
         if nb[0] > nbmax:
             nbmax = nb[0]
@@ -163,7 +157,7 @@ def rel_dist(i, sec_nb, seg_nb, tigl, seg_sec, start_index):
     return(rel_sec_dis[:,0],rel_sec_dis[:,1])
 
 
-def fuse_geom_eval(fus_nb, h_min, fuse_thick, F_FUEL, afg, cpacs_in):
+def fuse_geom_eval(fus_nb, h_min, fuse_thick, F_FUEL, afg, cpacs_in, session=None):
     """ Main function to evaluate the fuselage geometry
 
     Args:
@@ -176,6 +170,8 @@ def fuse_geom_eval(fus_nb, h_min, fuse_thick, F_FUEL, afg, cpacs_in):
         afg (class): AircraftGeometry class look at aircraft_geometry_class.py
                      in the classes folder for explanation.
         cpacs_in (str): Path to the CPACS file
+        session (class): CpacsSession to use, if None a read-only
+                         session is opened (and closed) for cpacs_in.
 
     Returns:
         afg (class): Updated aircraft_geometry class
@@ -185,9 +181,12 @@ def fuse_geom_eval(fus_nb, h_min, fuse_thick, F_FUEL, afg, cpacs_in):
     log.info('---------- Analysing fuselage geometry --------------------')
     log.info('-----------------------------------------------------------')
 
-    # Opening tixi and tigl
-    tixi = cpsf.open_tixi(cpacs_in)
-    tigl = cpsf.open_tigl(tixi)
+    # Opening tixi and tigl (or using the ones of the given session)
+    own_session = session is None
+    if own_session:
+        session = cpsf.CpacsSession(cpacs_in, read_only=True)
+    tixi = session.tixi
+    tigl = session.tigl
 
     #INITIALIZATION 1 ----------------------------------------------------------
     afg.fus_nb = fus_nb
@@ -247,36 +246,15 @@ def fuse_geom_eval(fus_nb, h_min, fuse_thick, F_FUEL, afg, cpacs_in):
             afg.fuse_center_section_point[j][i-1][0] = (fpx+fpx2) / 2
             afg.fuse_center_section_point[j][i-1][1] = (fpy+fpy2) / 2
             afg.fuse_center_section_point[j][i-1][2] = (fpz+fpz2) / 2
-            hw1 = 0.0
-            hw2 = 0.0
-            for zeta in np.arange(0.0, 1.0, 0.001):
-                (fpx,fpy,fpz) = tigl.fuselageGetPoint(i,k,1.0,zeta)
-                if abs(fpz-afg.fuse_center_section_point[j][i-1][2])< 0.01:
-                    if (fpy>afg.fuse_center_section_point[j][i-1][1] and hw1 == 0.0):
-                        hw1 = abs(fpy-afg.fuse_center_section_point[j][i-1][1])
-                        x1[j,i-1] = fpx
-                        y1[j,i-1] = fpy
-                        z1[j,i-1] = fpz
-                    elif (fpy<afg.fuse_center_section_point[j][i-1][1]\
-                          and hw2 == 0.0):
-                        hw2= abs(fpy-afg.fuse_center_section_point[j][i-1][1])
-                        x2[j,i-1] = fpx
-                        y2[j,i-1] = fpy
-                        z2[j,i-1] = fpz
-                        break
+            (hw1,hw2,(x1[j,i-1],y1[j,i-1],z1[j,i-1]),\
+             (x2[j,i-1],y2[j,i-1],z2[j,i-1]))\
+                = section_half_widths(tigl,i,k,1.0,\
+                                      afg.fuse_center_section_point[j][i-1])
             afg.fuse_sec_width[j][i-1] = hw1 + hw2
-            hh1 = 0.0
-            hh2 = 0.0
-            for zeta in np.arange(0.0, 1.0, 0.001):
-                (fpx,fpy,fpz) = tigl.fuselageGetPoint(i,k,1.0,zeta)
-                if abs(fpy-afg.fuse_center_section_point[j][i-1][1])< 0.01:
-                    if (fpz>afg.fuse_center_section_point[j][i-1][2]\
-                        and hh1 == 0.0):
-                        hh1 = abs(fpz-afg.fuse_center_section_point[j][i-1][2])
-                    elif (fpz<afg.fuse_center_section_point[j][i-1][2]\
-                          and hh2 == 0.0):
-                        hh2 = abs(fpz-afg.fuse_center_section_point[j][i-1][2])
-                        break
+            (hh1,hh2,p1,p2)\
+                = section_half_widths(tigl,i,k,1.0,\
+                                      afg.fuse_center_section_point[j][i-1],\
+                                      axis=2)
             afg.fuse_sec_height[j][i-1] = hh1 + hh2
             (fslpx,fslpy,fslpz) = tigl.fuselageGetPoint(1,k,0.0,0.0)
             (fslpx2,fslpy2,fslpz2) = tigl.fuselageGetPoint(1,k,1.0,0.0)
@@ -289,35 +267,15 @@ def fuse_geom_eval(fus_nb, h_min, fuse_thick, F_FUEL, afg, cpacs_in):
         afg.fuse_center_section_point[0][i-1][0] = (fpx+fpx2) / 2
         afg.fuse_center_section_point[0][i-1][1] = (fpy+fpy2) / 2
         afg.fuse_center_section_point[0][i-1][2] = (fpz+fpz2) / 2
-        hw1 = 0
-        hw2 = 0
-        for zeta in np.arange(0.0, 1.0, 0.001):
-            (fpx,fpy,fpz) = tigl.fuselageGetPoint(i,k,0.0,zeta)
-            if abs(fpz-afg.fuse_center_section_point[0][i-1][2])< 0.01:
-                if (fpy>afg.fuse_center_section_point[0][i-1][1] and hw1 ==0):
-                    hw1 = abs(fpy-afg.fuse_center_section_point[0][i-1][1])
-                    x1[0,i-1] = fpx
-                    y1[0,i-1] = fpy
-                    z1[0,i-1] = fpz
-                elif (fpy<afg.fuse_center_section_point[0][i-1][1] and hw2 ==0):
-                    hw2 = abs(fpy-afg.fuse_center_section_point[0][i-1][1])
-                    x2[0,i-1] = fpx
-                    y2[0,i-1] = fpy
-                    z2[0,i-1] = fpz
-                    break
+        (hw1,hw2,(x1[0,i-1],y1[0,i-1],z1[0,i-1]),\
+         (x2[0,i-1],y2[0,i-1],z2[0,i-1]))\
+            = section_half_widths(tigl,i,k,0.0,\
+                                  afg.fuse_center_section_point[0][i-1])
         afg.fuse_sec_width[0][i-1] = hw1 + hw2
-        hh1 = 0.0
-        hh2 = 0.0
-        for zeta in np.arange(0.0, 1.0, 0.001):
-            (fpx,fpy,fpz) = tigl.fuselageGetPoint(i,k,1.0,zeta)
-            if abs(fpy-afg.fuse_center_section_point[0][i-1][1])< 0.01:
-                if (fpz>afg.fuse_center_section_point[0][i-1][2]\
-                    and hh1 == 0.0):
-                    hh1 = abs(fpz-afg.fuse_center_section_point[0][i-1][2])
-                elif (fpz<afg.fuse_center_section_point[0][i-1][2]\
-                      and hh2 == 0.0):
-                    hh2 = abs(fpz-afg.fuse_center_section_point[0][i-1][2])
-                    break
+        (hh1,hh2,p1,p2)\
+            = section_half_widths(tigl,i,k,1.0,\
+                                  afg.fuse_center_section_point[0][i-1],\
+                                  axis=2)
         afg.fuse_sec_height[0][i-1] = hh1 + hh2
         afg.fuse_mean_width.append(round(np.mean(afg.fuse_sec_width[:,i-1]),3))
 
@@ -377,7 +335,15 @@ def fuse_geom_eval(fus_nb, h_min, fuse_thick, F_FUEL, afg, cpacs_in):
                 tail_length = afg.fuse_length[i-1] - cabin_length - nose_length
                 cabin_nb = 1
                 ex = True
-            while ex is False:
+            if ex is False:
+            # Largest width factor (from 1.3, by steps of 0.05) which gives a
+            # cabin length of at least 20% of the fuselage length
+                seg_nb = afg.fuse_seg_nb[i-1]
+                corr[i-1] = cabin_width_factor(\
+                    afg.fuse_sec_width[1:seg_nb+1,i-1],\
+                    afg.fuse_seg_length[0:seg_nb,i-1],\
+                    afg.fuse_mean_width[i-1], afg.fuse_length[i-1],\
+                    corr[i-1], h_min <= afg.fuse_sec_height[1:seg_nb+1,i-1])
                 c = False
                 cabin_seg[:] = 0
                 nose_length = 0
@@ -396,10 +362,6 @@ def fuse_geom_eval(fus_nb, h_min, fuse_thick, F_FUEL, afg, cpacs_in):
                         tail_length += afg.fuse_seg_length[j-1,i-1]
                     else:
                         nose_length += afg.fuse_seg_length[j-1,i-1]
-                if corr[i-1] > 0.0 and cabin_length < (0.20 * afg.fuse_length[i-1]):
-                    corr[i-1] -= 0.05
-                else:
-                    ex = True
             afg.fuse_nose_length[i-1] = round(nose_length,3)
             afg.fuse_fuel_vol[i-1] = 0
             afg.fuse_tail_length[i-1] = round(tail_length,3)
@@ -430,7 +392,8 @@ def fuse_geom_eval(fus_nb, h_min, fuse_thick, F_FUEL, afg, cpacs_in):
             afg.fuse_cabin_vol[i-1] = 0
             afg.cabin_area[i-1] = 0
 
-    cpsf.close_tixi(tixi, cpacs_in)
+    if own_session:
+        session.close()
 
     # log info display ------------------------------------------------------------
     log.info('-----------------------------------------------------------')
@@ -441,32 +404,32 @@ def fuse_geom_eval(fus_nb, h_min, fuse_thick, F_FUEL, afg, cpacs_in):
              + 'array ordered progressively')
     log.info('-----------------------------------------------------------')
     log.info('---------- Fuselage Results -------------------------------')
-    log.info('Number of fuselage [-]: ' + str(afg.fus_nb))
-    log.info('Number of fuselage sections [-]: ' + str(afg.fuse_sec_nb))
-    log.info('Number of fuselage segments [-]: ' + str(afg.fuse_seg_nb))
-    log.info('Cabin segments array [-]:\n' + str(cabin_seg))
-    log.info('Fuse Length [m]:\n' + str(afg.fuse_length))
-    log.info('Fuse nose Length [m]:\n' + str(afg.fuse_nose_length))
-    log.info('Fuse cabin Length [m]:\n' + str(afg.fuse_cabin_length))
-    log.info('Fuse tail Length [m]:\n' + str(afg.fuse_tail_length))
-    log.info('Aircraft Length [m]: ' + str(afg.tot_length))
-    log.info('Perimeter of each section of each fuselage [m]: \n'\
-            + str(afg.fuse_sec_per))
-    log.info('Relative distance of each section of each fuselage [m]: \n'\
-             + str(afg.fuse_sec_rel_dist))
-    log.info('Length of each segment of each fuselage [m]: \n'\
-             + str(afg.fuse_seg_length))
-    log.info('Mean fuselage width [m]: ' + str(afg.fuse_mean_width))
-    log.info('Width of each section of each fuselage [m]: \n'\
-             + str(afg.fuse_sec_width))
-    log.info('Cabin area [m^2]:\n' + str(afg.cabin_area))
-    log.info('Fuselage wetted surface [m^2]:\n' + str(afg.fuse_surface))
-    log.info('Volume of all the segmetns of each fuselage [m^3]: \n'\
-             + str(afg.fuse_seg_vol))
-    log.info('Volume of each cabin [m^3]:\n' + str(afg.fuse_cabin_vol))
-    log.info('Volume of each fuselage [m^3]:\n' + str(afg.fuse_vol))
-    log.info('Volume of fuel in each fuselage [m^3]:\n'\
-             + str(afg.fuse_fuel_vol))
+    log.info('Number of fuselage [-]: %s', afg.fus_nb)
+    log.info('Number of fuselage sections [-]: %s', afg.fuse_sec_nb)
+    log.info('Number of fuselage segments [-]: %s', afg.fuse_seg_nb)
+    log.info('Cabin segments array [-]:\n%s', cabin_seg)
+    log.info('Fuse Length [m]:\n%s', afg.fuse_length)
+    log.info('Fuse nose Length [m]:\n%s', afg.fuse_nose_length)
+    log.info('Fuse cabin Length [m]:\n%s', afg.fuse_cabin_length)
+    log.info('Fuse tail Length [m]:\n%s', afg.fuse_tail_length)
+    log.info('Aircraft Length [m]: %s', afg.tot_length)
+    log.info('Perimeter of each section of each fuselage [m]: \n%s',
+             afg.fuse_sec_per)
+    log.info('Relative distance of each section of each fuselage [m]: \n%s',
+             afg.fuse_sec_rel_dist)
+    log.info('Length of each segment of each fuselage [m]: \n%s',
+             afg.fuse_seg_length)
+    log.info('Mean fuselage width [m]: %s', afg.fuse_mean_width)
+    log.info('Width of each section of each fuselage [m]: \n%s',
+             afg.fuse_sec_width)
+    log.info('Cabin area [m^2]:\n%s', afg.cabin_area)
+    log.info('Fuselage wetted surface [m^2]:\n%s', afg.fuse_surface)
+    log.info('Volume of all the segmetns of each fuselage [m^3]: \n%s',
+             afg.fuse_seg_vol)
+    log.info('Volume of each cabin [m^3]:\n%s', afg.fuse_cabin_vol)
+    log.info('Volume of each fuselage [m^3]:\n%s', afg.fuse_vol)
+    log.info('Volume of fuel in each fuselage [m^3]:\n%s',
+             afg.fuse_fuel_vol)
     log.info('-----------------------------------------------------------')
 
     return(afg)
@@ -24,6 +24,7 @@ import math
 import ceasiompy.utils.cpacsfunctions as cpsf
 
 from ceasiompy.utils.ceasiomlogger import get_logger
+from ceasiompy.utils.WB.geometryfunctions import order_segments
 
 log = get_logger(__file__.split('.')[0])
 
@@ -79,13 +80,11 @@ def check_segment_connection(wing_plt_area_xz, wing_plt_area_yz, awg, tigl):
     # for horizontal wings, or z, for vertical wings position
     # The code works if a section is defined and not used and if the segments
     # are not define with a consequential order.
-    # WARNING The code does not work if a segment is defined
-    #         and then not used.
-    #         The aircraft should be designed along the x axis
+    # A segment defined and then not used is reported (order_segments).
+    # WARNING The aircraft should be designed along the x axis
     #         and on the x-y plane
 
     for i in range(1,awg.w_nb+1):
-        wing_sec_index = []
         for j in range(1,awg.wing_seg_nb[i-1]+1):
             (s0,e) = tigl.wingGetInnerSectionAndElementIndex(i,j)
             (s1,e) = tigl.wingGetOuterSectionAndElementIndex(i,j)
@@ -93,7 +92,7 @@ def check_segment_connection(wing_plt_area_xz, wing_plt_area_yz, awg, tigl):
             seg_sec[j-1,i-1,1] = s1
             seg_sec[j-1,i-1,2] = j
         (slpx,slpy,slpz) = tigl.wingGetChordPoint(i,1,0.0,0.0)
-        seg_sec_reordered[0,i-1,:] = seg_sec[0,i-1,:]
+        first_seg = 0
         start_index.append(1)
         for j in range(2,awg.wing_seg_nb[i-1]+1):
             (x,y,z) = tigl.wingGetChordPoint(i,j,1.0,0.0)
@@ -102,22 +101,15 @@ def check_segment_connection(wing_plt_area_xz, wing_plt_area_yz, awg, tigl):
                 if y < slpy:
                     (slpx,slpy,slpz) = (x,y,z)
                     start_index.append(j)
-                    seg_sec_reordered[0,i-1,:] = seg_sec[j-1,i-1,:]
+                    first_seg = j-1
             else:
                 if z < slpz:
                     (slpx,slpy,slpz) = (x,y,z)
                     start_index.append(j)
-                    seg_sec_reordered[0,i-1,:] = seg_sec[j-1,i-1,:]
-        for j in range(2,awg.wing_seg_nb[i-1]+1):
-            end_sec = seg_sec_reordered[j-2,i-1,1]
-            start_next = np.where(seg_sec[:,i-1,0] == end_sec)
-            seg_sec_reordered[j-1,i-1,:] = seg_sec[start_next[0],i-1,:]
-        wing_sec_index.append(seg_sec_reordered[0,0,0])
-        for j in range(2,awg.wing_seg_nb[i-1]+1):
-            if (seg_sec_reordered[j-1,i-1,0] in wing_sec_index) == False:
-                wing_sec_index.append(seg_sec_reordered[j-1,i-1,0])
-        if (seg_sec_reordered[j-1,i-1,1] in wing_sec_index) == False:
-            wing_sec_index.append(seg_sec_reordered[j-1,i-1,1])
+                    first_seg = j-1
+        (seg_ordered, wing_sec_index) = order_segments(
+            seg_sec[0:awg.wing_seg_nb[i-1],i-1,:], first_seg)
+        seg_sec_reordered[0:awg.wing_seg_nb[i-1],i-1,:] = seg_ordered
         nb = np.shape(wing_sec_index)
         if nb[0] > nbmax:
             nbmax = nb[0]
@@ -167,7 +159,7 @@ def get_wing_segment_length(awg, wing_center_section_point):
     return(awg)
 
 
-def wing_geom_eval(w_nb, TP,  awg, cpacs_in):
+def wing_geom_eval(w_nb, TP,  awg, cpacs_in, session=None):
     """ Main function to evaluate the wings geometry
 
     Args:
@@ -177,6 +169,8 @@ def wing_geom_eval(w_nb, TP,  awg, cpacs_in):
                      aircraft_geometry_class.py in the
                      classes folder for explanation.
         cpacs_in (str): Path to the CPACS file
+        session (class): CpacsSession to use, if None a read-only
+                         session is opened (and closed) for cpacs_in.
 
     Returns:
         awg (class): AircraftGeometry class updated.
@@ -186,9 +180,12 @@ def wing_geom_eval(w_nb, TP,  awg, cpacs_in):
     log.info('---------- Analysing wing geometry ------------------------')
     log.info('-----------------------------------------------------------')
 
-    # Opening tixi and tigl
-    tixi = cpsf.open_tixi(cpacs_in)
-    tigl = cpsf.open_tigl(tixi)
+    # Opening tixi and tigl (or using the ones of the given session)
+    own_session = session is None
+    if own_session:
+        session = cpsf.CpacsSession(cpacs_in, read_only=True)
+    tixi = session.tixi
+    tigl = session.tigl
 
 
     # INITIALIZATION 1 ---------------------------------------------------------
@@ -395,7 +392,8 @@ def wing_geom_eval(w_nb, TP,  awg, cpacs_in):
             c = True
             a += 1
 
-    cpsf.close_tixi(tixi, cpacs_in)
+    if own_session:
+        session.close()
 
     # log info display ---------------------------------------------------------
     log.info('-----------------------------------------------------------')
@@ -403,26 +401,26 @@ def wing_geom_eval(w_nb, TP,  awg, cpacs_in):
     log.info('---------- USEFUL INFO ------------------------------------')
     log.info('If wing number is greater than 1 the informations of each obj \
              are listed in an array ordered progressively')
-    log.info('Number of Wings [-]: ' + str(awg.wing_nb))
-    log.info('Wing symmetry plane [-]: ' + str(awg.wing_sym))
-    log.info('Number of wing sections (not counting symmetry) [-]: ' + str(awg.wing_sec_nb))
-    log.info('Number of wing segments (not counting symmetry) [-]: ' + str(awg.wing_seg_nb))
-    log.info('Wing Span (counting symmetry)[m]: \n' + str(awg.wing_span))
-    log.info('Wing MAC length [m]: ' + str(awg.wing_mac[0,]))
-    log.info('Wing MAC x,y,z coordinate [m]: \n' + str(awg.wing_mac[1:4,]))
-    log.info('Wings sections thicknes [m]: \n' + str(awg.wing_sec_thicknes))
-    log.info('Wings sections mean thicknes [m]: \n' + str(awg.wing_sec_mean_thick))
-    log.info('Wing segments length [m]: \n' + str(awg.wing_seg_length))
-    log.info('Wing max chord length [m]: \n' + str(awg.wing_max_chord))
-    log.info('Wing min chord length [m]: \n' + str(awg.wing_min_chord))
-    log.info('Main wing plantform area [m^2]: ' + str(awg.wing_plt_area_main))
-    log.info('Main wing wetted surface [m^2]: ' + str(awg.main_wing_surface))
-    log.info('Tail wings wetted surface [m^2]: \n' + str(awg.tail_wings_surface))
-    log.info('Wings plantform area [m^2]: \n' + str(awg.wing_plt_area))
-    log.info('Volume of each wing [m^3]: ' + str(awg.wing_vol))
-    log.info('Total wing volume [m^3]: ' + str(awg.wing_tot_vol))
-    log.info('Fuel volume in the wing [m^3]:' + str(awg.wing_fuel_vol))
-    log.info('Total fuel Volume [m^3]:' + str(awg.fuel_vol_tot))
+    log.info('Number of Wings [-]: %s', awg.wing_nb)
+    log.info('Wing symmetry plane [-]: %s', awg.wing_sym)
+    log.info('Number of wing sections (not counting symmetry) [-]: %s', awg.wing_sec_nb)
+    log.info('Number of wing segments (not counting symmetry) [-]: %s', awg.wing_seg_nb)
+    log.info('Wing Span (counting symmetry)[m]: \n%s', awg.wing_span)
+    log.info('Wing MAC length [m]: %s', awg.wing_mac[0,])
+    log.info('Wing MAC x,y,z coordinate [m]: \n%s', awg.wing_mac[1:4,])
+    log.info('Wings sections thicknes [m]: \n%s', awg.wing_sec_thicknes)
+    log.info('Wings sections mean thicknes [m]: \n%s', awg.wing_sec_mean_thick)
+    log.info('Wing segments length [m]: \n%s', awg.wing_seg_length)
+    log.info('Wing max chord length [m]: \n%s', awg.wing_max_chord)
+    log.info('Wing min chord length [m]: \n%s', awg.wing_min_chord)
+    log.info('Main wing plantform area [m^2]: %s', awg.wing_plt_area_main)
+    log.info('Main wing wetted surface [m^2]: %s', awg.main_wing_surface)
+    log.info('Tail wings wetted surface [m^2]: \n%s', awg.tail_wings_surface)
+    log.info('Wings plantform area [m^2]: \n%s', awg.wing_plt_area)
+    log.info('Volume of each wing [m^3]: %s', awg.wing_vol)
+    log.info('Total wing volume [m^3]: %s', awg.wing_tot_vol)
+    log.info('Fuel volume in the wing [m^3]:%s', awg.wing_fuel_vol)
+    log.info('Total fuel Volume [m^3]:%s', awg.fuel_vol_tot)
     log.info('-----------------------------------------------------------')
 
     return(awg)
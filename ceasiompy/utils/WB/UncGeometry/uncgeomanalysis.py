@@ -34,6 +34,8 @@ from .WithFuseGeom.Fuselages.fusegeom import fuse_geom_eval
 from .Output.outputgeom import produce_geom_output_txt
 
 import ceasiompy.utils.cpacsfunctions as cpsf
+from ceasiompy.utils.WB.geometrycache import get_geometry_cache
+from ceasiompy.utils.WB.geometryexport import export_geometry
 
 from ceasiompy.utils.ceasiomlogger import get_logger
 
@@ -52,11 +54,13 @@ log = get_logger(__file__.split('.')[0])
 #   FUNCTIONS
 #=============================================================================
 
-def get_number_of_parts(cpacs_in):
+def get_number_of_parts(cpacs_in, session=None):
     """ The fuction counts the number of fuselage and wings.
 
     Args:
         cpacs_in (str): Path to the CPACS file.
+        session (class): CpacsSession to use, if None the CPACS file is
+                         opened (and closed).
 
     Retrurns:
         fus_nb (int): Number of fuselages.
@@ -64,7 +68,10 @@ def get_number_of_parts(cpacs_in):
 
     """
 
-    tixi = cpsf.open_tixi(cpacs_in)
+    own_session = session is None
+    if own_session:
+        session = cpsf.CpacsSession(cpacs_in, read_only=True)
+    tixi = session.tixi
 
     if tixi.checkElement('/cpacs/vehicles/aircraft/model/fuselages'):
         fus_nb = tixi.getNamedChildrenCount('/cpacs/vehicles/aircraft/model/fuselages','fuselage')
@@ -76,12 +83,14 @@ def get_number_of_parts(cpacs_in):
     else:
         wing_nb = 0
 
-    cpsf.close_tixi(tixi, cpacs_in)
+    if own_session:
+        session.close()
 
     return(fus_nb, wing_nb)
 
 
-def no_fuse_geom_analysis(cpacs_in, FLOOR_NB, wing_nb, h_min, FUEL_ON_CABIN, NAME, TP):
+def no_fuse_geom_analysis(cpacs_in, FLOOR_NB, wing_nb, h_min, FUEL_ON_CABIN, NAME, TP,
+                          use_cache=True, export_path=None):
     """ The fuction evaluates the geometry of an aircraft realized without
         fuselage, like the blended wing body.
 
@@ -93,6 +102,12 @@ def no_fuse_geom_analysis(cpacs_in, FLOOR_NB, wing_nb, h_min, FUEL_ON_CABIN, NAM
         FUEL_ON_CABIN (float): Percentage of fuel inside cabin segments.
         NAME (str): Name of the aircraft.
         TP (boolean): True if the aircraft is a turboprop.
+        use_cache (boolean): If True (default) the result is read from (or
+                             stored in) the geometry cache, see
+                             geometrycache.py.
+        export_path (str): If given, the results are appended to this
+                           .jsonl, .npz or Parquet export, see
+                           geometryexport.py.
 
     Retrurns:
         wing_nodes(float-array): 3D array containing the nodes coordinates (x,y,z)[m,m,m].
@@ -100,16 +115,35 @@ def no_fuse_geom_analysis(cpacs_in, FLOOR_NB, wing_nb, h_min, FUEL_ON_CABIN, NAM
                      classes folder for explanation.
 
     """
-    awg = AircraftWingGeometry()
-    awg = geom_eval(wing_nb, awg, cpacs_in)
-    (awg, wing_nodes) = wing_check_thickness(h_min, awg, cpacs_in,\
-                                             TP, FUEL_ON_CABIN)
+    # One session (one parse and one TIGL build) for the whole analysis,
+    # released even if the analysis fails
+    with cpsf.CpacsSession(cpacs_in, read_only=True) as session:
+        result = None
+        if use_cache:
+            cache = get_geometry_cache()
+            key = cache.key(session.tixi, 'no_fuse_geom_analysis', wing_nb,
+                            h_min, FUEL_ON_CABIN, TP)
+            result = cache.get(key)
+
+        if result is None:
+            awg = AircraftWingGeometry()
+            awg = geom_eval(wing_nb, awg, cpacs_in, session)
+            result = wing_check_thickness(h_min, awg, cpacs_in,\
+                                          TP, FUEL_ON_CABIN, session)
+            result[0].compact()
+            if use_cache:
+                cache.put(key, result)
+    (awg, wing_nodes) = result
+
     produce_wing_output_txt(awg, NAME)
+    if export_path:
+        export_geometry(export_path, NAME, {'wing.': awg})
 
     return(awg, wing_nodes)
 
 
-def with_fuse_geom_analysis(cpacs_in, fus_nb, wing_nb, h_min, adui, TP, F_FUEL, NAME):
+def with_fuse_geom_analysis(cpacs_in, fus_nb, wing_nb, h_min, adui, TP, F_FUEL, NAME,
+                            use_cache=True, export_path=None):
     """ The fuction evaluates the geometry of an aircraft realized without
         fuselage.
 
@@ -122,6 +156,12 @@ def with_fuse_geom_analysis(cpacs_in, fus_nb, wing_nb, h_min, adui, TP, F_FUEL,
         TP (boolean): True if the aircraft is a turboprop.
         F_FUEL (boolean-array): True if the corresponding fuselage can contain fuel.
         NAME (str): Name of the aircraft.
+        use_cache (boolean): If True (default) the result is read from (or
+                             stored in) the geometry cache, see
+                             geometrycache.py.
+        export_path (str): If given, the results are appended to this
+                           .jsonl, .npz or Parquet export, see
+                           geometryexport.py.
 
     Returns:
         awg (class): AircraftWingGeometry class look at aircraft_geometry_class.py
@@ -130,12 +170,30 @@ def with_fuse_geom_analysis(cpacs_in, fus_nb, wing_nb, h_min, adui, TP, F_FUEL,
                      in the classes folder for explanation.
     """
 
-    awg = AircraftWingGeometry()
-    afg = AircraftFuseGeometry(fus_nb)
+    # One session (one parse and one TIGL build) for the whole analysis,
+    # released even if the analysis fails
+    with cpsf.CpacsSession(cpacs_in, read_only=True) as session:
+        result = None
+        if use_cache:
+            cache = get_geometry_cache()
+            key = cache.key(session.tixi, 'with_fuse_geom_analysis', fus_nb,
+                            wing_nb, h_min, adui.VRT_THICK, TP, F_FUEL)
+            result = cache.get(key)
+
+        if result is None:
+            awg = AircraftWingGeometry()
+            afg = AircraftFuseGeometry(fus_nb)
+            awg = wing_geom_eval(wing_nb, TP, awg, cpacs_in, session)
+            afg = fuse_geom_eval(fus_nb, h_min, adui.VRT_THICK, F_FUEL, afg,
+                                 cpacs_in, session)
+            result = (afg.compact(), awg.compact())
+            if use_cache:
+                cache.put(key, result)
+    (afg, awg) = result
 
-    awg = wing_geom_eval(wing_nb, TP, awg, cpacs_in)
-    afg = fuse_geom_eval(fus_nb, h_min, adui.VRT_THICK, F_FUEL, afg, cpacs_in)
     produce_geom_output_txt(afg, awg, NAME)
+    if export_path:
+        export_geometry(export_path, NAME, {'fuse.': afg, 'wing.': awg})
 
     return(afg, awg)
 
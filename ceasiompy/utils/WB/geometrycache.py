@@ -0,0 +1,253 @@
+"""
+CEASIOMpy: Conceptual Aircraft Design Software
+
+Developed for CFS ENGINEERING, 1015 Lausanne, Switzerland
+
+On-disk cache of the geometry analysis results. The results are stored with a
+key made of the hash of the CPACS geometry (the 'vehicles' branch), the cache
+version, the versions of the TIXI and TIGL libraries and the analysis
+arguments, so an unchanged aircraft is never analysed twice.
+
+The cache is used by default by the analysis functions ('use_cache=False' to
+bypass it). The cached results are read with pickle, the cache directory must
+only be writable by trusted users.
+
+Python version: >=3.6
+
+| Author : CEASIOMpy contributors
+| Creation: 2026-10-18
+| Last modifiction: 2026-10-18
+
+"""
+
+#==============================================================================
+#   IMPORTS
+#==============================================================================
+
+import os
+import hashlib
+import pickle
+import tempfile
+from functools import lru_cache
+
+try:
+    from lxml import etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+from ceasiompy.utils.ceasiomlogger import get_logger
+from ceasiompy.utils.cpacsfunctions import tixi3wrapper, tigl3wrapper
+from ceasiompy.utils.profiling import unwrap_handle
+from ceasiompy.utils.xmlbackend import LxmlTixi
+
+log = get_logger(__file__.split('.')[0])
+
+
+#==============================================================================
+#   CONSTANTS
+#==============================================================================
+
+# Must be changed each time the geometry analysis gives different results,
+# all the results cached with another version are then ignored
+CACHE_VERSION = '4'
+
+# Cache directory and maximum size [byte], can be set with the environment
+# variables CEASIOMPY_GEOMETRY_CACHE and CEASIOMPY_GEOMETRY_CACHE_SIZE
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache',
+                                 'ceasiompy', 'geometry')
+DEFAULT_MAX_SIZE = 256 * 1024**2
+
+
+#==============================================================================
+#   CLASSES
+#==============================================================================
+
+class GeometryCache:
+    """ Class to store geometry analysis results on disk.
+
+    Each result is pickled in its own file named after its key. Reading a
+    result updates the modification time of its file, and when the total
+    size of the cache exceeds 'max_size' the least recently used files are
+    removed.
+
+    Attributes:
+        cache_dir (str): Directory of the cache files
+        max_size (int): Maximum total size of the cache files [byte]
+
+    """
+
+    def __init__(self, cache_dir=None, max_size=None):
+        if cache_dir is None:
+            cache_dir = os.environ.get('CEASIOMPY_GEOMETRY_CACHE',
+                                       DEFAULT_CACHE_DIR)
+        if max_size is None:
+            max_size = int(os.environ.get('CEASIOMPY_GEOMETRY_CACHE_SIZE',
+                                          DEFAULT_MAX_SIZE))
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    def key(self, tixi, *args):
+        """ Return the cache key of a geometry analysis.
+
+        Only the 'vehicles' branch of the document is hashed, a change
+        outside of it (header, toolspecific...) gives the same key. The
+        branch of an LxmlTixi is serialised from its tree, the document of a
+        TIXI handle is exported and parsed first.
+
+        Args:
+            tixi (handles): TIXI Handle of the CPACS file
+            *args: Analysis name and arguments which change its result
+
+        Returns:
+            key (str): Hexadecimal SHA-256 digest
+        """
+
+        digest = hashlib.sha256()
+        digest.update(CACHE_VERSION.encode())
+        digest.update(repr(library_versions()).encode())
+        digest.update(repr(args).encode())
+        if isinstance(unwrap_handle(tixi), LxmlTixi):
+            vehicles = tixi.root.find('vehicles')
+        else:
+            root = etree.fromstring(tixi.exportDocumentAsString().encode())
+            vehicles = root.find('vehicles')
+        if vehicles is not None:
+            # The text after the branch is not part of it
+            (tail, vehicles.tail) = (vehicles.tail, None)
+            digest.update(etree.tostring(vehicles))
+            vehicles.tail = tail
+
+        return digest.hexdigest()
+
+    def get(self, key):
+        """ Return the cached result of a key, None if it is not cached. """
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            log.warning('Geometry cache file %s cannot be read, it will be '
+                        'replaced.', path)
+            self._remove(path)
+            return None
+
+        # Used files are the last ones to be evicted
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        log.info('Geometry analysis result read from the cache.')
+        return result
+
+    def put(self, key, result):
+        """ Store the result of a key and evict the oldest results. """
+
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            # Written in a temporary file first, so a concurrent process
+            # never reads a partial file
+            (fd, tmp_path) = tempfile.mkstemp(dir=self.cache_dir,
+                                              suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            log.warning('Geometry analysis result cannot be cached: %s', e)
+            if tmp_path is not None:
+                self._remove(tmp_path)
+            return
+
+        self.evict()
+
+    def evict(self):
+        """ Remove the least recently used files above the maximum size. """
+
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.pkl'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(entry[1] for entry in entries)
+        for (mtime, size, path) in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            self._remove(path)
+            total_size -= size
+
+    def clear(self):
+        """ Remove all the cached results. """
+
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                self._remove(os.path.join(self.cache_dir, name))
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.pkl')
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+#==============================================================================
+#   FUNCTIONS
+#==============================================================================
+
+_geometry_cache = None
+
+
+@lru_cache(maxsize=None)
+def library_versions():
+    """ Return the versions of the TIXI and TIGL libraries (None if missing).
+
+    The version of a library is the one of its installed distribution, or
+    the size and modification time of its wrapper if it is not found.
+    """
+
+    return (_library_version(tixi3wrapper, ('tixi3', 'tixi')),
+            _library_version(tigl3wrapper, ('tigl3', 'tigl', 'cpacscreator')))
+
+
+def _library_version(module, dist_names):
+    if module is None:
+        return None
+    version = getattr(module, '__version__', None)
+    if version is not None:
+        return str(version)
+    try:
+        from importlib import metadata
+    except ImportError:
+        metadata = None
+    if metadata is not None:
+        for name in dist_names:
+            try:
+                return metadata.version(name)
+            except metadata.PackageNotFoundError:
+                pass
+    stat = os.stat(module.__file__)
+    return '{}:{}:{}'.format(module.__file__, stat.st_size, stat.st_mtime_ns)
+
+
+def get_geometry_cache():
+    """ Return the geometry cache shared by the analysis functions. """
+
+    global _geometry_cache
+    if _geometry_cache is None:
+        _geometry_cache = GeometryCache()
+    return _geometry_cache
@@ -0,0 +1,310 @@
+"""
+CEASIOMpy: Conceptual Aircraft Design Software
+
+Developed for CFS ENGINEERING, 1015 Lausanne, Switzerland
+
+Structured export of the geometry analysis results. Each evaluated aircraft
+is one record (one row) with a column for every attribute of its geometry
+classes. Records are appended to JSON Lines files, Parquet datasets or .npz
+tables, which can all be loaded in a pandas DataFrame with
+'read_geometry_table'.
+
+Python version: >=3.6
+
+| Author : CEASIOMpy contributors
+| Creation: 2026-10-18
+| Last modifiction: 2026-10-18
+
+"""
+
+#==============================================================================
+#   IMPORTS
+#==============================================================================
+
+import json
+import os
+import time
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+from ceasiompy.utils.ceasiomlogger import get_logger
+from ceasiompy.utils.InputClasses.geometrystorageclass import RaggedArray
+
+log = get_logger(__file__.split('.')[0])
+
+
+#==============================================================================
+#   CONSTANTS
+#==============================================================================
+
+# Export formats, found from the extension of the output path
+EXPORT_FORMATS = ('jsonl', 'npz', 'parquet')
+
+
+#==============================================================================
+#   FUNCTIONS
+#==============================================================================
+
+def geometry_record(name, geometries):
+    """ Return the record (one row) of an evaluated aircraft.
+
+    Args:
+        name (str): Name of the aircraft
+        geometries (dict): Geometry objects of the aircraft with the prefix
+                           of their columns, e.g. {'': ag} for a conventional
+                           aircraft, {'fuse.': afg, 'wing.': awg} otherwise
+
+    Returns:
+        record (dict): Column names and values, the arrays as (nested) lists
+    """
+
+    record = {'name': name}
+    for (prefix, geometry) in geometries.items():
+        for attr in geometry._slot_names():
+            if hasattr(geometry, attr):
+                record[prefix + attr] = _column_value(getattr(geometry, attr))
+    return record
+
+
+def export_format(path):
+    """ Return the export format of a path from its extension.
+
+    A path without extension is a Parquet dataset (directory).
+    """
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.jsonl', '.json'):
+        return 'jsonl'
+    if ext == '.npz':
+        return 'npz'
+    if ext in ('.parquet', ''):
+        return 'parquet'
+    raise ValueError('Unknown geometry export format: ' + path
+                     + ', use one of ' + str(EXPORT_FORMATS))
+
+
+def export_geometry(path, name, geometries):
+    """ Append the record of an evaluated aircraft to an export file.
+
+    Args:
+        path (str): Path of the .jsonl file, .npz file or Parquet dataset
+        name (str): Name of the aircraft
+        geometries (dict): Geometry objects, see geometry_record
+    """
+
+    record = geometry_record(name, geometries)
+    fmt = export_format(path)
+    if fmt == 'jsonl':
+        append_jsonl(path, [record])
+    elif fmt == 'npz':
+        append_npz(path, [record])
+    else:
+        append_parquet(path, [record])
+    log.info('Geometry of %s exported to %s', name, path)
+
+
+def append_jsonl(path, records):
+    """ Append records to a JSON Lines file, one line per record. """
+
+    with open(path, 'a') as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+def append_parquet(path, records):
+    """ Append records to a Parquet dataset.
+
+    The dataset is a directory, each call writes its records in a new file
+    of the directory, so nothing already written is read or rewritten.
+    'pandas.read_parquet' reads the whole directory.
+
+    Args:
+        path (str): Directory of the dataset
+        records (list): Records to append
+    """
+
+    if pd is None:
+        raise ImportError('pandas (and pyarrow) are required to export to '
+                          'Parquet')
+
+    os.makedirs(path, exist_ok=True)
+    part = 'part-{}-{}.parquet'.format(time.time_ns(), os.getpid())
+    pd.DataFrame(records).to_parquet(os.path.join(path, part), index=False)
+
+
+def write_npz(path, records):
+    """ Write records to a columnar .npz table.
+
+    A column of scalars is one array with a value per record. A column of
+    arrays is stored in ragged form: the flattened values of all the records
+    ('col__data'), the start of each record ('col__offsets') and the shape of
+    each array ('col__shape', padded with -1, and 'col__ndim').
+
+    Records may not have all the columns (e.g. an attribute not set, or
+    conventional and unconventional aircraft in the same table). The
+    missing values are then marked in 'col__missing' and stored as NaN
+    (floats), 0, '' or an empty array. Columns which can only be stored as
+    Python objects (pickled) are rejected.
+
+    Args:
+        path (str): Path of the .npz file
+        records (list): Records to write
+    """
+
+    arrays = {}
+    for column in _columns(records):
+        missing = np.array([record.get(column) is None for record in records])
+        present = [record[column] for record in records
+                   if record.get(column) is not None]
+
+        if all(np.ndim(value) == 0 for value in present):
+            dtype = np.asarray(present).dtype
+            if dtype.kind == 'f':
+                fill = np.nan
+            else:
+                fill = np.zeros((), dtype=dtype).item()
+            values = [fill if m else record[column]
+                      for (m, record) in zip(missing, records)]
+            arrays[column] = _checked_array(column, values, dtype)
+        else:
+            values = [np.zeros(0) if m else np.asarray(record[column])
+                      for (m, record) in zip(missing, records)]
+            ragged = RaggedArray.from_list([value.ravel()
+                                            for value in values])
+            ndim = np.array([value.ndim for value in values])
+            shape = -np.ones((len(values), max(1, np.amax(ndim))),
+                             dtype=np.int64)
+            for (i, value) in enumerate(values):
+                shape[i,:value.ndim] = value.shape
+            arrays[column + '__data'] = _checked_array(column, ragged.data)
+            arrays[column + '__offsets'] = ragged.offsets
+            arrays[column + '__shape'] = shape
+            arrays[column + '__ndim'] = ndim
+
+        if missing.any():
+            arrays[column + '__missing'] = missing
+
+    np.savez(path, **arrays)
+
+
+def read_npz(path):
+    """ Read the columns of a .npz table written by 'write_npz'.
+
+    Returns:
+        columns (dict): Array of each column of scalars, list of the arrays
+                        of each record for the columns of arrays. The
+                        columns with missing values are lists, with None
+                        for the missing values.
+    """
+
+    columns = {}
+    with np.load(path) as npz:
+        for name in npz.files:
+            if name.endswith('__data'):
+                column = name[:-len('__data')]
+                ragged = RaggedArray(npz[name], npz[column + '__offsets'])
+                shapes = npz[column + '__shape']
+                ndims = npz[column + '__ndim']
+                columns[column] = [values.reshape(shape[:ndim])
+                                   for (values, shape, ndim)
+                                   in zip(ragged, shapes, ndims)]
+            elif not name.endswith(('__offsets', '__shape', '__ndim',
+                                    '__missing')):
+                columns[name] = npz[name]
+
+        for name in npz.files:
+            if name.endswith('__missing'):
+                column = name[:-len('__missing')]
+                columns[column] = [None if m else value for (m, value)
+                                   in zip(npz[name], columns[column])]
+    return columns
+
+
+def append_npz(path, records):
+    """ Append records to a .npz table.
+
+    A .npz file cannot be extended, the table is read and written again
+    with the new records. To append aircraft one by one to large tables use
+    JSON Lines or Parquet.
+    """
+
+    if os.path.exists(path):
+        columns = read_npz(path)
+        nb = len(next(iter(columns.values()))) if columns else 0
+        old = [{column: _column_value(values[i])
+                for (column, values) in columns.items()} for i in range(nb)]
+        records = old + list(records)
+    write_npz(path, records)
+
+
+def read_geometry_table(path):
+    """ Load a geometry export (JSON Lines, .npz or Parquet) in a DataFrame.
+
+    Args:
+        path (str): Path of the .jsonl file, .npz file or Parquet dataset
+
+    Returns:
+        table (DataFrame): One row per aircraft, one column per attribute
+    """
+
+    if pd is None:
+        raise ImportError('pandas is required to read geometry tables')
+
+    fmt = export_format(path)
+    if fmt == 'jsonl':
+        return pd.read_json(path, lines=True)
+    if fmt == 'npz':
+        return pd.DataFrame(read_npz(path))
+    return pd.read_parquet(path)
+
+
+def _column_value(value):
+    """ Return a value with only Python types (numpy arrays as lists). """
+
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        try:
+            array = np.asarray(value)
+        except ValueError:
+            # Values with different shapes
+            array = None
+        if array is not None and array.dtype != object:
+            return array.tolist()
+        return [_column_value(v) for v in value]
+    return value
+
+
+def _checked_array(column, values, dtype=None):
+    """ Return the values of a column as an array, which must not be of
+    Python objects (they could only be pickled in the .npz file).
+    """
+
+    array = np.asarray(values, dtype=dtype)
+    if array.dtype == object:
+        raise TypeError('Column ' + column + ' cannot be stored in a .npz '
+                        'table: its values are not numbers or strings')
+    return array
+
+
+def _columns(records):
+    """ Return the column names of records, in order of first appearance. """
+
+    columns = {}
+    for record in records:
+        columns.update(dict.fromkeys(record))
+    return list(columns)
+
+
+#==============================================================================
+#    MAIN
+#==============================================================================
+
+if __name__ == '__main__':
+
+    log.info('Nothing to execute!')
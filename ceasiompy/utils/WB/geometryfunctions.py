@@ -0,0 +1,292 @@
+"""
+CEASIOMpy: Conceptual Aircraft Design Software
+
+Developed for CFS ENGINEERING, 1015 Lausanne, Switzerland
+
+Functions shared by the conventional and unconventional geometry analysis.
+
+Python version: >=3.6
+
+| Author : CEASIOMpy contributors
+| Creation: 2026-10-18
+| Last modifiction: 2026-10-18
+
+"""
+
+#==============================================================================
+#   IMPORTS
+#==============================================================================
+
+import functools
+
+import numpy as np
+
+from ceasiompy.utils.ceasiomlogger import get_logger
+
+log = get_logger(__file__.split('.')[0])
+
+
+#==============================================================================
+#   CONSTANTS
+#==============================================================================
+
+# Number of zeta samples used to bracket the crossings of a section profile
+ZETA_SAMPLES = 64
+
+# Tolerance [m] on the distance to the center plane of a refined crossing
+CROSSING_TOL = 1e-4
+
+# Maximum number of bisections for one crossing
+MAX_BISECTIONS = 60
+
+# Number of sub-intervals of a zeta interval which can hide two crossings
+FINE_SAMPLES = 16
+
+# Factors of the (x, y, z) coordinates of the image of a point by the
+# symmetry plane of a part, indexed by the TIGL symmetry code
+# (0: no symmetry, 1: x-y, 2: x-z, 3: y-z plane)
+SYMMETRY_FACTORS = np.array([[1.0, 1.0, 1.0],
+                             [1.0, 1.0, -1.0],
+                             [1.0, -1.0, 1.0],
+                             [-1.0, 1.0, 1.0]])
+
+
+#==============================================================================
+#   FUNCTIONS
+#==============================================================================
+
+def section_half_widths(tigl, fus_nb, seg_index, eta, center, axis=1,
+                        n_samples=None, tol=None):
+    """ Function to evaluate the half widths of a fuselage section
+
+    The profile of the section is sampled at 'n_samples' zeta and each change
+    of sign of its distance to the center plane is refined by bisection. An
+    interval whose end points are on the same side of the plane can still
+    hide two crossings if the profile is long enough between them to reach
+    the plane and come back (sum of the distances of the end points smaller
+    than the distance between them). Such an interval is sampled again at
+    FINE_SAMPLES sub-intervals. Like the previous 1000 points zeta scan, the
+    first crossing on the positive side is kept, then the first crossing on
+    the negative side ends the search.
+
+    Args:
+        tigl (handle): TIGL handle
+        fus_nb (int): Index of the fuselage
+        seg_index (int): Index of the segment
+        eta (float): Position along the segment (0.0 start, 1.0 end section)
+        center (float-array): Center point (x, y, z) of the section
+        axis (int): Axis of the half widths, 1 for the width (crossings of
+                    the z center plane), 2 for the height (crossings of the
+                    y center plane)
+        n_samples (int): Number of zeta samples, ZETA_SAMPLES if None
+        tol (float): Tolerance [m] on the distance to the center plane of
+                     each crossing, CROSSING_TOL if None
+
+    Returns:
+        hw1 (float): Half width on the positive side of the axis [m]
+        hw2 (float): Half width on the negative side of the axis [m]
+        point1 (tuple): Crossing point (x, y, z) of hw1, zeros if not found
+        point2 (tuple): Crossing point (x, y, z) of hw2, zeros if not found
+    """
+
+    if n_samples is None:
+        n_samples = ZETA_SAMPLES
+    if tol is None:
+        tol = CROSSING_TOL
+
+    plane = 3 - axis
+
+    # The end points of a refined interval are not evaluated again
+    @functools.lru_cache(maxsize=None)
+    def get_point(zeta):
+        point = tigl.fuselageGetPoint(fus_nb, seg_index, eta, zeta)
+        return (point[plane] - center[plane], point)
+
+    hw1 = 0.0
+    hw2 = 0.0
+    point1 = (0.0, 0.0, 0.0)
+    point2 = (0.0, 0.0, 0.0)
+    zetas = np.linspace(0.0, 1.0, n_samples + 1)
+    for point in _crossings(get_point, zetas, tol, refine=True):
+        offset = point[axis] - center[axis]
+        if (offset > 0.0 and hw1 == 0.0):
+            hw1 = abs(offset)
+            point1 = point
+        elif (offset < 0.0 and hw2 == 0.0):
+            hw2 = abs(offset)
+            point2 = point
+            break
+
+    return(hw1, hw2, point1, point2)
+
+
+def _crossings(get_point, zetas, tol, refine):
+    """ Generator of the crossings of the center plane, in the zeta order
+
+    The profile is evaluated lazily, the search can stop at any crossing.
+
+    A sample closer to the plane than the tolerance is a crossing.
+
+    Args:
+        get_point (function): Returns (distance, point) for a zeta
+        zetas (float-array): Zeta samples, in increasing order
+        tol (float): Tolerance [m] on the distance to the center plane
+        refine (bool): If True, the intervals which can hide two crossings
+                       are sampled again at FINE_SAMPLES sub-intervals
+
+    Yields:
+        point (tuple): Crossing point (x, y, z)
+    """
+
+    (d0, p0) = get_point(zetas[0])
+    for k in range(len(zetas) - 1):
+        (d1, p1) = get_point(zetas[k+1])
+        if abs(d0) < tol:
+            yield p0
+        elif d0 * d1 < 0.0:
+            yield _bisect_crossing(get_point, zetas[k], zetas[k+1], d0, tol)
+        elif (refine
+              and abs(d0) + abs(d1) < np.linalg.norm(np.subtract(p1, p0))):
+            sub_zetas = np.linspace(zetas[k], zetas[k+1], FINE_SAMPLES + 1)
+            yield from _crossings(get_point, sub_zetas, tol, False)
+        (d0, p0) = (d1, p1)
+
+
+def _bisect_crossing(get_point, zeta_a, zeta_b, d_a, tol):
+    """ Function to refine a crossing of the center plane by bisection
+
+    Args:
+        get_point (function): Returns (distance, point) for a zeta
+        zeta_a (float): Zeta on one side of the crossing
+        zeta_b (float): Zeta on the other side of the crossing
+        d_a (float): Distance to the center plane at zeta_a
+        tol (float): Tolerance [m] on the distance to the center plane
+
+    Returns:
+        point (tuple): Crossing point (x, y, z)
+    """
+
+    for _ in range(MAX_BISECTIONS):
+        zeta = (zeta_a + zeta_b) / 2
+        (d, point) = get_point(zeta)
+        if abs(d) < tol:
+            break
+        if d_a * d < 0.0:
+            zeta_b = zeta
+        else:
+            (zeta_a, d_a) = (zeta, d)
+
+    return point
+
+
+def order_segments(seg_sec, first_seg=0):
+    """ Function to order the segments of a fuselage or a wing
+
+    The segments are chained from the first one, the next segment being the
+    one which starts at the end section of the previous one. The segments are
+    indexed once by start section, so the chain is followed in linear time.
+
+    A section which starts several segments keeps the first one defined, the
+    other ones are reported. If the chain stops before all the segments are
+    used (segment defined and not used, or several separated chains), the
+    remaining segments are reported and chained from the first remaining one,
+    so every segment is still in the result.
+
+    Args:
+        seg_sec (float-array): Start section, end section and segment index
+                               of each segment, shape (seg_nb, 3)
+        first_seg (int): Row of seg_sec of the first segment
+
+    Returns:
+        seg_sec_ordered (float-array): seg_sec rows in the chain order
+        sec_index (list): Section indices in the chain order
+    """
+
+    seg_nb = np.shape(seg_sec)[0]
+
+    next_seg = {}
+    for k in range(seg_nb):
+        start = seg_sec[k, 0]
+        if start in next_seg:
+            log.warning('Segments %d and %d both start at section %d, only '
+                        'the first one is chained.',
+                        seg_sec[next_seg[start], 2], seg_sec[k, 2], start)
+        else:
+            next_seg[start] = k
+
+    order = []
+    used = np.zeros(seg_nb, dtype=bool)
+    k = first_seg
+    while len(order) < seg_nb:
+        if k is None or used[k]:
+            k = int(np.argmin(used))
+            log.warning('Segment %d is not connected to the previous '
+                        'segments.', seg_sec[k, 2])
+        order.append(k)
+        used[k] = True
+        k = next_seg.get(seg_sec[k, 1])
+
+    seg_sec_ordered = seg_sec[order, :]
+
+    sec_index = [seg_sec_ordered[0, 0]]
+    known = set(sec_index)
+    for sec in list(seg_sec_ordered[1:, 0]) + [seg_sec_ordered[-1, 1]]:
+        if sec not in known:
+            known.add(sec)
+            sec_index.append(sec)
+
+    return(seg_sec_ordered, sec_index)
+
+
+def cabin_width_factor(sec_width, seg_length, mean_width, fuse_length, corr,
+                       eligible=None, step=0.05, min_ratio=0.20):
+    """ Function to find the cabin width factor of a fuselage
+
+    The cabin is made of the segments whose end section width is at least
+    corr * mean_width. Starting from 'corr', the factor was lowered by 'step'
+    and all the segments scanned again until the cabin length reached
+    min_ratio * fuse_length (or the factor reached 0). Here the widths are
+    sorted once with the cumulative length of the segments above each
+    width, the cabin length of every factor the loop would try is then
+    found with one 'searchsorted' and the first factor which stops the loop
+    is returned.
+
+    Args:
+        sec_width (float-array): Width of the end section of each segment [m]
+        seg_length (float-array): Length of each segment [m]
+        mean_width (float): Mean width of the fuselage [m]
+        fuse_length (float): Length of the fuselage [m]
+        corr (float): Starting width factor
+        eligible (bool-array): Segments which can be in the cabin, all if None
+        step (float): Decrement of the width factor
+        min_ratio (float): Minimum cabin length over fuselage length
+
+    Returns:
+        corr (float): Width factor of the cabin
+    """
+
+    sec_width = np.asarray(sec_width, dtype=float)
+    seg_length = np.asarray(seg_length, dtype=float)
+    if eligible is not None:
+        eligible = np.asarray(eligible, dtype=bool)
+        sec_width = sec_width[eligible]
+        seg_length = seg_length[eligible]
+    target = min_ratio * fuse_length
+
+    # Factors tried by the loop, the last one is the first not positive
+    corrs = [corr]
+    while corrs[-1] > 0.0:
+        corrs.append(corrs[-1] - step)
+
+    # Widths in increasing order and cabin length if the cabin starts at
+    # each of them (cum_length[i]: length of the segments i, i+1, ...)
+    order = np.argsort(sec_width, kind='stable')
+    sorted_width = sec_width[order]
+    cum_length = np.append(np.cumsum(seg_length[order][::-1])[::-1], 0.0)
+
+    thresholds = np.array(corrs) * mean_width
+    cabin_length = cum_length[np.searchsorted(sorted_width, thresholds,
+                                              side='left')]
+    stops = (np.array(corrs) <= 0.0) | (cabin_length >= target)
+
+    return corrs[int(np.argmax(stops))]
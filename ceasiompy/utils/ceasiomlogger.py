@@ -6,15 +6,24 @@ Developed for CFS ENGINEERING, 1015 Lausanne, Switzerland
 
 Logging method use by other CEASIOMpy modules
 
+The level and the outputs of the logs are set once for the whole process,
+with 'configure_logging' or with environment variables:
+
+    * CEASIOMPY_LOG_LEVEL: level of the logs (default: INFO)
+    * CEASIOMPY_LOG_FILE: path of one logfile shared by all the modules
+    * CEASIOMPY_LOG_MODULE_FILES: '1' to write one logfile per module
+      (<module>.log, overwritten at each run), as in previous versions
+    * CEASIOMPY_LOG_QUIET: '1' to only log warnings and errors (batch jobs)
+
+By default no logfile is written. Log messages should be formatted lazily,
+e.g. log.info('Length [m]: %s', length), so nothing is formatted for the
+messages below the level.
+
 Python version: >=3.6
 
 | Author : Aidan Jungo
 | Creation: 2018-09-26
-| Last modifiction: 2018-09-27
-
-TODO:
-
-    * Do we want one big logfile (global) or many small (local for each module)?
+| Last modifiction: 2026-10-18
 
 """
 
@@ -23,6 +32,26 @@ TODO:
 #==============================================================================
 
 import logging
+import os
+
+#==============================================================================
+#   CONSTANTS
+#==============================================================================
+
+FILE_FORMAT = '%(asctime)s - %(name)20s - %(levelname)s - %(message)s'
+CONSOLE_FORMAT = '%(levelname)-8s - %(message)s'
+
+# Process-wide configuration, from the environment variables by default
+_config = {
+    'level': os.environ.get('CEASIOMPY_LOG_LEVEL', 'INFO').upper(),
+    'log_file': os.environ.get('CEASIOMPY_LOG_FILE') or None,
+    'module_files': os.environ.get('CEASIOMPY_LOG_MODULE_FILES') == '1',
+    'quiet': os.environ.get('CEASIOMPY_LOG_QUIET') == '1',
+}
+
+# Loggers created by get_logger and handlers shared by all of them
+_loggers = {}
+_shared_handlers = []
 
 #==============================================================================
 #   FUNCTIONS
@@ -33,7 +62,7 @@ def get_logger(name):
     """ Function to create a logger
 
     Function 'get_logger' create a logger, it sets the format and the level of
-    the logfile and console log.
+    the logfile and console log, as set by 'configure_logging'.
 
     Args:
         name (str): Logger name
@@ -47,29 +76,97 @@ def get_logger(name):
     # NOTE: Multiple calls to getLogger() with the same name will return a
     # reference to the same logger object. However, there can be any number of
     # handlers (!) If a logger already as one or more handlers, none will be added
-    if len(logger.handlers) > 0:
+    if name in _loggers or len(logger.handlers) > 0:
         return logger
 
-    logger.setLevel(logging.DEBUG)
+    _loggers[name] = logger
+    _setup_logger(logger)
 
-    # Write logfile
-    file_formatter = logging.Formatter('%(asctime)s - %(name)20s \
-    - %(levelname)s - %(message)s')
+    return logger
 
-    # Workaround for ReadTheDocs: do not raise an error if we cannot create a log file
-    try:
-        file_handler = logging.FileHandler(filename=name+'.log', mode='w')
-        file_handler.setLevel(logging.DEBUG)     # Level for the logfile
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
-    except PermissionError:
-        pass
-
-    # Write log messages on the console
-    console_formatter = logging.Formatter('%(levelname)-8s - %(message)s')
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.DEBUG)   # Level for the console log
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
 
-    return logger
+def configure_logging(level=None, log_file=None, module_files=None,
+                      quiet=None):
+    """ Function to configure the logs of all CEASIOMpy modules
+
+    Function 'configure_logging' sets the level and the outputs of all the
+    loggers created by 'get_logger', before or after their creation. The
+    arguments which are None are not changed.
+
+    Args:
+        level (str or int): Level of the logs (e.g. 'INFO', logging.DEBUG)
+        log_file (str): Path of one logfile for all the modules, '' for none
+        module_files (bool): If True one logfile is written per module
+        quiet (bool): If True only warnings and errors are logged
+    """
+
+    if level is not None:
+        _config['level'] = level
+    if log_file is not None:
+        _config['log_file'] = log_file or None
+    if module_files is not None:
+        _config['module_files'] = module_files
+    if quiet is not None:
+        _config['quiet'] = quiet
+
+    for handler in _shared_handlers:
+        handler.close()
+    _shared_handlers.clear()
+
+    for logger in _loggers.values():
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        _setup_logger(logger)
+
+
+def get_log_level():
+    """ Return the level (int) of the CEASIOMpy logs. """
+
+    if _config['quiet']:
+        return logging.WARNING
+    level = _config['level']
+    if isinstance(level, str):
+        level = logging.getLevelName(level)
+    return level if isinstance(level, int) else logging.INFO
+
+
+def _setup_logger(logger):
+    """ Set the level and the handlers of a logger. """
+
+    logger.setLevel(get_log_level())
+
+    for handler in _get_shared_handlers():
+        logger.addHandler(handler)
+
+    # Workaround for ReadTheDocs: do not raise an error if we cannot create a log file
+    if _config['module_files']:
+        try:
+            file_handler = logging.FileHandler(filename=logger.name+'.log',
+                                               mode='w')
+            file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+            logger.addHandler(file_handler)
+        except PermissionError:
+            pass
+
+
+def _get_shared_handlers():
+    """ Return the console handler and the shared logfile handler. """
+
+    if not _shared_handlers:
+        # Write log messages on the console
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        _shared_handlers.append(console_handler)
+
+        # Logfile shared by all the modules (and processes), in append mode
+        if _config['log_file']:
+            try:
+                file_handler = logging.FileHandler(
+                    filename=_config['log_file'], mode='a')
+                file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+                _shared_handlers.append(file_handler)
+            except PermissionError:
+                pass
+
+    return _shared_handlers
@@ -23,8 +23,17 @@ TODO:
 #   IMPORTS
 #==============================================================================
 
+import io
 import os
+import re
 import sys
+import threading
+import weakref
+import xml.etree.ElementTree as ET
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
 
 # Depending how/where Tixi and Tigl are installed, it could be:
 #     import tixi3wrapper
@@ -32,25 +41,361 @@ import sys
 #     from tixi3wrapper import Tixi3Exception
 #     from tigl3wrapper import Tigl3Exception
 
-import tixi3.tixi3wrapper as tixi3wrapper
-import tigl3.tigl3wrapper as tigl3wrapper
-from tixi3.tixi3wrapper import Tixi3Exception
-from tigl3.tigl3wrapper import Tigl3Exception
+# TIXI and TIGL are optional: without TIXI the lxml XML backend is used
+# (see xmlbackend.py), without TIGL no geometry analysis can be done.
+try:
+    import tixi3.tixi3wrapper as tixi3wrapper
+    from tixi3.tixi3wrapper import Tixi3Exception
+except ImportError:
+    tixi3wrapper = None
+try:
+    import tigl3.tigl3wrapper as tigl3wrapper
+    from tigl3.tigl3wrapper import Tigl3Exception
+except ImportError:
+    tigl3wrapper = None
 
 from ceasiompy.utils.ceasiomlogger import get_logger
+from ceasiompy.utils.profiling import profiled, profile_handle,\
+                                       unwrap_handle
+from ceasiompy.utils.xmlbackend import LxmlTixi, parse_float_vector,\
+                                        format_float_vector, etree
 
 log = get_logger(__file__.split('.')[0])
 
+# Default number of TIGL query results kept by a CpacsSession
+TIGL_CACHE_SIZE = 10000
+
+# XML backend used to open and create CPACS documents, 'tixi' or 'lxml'
+XML_BACKEND = os.environ.get('CEASIOMPY_XML_BACKEND',
+                             'tixi' if tixi3wrapper is not None else 'lxml')
+
 #==============================================================================
 #   CLASSES
 #==============================================================================
 
+class CpacsSession:
+    """ Class to share the TIXI and TIGL handles of a CPACS file.
+
+    The CPACS file is parsed only once when the session is created and the
+    TIGL handle is only built the first time it is required. Functions which
+    accept a session use its handles instead of opening the CPACS file again,
+    so a whole analysis (or transformation) costs one parse and one TIGL build.
+
+    A read-only session (read_only=True) is meant for pure analyses, its
+    handles are released without saving, so the CPACS file on disk is never
+    rewritten.
+
+    With the lxml XML backend, a TIXI handle is only created (from the
+    document in memory) when the TIGL handle is required.
+
+    Attributes:
+        cpacs_path (str): Path to the CPACS file
+        read_only (bool): True if the CPACS file must not be saved
+        tigl_cache_size (int): Number of TIGL query results kept by the
+                               session, 0 to disable the cache
+        backend (str): XML backend of the session, XML_BACKEND if None
+        tixi (handles): TIXI Handle of the CPACS file
+        tigl (handles): TIGL Handle of the CPACS file (built on first access)
+
+    """
+
+    def __init__(self, cpacs_path, read_only=False,
+                 tigl_cache_size=TIGL_CACHE_SIZE, backend=None):
+        self.cpacs_path = cpacs_path
+        self.read_only = read_only
+        self.tigl_cache_size = tigl_cache_size
+        self.tixi = open_tixi(cpacs_path, backend)
+        self._tigl = None
+        self._tigl_tixi = None
+
+    @classmethod
+    def from_string(cls, cpacs_string, cpacs_path=None, read_only=True,
+                    tigl_cache_size=TIGL_CACHE_SIZE, backend=None):
+        """ Create a session on a CPACS document given as a string.
+
+        Args:
+            cpacs_string (str): CPACS document, e.g. exported from the TIXI
+                                handle of another session
+            cpacs_path (str): Path of the CPACS file, only used in messages
+            read_only (bool): True if the CPACS file must not be saved
+
+        Returns:
+            session (CpacsSession): Session of the document
+        """
+
+        session = cls.__new__(cls)
+        session.cpacs_path = cpacs_path
+        session.read_only = read_only
+        session.tigl_cache_size = tigl_cache_size
+        session.tixi = new_tixi(backend)
+        session.tixi.openString(cpacs_string)
+        session._tigl = None
+        session._tigl_tixi = None
+        return session
+
+    @property
+    def tigl(self):
+        """ TIGL handle of the session, created on first access. """
+
+        if self._tigl is None:
+            tixi_handle = self.tixi
+            if isinstance(unwrap_handle(tixi_handle), LxmlTixi):
+                # TIGL can only be built on a TIXI handle
+                self._tigl_tixi = new_tixi('tixi')
+                self._tigl_tixi.openString(
+                    self.tixi.exportDocumentAsString())
+                tixi_handle = self._tigl_tixi
+            self._tigl = open_tigl(tixi_handle, self.tigl_cache_size)
+        return self._tigl
+
+    def close(self, cpacs_out_path=None):
+        """ Close the TIGL and TIXI handles of the session.
+
+        Args:
+            cpacs_out_path (str): Path where the CPACS file is saved before
+                                  closing, if None the file is not saved.
+        """
+
+        if cpacs_out_path is not None and self.read_only:
+            raise ValueError('Read-only session of ' + self.cpacs_path
+                             + ' cannot be saved!')
+
+        self.reset_tigl()
+
+        if self.tixi is None:
+            return
+
+        if cpacs_out_path is None:
+            close_tixi_readonly(self.tixi)
+        else:
+            close_tixi(self.tixi, cpacs_out_path)
+        self.tixi = None
+
+    def reset_tigl(self):
+        """ Close the TIGL handle, it is built again on next access.
+
+        It must be called when the document of the session is changed, the
+        TIGL handle would otherwise still describe the previous geometry.
+        """
+
+        if self._tigl is not None:
+            if isinstance(self._tigl, CachedTigl):
+                (hits, misses, maxsize, currsize) = self._tigl.cache_info()
+                log.info('TIGL cache: %d hits, %d misses.', hits, misses)
+            self._tigl.close()
+            self._tigl = None
+            log.info('TIGL handle has been closed.')
+
+        if self._tigl_tixi is not None:
+            close_tixi_readonly(self._tigl_tixi)
+            self._tigl_tixi = None
+
+    @contextmanager
+    def xml_tree(self):
+        """ Context manager to edit the document of the session as a tree.
+
+        Same as the function 'xml_tree' on the TIXI handle of the session.
+        The TIGL handle is closed before the document is reloaded (and when
+        the context exits), the next access to 'tigl' builds it on the
+        modified document.
+
+        Yields:
+            root (Element): Root element ('cpacs') of the document
+        """
+
+        self.reset_tigl()
+        try:
+            with xml_tree(self.tixi) as root:
+                yield root
+        finally:
+            self.reset_tigl()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CachedTigl:
+    """ Class to memoise the geometric queries of a TIGL handle.
+
+    The results of the queries listed in CACHED_METHODS are stored by
+    argument tuple in a bounded LRU cache, so points which are evaluated
+    several times during an analysis (e.g. the leading edge of the root
+    section) are only computed once by TIGL. Every other attribute is taken
+    from the TIGL handle itself.
+
+    The cached values are only valid as long as the geometry does not change,
+    the cache must be cleared (cache_clear) if the CPACS file is modified and
+    the TIGL handle reopened.
+
+    Attributes:
+        tigl (handles): TIGL Handle of the CPACS file
+        maxsize (int): Maximum number of stored results
+        hits (int): Number of queries answered from the cache
+        misses (int): Number of queries evaluated by TIGL
+
+    """
+
+    CACHED_METHODS = frozenset([
+        'fuselageGetPoint', 'fuselageGetCircumference', 'fuselageGetVolume',
+        'fuselageGetSegmentVolume', 'fuselageGetSurfaceArea',
+        'wingGetChordPoint', 'wingGetUpperPoint', 'wingGetLowerPoint',
+        'wingGetVolume', 'wingGetSegmentVolume', 'wingGetSurfaceArea',
+        'wingGetReferenceArea', 'wingGetSpan', 'wingGetMAC'])
+
+    def __init__(self, tigl_handle, maxsize=TIGL_CACHE_SIZE):
+        self.tigl = tigl_handle
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def __getattr__(self, name):
+        if name == 'tigl' or name.startswith('_'):
+            raise AttributeError(name)
+
+        method = getattr(self.tigl, name)
+        if name not in self.CACHED_METHODS:
+            return method
+
+        def cached_method(*args):
+            key = (name,) + args
+            try:
+                value = self._cache[key]
+            except KeyError:
+                self.misses += 1
+                value = method(*args)
+                self._cache[key] = value
+                if len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+                return value
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return value
+
+        # Stored on the instance, so __getattr__ is only called once per name
+        setattr(self, name, cached_method)
+        return cached_method
+
+    def cache_info(self):
+        """ Return the (hits, misses, maxsize, currsize) of the cache. """
+
+        return (self.hits, self.misses, self.maxsize, len(self._cache))
+
+    def cache_clear(self):
+        """ Remove all the stored results and reset the counters. """
+
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class UidRegistry:
+    """ Class to keep track of the uIDs used in a CPACS document.
+
+    The uIDs of the document are collected once, then each uID reserved with
+    'reserve' is added to the set. For each requested uID the last numerical
+    suffix given is stored, so a free uID is found without searching the
+    document. The uIDs given are the same as the ones of the former
+    'add_uid' probe loop: the requested uID if it is free, otherwise the
+    requested uID followed by the smallest free number.
+
+    The registry only knows the uIDs set through it (and 'add_uid', which
+    releases the uID it replaces): code which sets or removes uIDs in another
+    way must call 'reset_uid_registry' on the document, as 'copy_branch'
+    does.
+
+    Attributes:
+        uids (Counter): Number of elements of the document using each uID
+
+    """
+
+    def __init__(self, tixi):
+        self.uids = Counter(self._document_uids(tixi))
+        self._suffixes = {}
+
+    def reserve(self, uid):
+        """ Return a free uID based on 'uid' and mark it as used.
+
+        Args:
+            uid (str): Requested uID
+
+        Returns:
+            uid_new (str): 'uid' or 'uid' followed by a number if 'uid' is
+                           already used
+        """
+
+        uid_new = uid
+        if uid in self.uids:
+            i = self._suffixes.get(uid, 0)
+            while uid_new in self.uids:
+                i = i + 1
+                uid_new = uid + str(i)
+            self._suffixes[uid] = i
+        self.uids[uid_new] += 1
+        return uid_new
+
+    def release(self, uid):
+        """ Mark a uID as free (e.g. when it is replaced by another one).
+
+        Args:
+            uid (str): uID which is not used anymore
+        """
+
+        if self.uids[uid] > 1:
+            self.uids[uid] -= 1
+            return
+        self.uids.pop(uid, None)
+        # A smaller suffix can be free again
+        self._suffixes.clear()
+
+    @staticmethod
+    def _document_uids(tixi):
+        if isinstance(unwrap_handle(tixi), LxmlTixi):
+            elements = tixi.root.iter()
+        else:
+            elements = ET.fromstring(tixi.exportDocumentAsString()).iter()
+        for element in elements:
+            uid = element.get('uID')
+            if uid is not None:
+                yield uid
+
 
 #==============================================================================
 #   FUNCTIONS
 #==============================================================================
 
-def open_tixi(cpacs_path):
+def new_tixi(backend=None):
+    """ Create an empty document handle of an XML backend.
+
+    Function 'new_tixi' return a TIXI Handle ('tixi' backend) or an LxmlTixi
+    object ('lxml' backend), both are used in the same way. The document must
+    then be created or opened ('create', 'open' or 'openString').
+    While profiling (see profiling.py), the calls of the handle are counted.
+
+    Args:
+        backend (str): 'tixi' or 'lxml', XML_BACKEND if None
+
+    Returns::
+        tixi_handle (handles): Empty TIXI Handle
+    """
+
+    if backend is None:
+        backend = XML_BACKEND
+
+    if backend == 'lxml':
+        return profile_handle(LxmlTixi(), 'tixi')
+    if backend == 'tixi':
+        if tixi3wrapper is None:
+            raise ImportError('tixi3 is required for the tixi XML backend')
+        return profile_handle(tixi3wrapper.Tixi3(), 'tixi')
+
+    raise ValueError('Unknown XML backend: ' + str(backend))
+
+
+def open_tixi(cpacs_path, backend=None):
     """ Create TIXI handles for a CPACS file and return this handle.
 
     Function 'open_tixi' return the TIXI Handle of a CPACS file given as input
@@ -61,12 +406,13 @@ def open_tixi(cpacs_path):
 
     Args:
         cpacs_path (str): Path to the CPACS file
+        backend (str): XML backend ('tixi' or 'lxml'), XML_BACKEND if None
 
     Returns::
         tixi_handle (handles): TIXI Handle of the CPACS file
     """
 
-    tixi_handle = tixi3wrapper.Tixi3()
+    tixi_handle = new_tixi(backend)
     tixi_handle.open(cpacs_path)
 
     log.info('TIXI handle has been created.')
@@ -74,7 +420,7 @@ def open_tixi(cpacs_path):
     return tixi_handle
 
 
-def open_tigl(tixi_handle):
+def open_tigl(tixi_handle, cache_size=0):
     """ Create TIGL handles for a CPACS file and return this handle.
 
     Function 'open_tigl' return the TIGL Handle from its TIXI Handle.
@@ -85,20 +431,30 @@ def open_tigl(tixi_handle):
 
     Args:
         tixi_handle (handles): TIXI Handle of the CPACS file
+        cache_size (int): If greater than 0, the TIGL Handle is wrapped in a
+                          CachedTigl which keeps up to 'cache_size' results
 
     Returns:
         tigl_handle (handles): TIGL Handle of the CPACS file
     """
 
-    tigl_handle = tigl3wrapper.Tigl3()
+    if tigl3wrapper is None:
+        raise ImportError('tigl3 is required to build a TIGL handle')
+
+    tigl_handle = profile_handle(tigl3wrapper.Tigl3(), 'tigl')
     tigl_handle.open(tixi_handle, '')
 
     tigl_handle.logSetVerbosity(1)  # 1 - only error, 2 - error and warnings
 
     log.info('TIGL handle has been created.')
+
+    if cache_size > 0:
+        return CachedTigl(tigl_handle, cache_size)
+
     return tigl_handle
 
 
+@profiled()
 def close_tixi(tixi_handle, cpacs_out_path):
     """ Close TIXI handle and save the CPACS file.
 
@@ -118,19 +474,40 @@ def close_tixi(tixi_handle, cpacs_out_path):
     # Check if the directory of 'cpacs_out_path' exist, if not, create it
     path_split = cpacs_out_path.split('/')[:-1]
     dir_path = '/'.join(str(m) for m in path_split)
-    if not os.path.exists(dir_path):
+    if dir_path and not os.path.exists(dir_path):
         os.makedirs(dir_path)
-        log.info(str(dir_path) + ' directory has been created.')
+        log.info('%s directory has been created.', dir_path)
 
     # Save CPACS file
     tixi_handle.save(cpacs_out_path)
-    log.info("Output CPACS file has been saved at: " + cpacs_out_path)
+    log.info('Output CPACS file has been saved at: %s', cpacs_out_path)
 
     # Close TIXI handle
     tixi_handle.close()
+    reset_uid_registry(tixi_handle)
     log.info("TIXI Handle has been closed.")
 
 
+def close_tixi_readonly(tixi_handle):
+    """ Close TIXI handle without saving the CPACS file.
+
+    Function 'close_tixi_readonly' only releases the TIXI Handle, it must be
+    used after a pure reading of a CPACS file, so the file on disk is not
+    re-serialised and rewritten.
+
+    Source :
+        * TIXI functions: http://tixi.sourceforge.net/Doc/index.html
+
+    Args:
+        tixi_handle (handles): TIXI Handle of the CPACS file
+
+    """
+
+    tixi_handle.close()
+    reset_uid_registry(tixi_handle)
+    log.info("TIXI Handle has been closed (not saved).")
+
+
 def create_branch(tixi, xpath, add_child=False):
     """ Function to create a CPACS branch.
 
@@ -171,13 +548,12 @@ def create_branch(tixi, xpath, add_child=False):
             if child == xpath_split[-1] and add_child:
                 namedchild_nb = tixi.getNamedChildrenCount(xpath_parent, child)
                 tixi.createElementAtIndex (xpath_parent,child,namedchild_nb+1)
-                log.info('Named child "' + child
-                         + '" has been added to branch "'
-                         + xpath_parent + '"')
+                log.info('Named child "%s" has been added to branch "%s"',
+                         child, xpath_parent)
         else:
             tixi.createElement(xpath_parent, child)
-            log.info('Child "' + child + '" has been added to branch "'
-                     + xpath_parent + '"')
+            log.info('Child "%s" has been added to branch "%s"',
+                     child, xpath_parent)
 
 
 def copy_branch(tixi, xpath_from, xpath_to):
@@ -259,6 +635,9 @@ def copy_branch(tixi, xpath_from, xpath_to):
             except:
                 last_attrib = 1
 
+    # The uIDs are copied as attributes, without the uID registry
+    reset_uid_registry(tixi)
+
 
 def get_uid(tixi, xpath):
     """ Function to get uID from a specific XPath.
@@ -288,11 +667,52 @@ def get_uid(tixi, xpath):
 
 
 
+# uID registries of the TIXI handles, see 'uid_registry'
+_uid_registries = weakref.WeakKeyDictionary()
+
+
+def uid_registry(tixi):
+    """ Function to get the uID registry of a TIXI handle.
+
+    The registry is created the first time it is requested for a TIXI handle
+    (which needs a search of the whole document) and kept as long as the
+    handle exists.
+
+    Args:
+        tixi (handles): TIXI Handle of the CPACS file
+
+    Returns:
+        registry (UidRegistry): uID registry of the document
+    """
+
+    registry = _uid_registries.get(tixi)
+    if registry is None:
+        registry = UidRegistry(tixi)
+        _uid_registries[tixi] = registry
+    return registry
+
+
+def reset_uid_registry(tixi):
+    """ Function to forget the uID registry of a TIXI handle.
+
+    It must be called when uIDs are changed without 'add_uid' (e.g. when
+    a branch is copied or a document is reloaded), the registry is then
+    built again the next time it is needed.
+
+    Args:
+        tixi (handles): TIXI Handle of the CPACS file
+    """
+
+    _uid_registries.pop(tixi, None)
+
+
 def add_uid(tixi, xpath, uid):
     """ Function to add UID at a specific XPath.
 
     Function 'add_uid' checks and add UID to a specific path, the function will
-    automatically update the chosen UID if it exists already.
+    automatically update the chosen UID if it exists already. The uIDs of the
+    document are looked up in its registry (see 'uid_registry'), not searched
+    in the document.
 
     Source :
         * TIXI functions: http://tixi.sourceforge.net/Doc/index.html
@@ -304,17 +724,16 @@ def add_uid(tixi, xpath, uid):
 
     """
 
-    exist = True
-    uid_new = uid
-    i = 0
-    while exist is True:
-        if not tixi.uIDCheckExists(uid_new):
-            tixi.uIDSetToXPath(xpath, uid_new)
-            exist = False
-        else:
-            i = i + 1
-            uid_new = uid + str(i)
-            log.warning('UID already existing changed to: ' + uid_new)
+    registry = uid_registry(tixi)
+    uid_new = registry.reserve(uid)
+    uid_old = None
+    if tixi.checkAttribute(xpath, 'uID'):
+        uid_old = tixi.getTextAttribute(xpath, 'uID')
+    tixi.uIDSetToXPath(xpath, uid_new)
+    if uid_old is not None and uid_old != uid_new:
+        registry.release(uid_old)
+    if uid_new != uid:
+        log.warning('UID already existing changed to: %s', uid_new)
 
 
 def get_value(tixi, xpath):
@@ -350,10 +769,10 @@ def get_value(tixi, xpath):
     else:
         # check if the path exist
         if tixi.checkElement(xpath):
-            log.error('No value has been fournd at ' + xpath)
+            log.error('No value has been fournd at %s', xpath)
             raise ValueError('No value has been fournd at ' + xpath)
         else:
-            log.error(xpath + ' cannot be found in the CPACS file')
+            log.error('%s cannot be found in the CPACS file', xpath)
             raise ValueError(xpath + ' cannot be found in the CPACS file')
 
     # Special return for boolean
@@ -417,9 +836,9 @@ def get_value_or_default(tixi,xpath,default_value):
             tixi.addDoubleElement(xpath_parent,value_name,value,'%g')
         else:
             tixi.addTextElement(xpath_parent,value_name,value)
-        log.info('Default value has been add to the cpacs file at: ' + xpath)
+        log.info('Default value has been add to the cpacs file at: %s', xpath)
     else:
-        log.info('Value found at ' + xpath + ', default value will not be used')
+        log.info('Value found at %s, default value will not be used', xpath)
 
         # Special return for boolean
         if value == 'True':
@@ -442,7 +861,39 @@ def add_float_vector(tixi, xpath, vector):
     Args:
         tixi (handle): Tixi handle
         xpath (str): XPath of the vector to add
-        vector (list, tuple): Vector of floats to add
+        vector (list, tuple, ndarray): Vector of floats to add
+    """
+
+    add_float_array(tixi, xpath, vector)
+
+
+def get_float_vector(tixi, xpath):
+    """ Get a vector (of float) at given CPACS xpath
+
+    Function 'get_float_vector' will get a vector (composed by float) at the
+    given XPath, if the node does not exist, an error will be raised.
+
+    Args:
+        tixi (handle): Tixi handle
+        xpath (str): XPath of the vector to get
+    """
+
+    return get_float_array(tixi, xpath).tolist()
+
+
+def add_float_array(tixi, xpath, array, format='%g'):
+    """ Add a numpy array (of float) as a vector at given CPACS xpath
+
+    Function 'add_float_array' works as 'add_float_vector', but the text of
+    the vector is formatted in one call (see format_float_vector) and added
+    as a text element, the values are not converted one by one by TIXI.
+    Multidimensional arrays are flattened.
+
+    Args:
+        tixi (handle): Tixi handle
+        xpath (str): XPath of the vector to add
+        array (ndarray, list, tuple): Vector of floats to add
+        format (str): Format of each value
     """
 
     # Strip trailing '/' (has no meaning here)
@@ -456,24 +907,26 @@ def add_float_vector(tixi, xpath, vector):
     if not tixi.checkElement(xpath_parent):
         create_branch(tixi,xpath_parent)
 
+    text = format_float_vector(array, format)
     if tixi.checkElement(xpath):
-        tixi.updateFloatVector(xpath, vector, len(vector), format='%g')
-        tixi.addTextAttribute(xpath, 'mapType', 'vector')
+        tixi.updateTextElement(xpath, text)
     else:
-        tixi.addFloatVector(xpath_parent, xpath_child_name, vector, \
-                            len(vector), format='%g')
-        tixi.addTextAttribute(xpath, 'mapType', 'vector')
+        tixi.addTextElement(xpath_parent, xpath_child_name, text)
+    tixi.addTextAttribute(xpath, 'mapType', 'vector')
 
 
-def get_float_vector(tixi, xpath):
-    """ Get a vector (of float) at given CPACS xpath
+def get_float_array(tixi, xpath):
+    """ Get a vector (of float) at given CPACS xpath as a numpy array
 
-    Function 'get_float_vector' will get a vector (composed by float) at the
-    given XPath, if the node does not exist, an error will be raised.
+    Function 'get_float_array' works as 'get_float_vector', but the text of
+    the vector is parsed by numpy in one call, no list is built.
 
     Args:
         tixi (handle): Tixi handle
         xpath (str): XPath of the vector to get
+
+    Returns:
+        array (ndarray): Values of the vector
     """
 
     if not tixi.checkElement(xpath):
@@ -484,12 +937,10 @@ def get_float_vector(tixi, xpath):
     if float_vector_str == '':
         raise ValueError('No value has been fournd at ' + xpath)
 
-    if float_vector_str.endswith(';'):
-        float_vector_str = float_vector_str[:-1]
-    float_vector_list = float_vector_str.split(';')
-    float_vector = [float(elem) for elem in float_vector_list]
-
-    return float_vector
+    try:
+        return parse_float_vector(float_vector_str)
+    except ValueError as e:
+        raise ValueError(xpath + ': ' + str(e))
 
 
 def add_string_vector(tixi, xpath, vector):
@@ -584,9 +1035,161 @@ def get_path(tixi, xpath):
     return correct_path
 
 
+# Trees of the TIXI handles currently edited with xml_tree, they are
+# forgotten with their handle
+_xml_trees = weakref.WeakKeyDictionary()
+_xml_trees_lock = threading.Lock()
+
+
+@contextmanager
+def xml_tree(tixi):
+    """ Context manager to edit a CPACS document as an ElementTree.
+
+    Function 'xml_tree' exports the document of the TIXI handle once and
+    parses it as an ElementTree, so sets of nodes can be read and written
+    in bulk (see find_nodes, get_node_values and set_node_values) instead
+    of resolving one xpath from the root for each value. When the context
+    exits without error, the modified tree is loaded back in the TIXI
+    handle. Nested contexts on the same handle share the same tree, the
+    document is then only reloaded by the outer one.
+
+    The document is parsed with lxml, which keeps the namespace prefixes,
+    the comments and the processing instructions. Without lxml, it is
+    parsed with ElementTree: the namespaces of the document are registered
+    (globally) to keep their prefixes, but the comments and processing
+    instructions outside of the root element are lost.
+
+    The reload closes the document of the TIXI handle, so a TIGL handle
+    opened on it must not be used anymore. To edit the document of a
+    CpacsSession, use 'CpacsSession.xml_tree', which closes and rebuilds
+    the TIGL handle of the session.
+
+    Args:
+        tixi (handles): TIXI Handle of the CPACS file
+
+    Yields:
+        root (Element): Root element ('cpacs') of the document
+    """
+
+    # The lxml backend already holds a tree, it is edited in place
+    if isinstance(unwrap_handle(tixi), LxmlTixi):
+        yield tixi.root
+        return
+
+    with _xml_trees_lock:
+        root = _xml_trees.get(tixi)
+    if root is not None:
+        yield root
+        return
+
+    document = tixi.exportDocumentAsString()
+    if etree is not None:
+        root = etree.fromstring(document.encode())
+    else:
+        root = _parse_element_tree(document)
+    with _xml_trees_lock:
+        _xml_trees[tixi] = root
+    try:
+        yield root
+    finally:
+        with _xml_trees_lock:
+            _xml_trees.pop(tixi, None)
+
+    if etree is not None:
+        document = etree.tostring(root.getroottree(), encoding='unicode')
+    else:
+        document = ET.tostring(root, encoding='unicode')
+    tixi.close()
+    tixi.openString(document)
+    reset_uid_registry(tixi)
+
+
+def _parse_element_tree(document):
+    """ Parse a document with ElementTree, keeping its namespace prefixes.
+    """
+
+    for (prefix, uri) in _document_namespaces(document):
+        if prefix and not re.match(r'ns\d+$', prefix):
+            ET.register_namespace(prefix, uri)
+
+    parser = ET.XMLParser(target=ET.TreeBuilder(insert_comments=True,
+                                                insert_pis=True))
+    return ET.fromstring(document, parser=parser)
+
+
+def _document_namespaces(document):
+    events = ET.iterparse(io.StringIO(document), events=('start-ns',))
+    return [namespace for (event, namespace) in events]
+
+
+def find_nodes(root, xpath):
+    """ Function to find all the nodes matching a CPACS xpath.
+
+    Args:
+        root (Element): Root element of the document (see xml_tree)
+        xpath (str): Absolute xpath (e.g. '/cpacs/vehicles/...') in the
+                     subset of XPath supported by ElementTree
+
+    Returns:
+        nodes (list): Elements matching the xpath
+    """
+
+    # Spaces can be found in xpath written on several lines
+    path = re.sub(r'\s+', '', xpath)
+    if path.startswith('/cpacs/'):
+        path = path[len('/cpacs/'):]
+
+    return root.findall(path)
+
+
+def get_child_nodes(nodes, path):
+    """ Function to get one child node of each node of a list.
+
+    Args:
+        nodes (list): Parent elements
+        path (str): Relative path of the child (e.g. 'transformation/scaling/x')
+
+    Returns:
+        child_nodes (list): Child element of each parent element
+    """
+
+    child_nodes = [node.find(path) for node in nodes]
+    if any(child is None for child in child_nodes):
+        raise ValueError('"' + path + '" is missing in some of the "'
+                         + nodes[0].tag + '" elements!')
+
+    return child_nodes
+
+
+def get_node_values(nodes):
+    """ Function to read the float values of a list of nodes.
+
+    Args:
+        nodes (list): Elements containing a float value
+
+    Returns:
+        values (float-array): Value of each node
+    """
+
+    return np.array([float(node.text) for node in nodes], dtype=float)
+
+
+def set_node_values(nodes, values, format_string='%g'):
+    """ Function to write float values in a list of nodes.
+
+    Args:
+        nodes (list): Elements to update
+        values (float-array): Value of each node
+        format_string (str): Format of the values (as in TIXI functions)
+    """
+
+    for node, value in zip(nodes, values):
+        node.text = format_string % value
+
+
 def aircraft_name(cpacs_path):
-    """ The function gat the name of the aircraft from the cpacs file or add a
-        default one if non-existant.
+    """ The function gat the name of the aircraft from the cpacs file or use a
+        default one if non-existant. The CPACS file is not modified.
 
     Args:
         cpacs_path (str): Path to the CPACS file
@@ -596,12 +1199,26 @@ def aircraft_name(cpacs_path):
     """
 
     tixi = open_tixi(cpacs_path)
+    name = get_aircraft_name(tixi)
+    close_tixi_readonly(tixi)
+
+    return(name)
+
+
+def get_aircraft_name(tixi):
+    """ The function gets the name of the aircraft from an open TIXI handle or
+        add a default one if non-existant.
+
+    Args:
+        tixi (handles): TIXI Handle of the CPACS file
+
+    Returns:
+        name (str): Name of the aircraft.
+    """
 
     aircraft_name_xpath = '/cpacs/header/name'
     name = get_value_or_default(tixi,aircraft_name_xpath,'Aircraft')
-    log.info('The name of the aircraft is : ' + name)
-
-    close_tixi(tixi, cpacs_path)
+    log.info('The name of the aircraft is : %s', name)
 
     return(name)
 
@@ -620,6 +1237,12 @@ if __name__ == '__main__':
 # from ceasiompy.utils.cpacsfunctions import cpsf
 
 # All available function are:
-# open_tixi, close_tixi, open_tigl,create_branch, copy_branch, add_uid,
+# new_tixi, open_tixi, close_tixi, close_tixi_readonly, open_tigl,
+# create_branch,
+# copy_branch, uid_registry, reset_uid_registry, add_uid,
 # get_value, get_value_or_default, add_float_vector, get_float_vector,
-# add_string_vector,get_string_vector, get_path, aircraft_name
+# add_float_array, get_float_array,
+# add_string_vector,get_string_vector, get_path, aircraft_name,
+# get_aircraft_name, xml_tree, find_nodes, get_child_nodes,
+# get_node_values, set_node_values
+# and the classes: CpacsSession, CachedTigl, UidRegistry
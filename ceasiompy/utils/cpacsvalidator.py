@@ -0,0 +1,205 @@
+"""
+CEASIOMpy: Conceptual Aircraft Design Software
+
+Developed for CFS ENGINEERING, 1015 Lausanne, Switzerland
+
+Validation of CPACS documents against the CPACS schema. The schema is parsed
+and compiled once per process and then used for all the documents, which
+can be validated at once, in a background thread pool, or not at all.
+
+Python version: >=3.6
+
+| Author : CEASIOMpy contributors
+| Creation: 2026-10-18
+| Last modifiction: 2026-10-18
+
+"""
+
+#==============================================================================
+#   IMPORTS
+#==============================================================================
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+from ceasiompy.utils.ceasiomlogger import get_logger
+from ceasiompy.utils.profiling import unwrap_handle
+from ceasiompy.utils.xmlbackend import LxmlTixi
+
+log = get_logger(__file__.split('.')[0])
+
+
+#==============================================================================
+#   CONSTANTS
+#==============================================================================
+
+# CPACS schema at the root of the repository
+DEFAULT_SCHEMA = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'cpacs_schema.xsd')
+
+# Validation modes: at once, in a background thread pool, or not at all
+VALIDATION_MODES = ('sync', 'deferred', 'skip')
+
+
+#==============================================================================
+#   CLASSES
+#==============================================================================
+
+class CpacsValidationError(Exception):
+    """ Exception raised when a document is not valid against the schema. """
+
+
+class CpacsValidator:
+    """ Class to validate CPACS documents against a compiled schema.
+
+    The schema is compiled when the validator is created. Documents can be
+    given as a file path, an XML string, a TIXI handle, an LxmlTixi or an
+    lxml tree. 'validate' checks a document at once, 'submit' checks it in a
+    background thread and returns a Future, 'wait' waits for all the
+    submitted documents.
+
+    Attributes:
+        schema_path (str): Path of the XSD schema
+        max_workers (int): Number of threads of the deferred validations
+
+    """
+
+    def __init__(self, schema_path=DEFAULT_SCHEMA, max_workers=1):
+        if etree is None:
+            raise ImportError('lxml is required to validate CPACS files')
+        self.schema_path = schema_path
+        self.max_workers = max_workers
+        self._schema = etree.XMLSchema(etree.parse(schema_path))
+        # The error log of a schema is shared, one validation at a time
+        self._lock = threading.Lock()
+        self._executor = None
+        self._futures = []
+        log.info('CPACS schema %s has been compiled.', schema_path)
+
+    def validate(self, document):
+        """ Validate a document, raise CpacsValidationError if not valid.
+
+        Args:
+            document: File path, XML string, TIXI handle, LxmlTixi or lxml
+                      tree of the document
+        """
+
+        tree = self._tree(document)
+        with self._lock:
+            if self._schema.validate(tree):
+                return
+            error = self._schema.error_log.last_error
+
+        raise CpacsValidationError('CPACS document ' + self._name(document)
+                                   + ' is not valid: ' + str(error))
+
+    def is_valid(self, document):
+        """ Return True if a document is valid against the schema. """
+
+        try:
+            self.validate(document)
+        except CpacsValidationError:
+            return False
+        return True
+
+    def submit(self, document):
+        """ Validate a document in a background thread.
+
+        A TIXI handle (or LxmlTixi) is exported at once, so it can be modified
+        or closed right after the call.
+
+        Args:
+            document: File path, XML string, TIXI handle, LxmlTixi or lxml
+                      tree of the document
+
+        Returns:
+            future (Future): Result of the validation, its 'result' raises
+                             CpacsValidationError if the document is not valid
+        """
+
+        if hasattr(document, 'exportDocumentAsString'):
+            document = document.exportDocumentAsString()
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='cpacs-validator')
+        future = self._executor.submit(self.validate, document)
+        self._futures.append(future)
+        return future
+
+    def wait(self):
+        """ Wait for the submitted validations.
+
+        Returns:
+            errors (list): CpacsValidationError of the documents not valid
+        """
+
+        (futures, self._futures) = (self._futures, [])
+        errors = [future.exception() for future in futures]
+        errors = [error for error in errors if error is not None]
+        for error in errors:
+            log.warning('%s', error)
+        return errors
+
+    def close(self):
+        """ Wait for the submitted validations and stop the threads. """
+
+        errors = self.wait()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        return errors
+
+    @staticmethod
+    def _tree(document):
+        """ Return the lxml tree (or element) of a document. """
+
+        if isinstance(unwrap_handle(document), LxmlTixi):
+            return document.tree
+        if hasattr(document, 'exportDocumentAsString'):
+            document = document.exportDocumentAsString()
+        if isinstance(document, (etree._ElementTree, etree._Element)):
+            return document
+        if isinstance(document, str) and document.lstrip().startswith('<'):
+            document = document.encode('utf-8')
+        if isinstance(document, bytes):
+            return etree.fromstring(document)
+        return etree.parse(document)
+
+    @staticmethod
+    def _name(document):
+        if isinstance(document, (str, os.PathLike)) \
+                and not str(document).lstrip().startswith('<'):
+            return str(document)
+        return '(in memory)'
+
+
+#==============================================================================
+#   FUNCTIONS
+#==============================================================================
+
+_validators = {}
+
+
+def get_validator(schema_path=DEFAULT_SCHEMA):
+    """ Return the validator of a schema, compiled on the first call.
+
+    Args:
+        schema_path (str): Path of the XSD schema
+
+    Returns:
+        validator (CpacsValidator): Validator shared in the process
+    """
+
+    key = os.path.abspath(schema_path)
+    if key not in _validators:
+        _validators[key] = CpacsValidator(key)
+    return _validators[key]
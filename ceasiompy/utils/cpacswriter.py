@@ -0,0 +1,163 @@
+"""
+CEASIOMpy: Conceptual Aircraft Design Software
+
+Developed for CFS ENGINEERING, 1015 Lausanne, Switzerland
+
+Incremental CPACS writer. The elements are written to the output as soon as
+they are added, no document tree is built, so the memory used does not
+depend on the size of the generated CPACS file.
+
+Python version: >=3.6
+
+| Author : CEASIOMpy contributors
+| Creation: 2026-10-18
+| Last modifiction: 2026-10-18
+
+"""
+
+#==============================================================================
+#   IMPORTS
+#==============================================================================
+
+import os
+import time
+from xml.sax.saxutils import XMLGenerator
+
+from ceasiompy.utils.ceasiomlogger import get_logger
+from ceasiompy.utils.xmlbackend import format_float_vector
+
+log = get_logger(__file__.split('.')[0])
+
+
+#==============================================================================
+#   CLASSES
+#==============================================================================
+
+class CpacsStreamWriter:
+    """ Class to write a CPACS file element by element.
+
+    The elements are opened with 'start' and closed with 'end' in document
+    order, leaf elements are written at once with 'element' or 'vector'. The
+    writer can be used as a context manager, the open elements are closed and
+    the output is flushed on exit.
+
+    Unlike with TIXI, the uIDs are not checked: they must be unique by
+    construction.
+
+    Attributes:
+        output (str or file): Path or file object of the CPACS file
+        indent (str): Indentation of one level, '' for no formatting
+
+    """
+
+    def __init__(self, output, indent='  '):
+        self.output = output
+        self.indent = indent
+
+        if isinstance(output, (str, os.PathLike)):
+            dir_path = os.path.dirname(output)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            self._file = open(output, 'w', encoding='utf-8')
+            self._own_file = True
+        else:
+            self._file = output
+            self._own_file = False
+
+        self._generator = XMLGenerator(self._file, encoding='utf-8',
+                                       short_empty_elements=True)
+        # Open elements as [name, has child elements]
+        self._stack = []
+        self._generator.startDocument()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        elif self._own_file:
+            self._file.close()
+
+    def start(self, name, attrs=None, uid=None):
+        """ Open an element.
+
+        Args:
+            name (str): Name of the element
+            attrs (dict): Attributes of the element
+            uid (str): uID of the element
+        """
+
+        attrs = dict(attrs) if attrs else {}
+        if uid is not None:
+            attrs['uID'] = uid
+
+        if self._stack:
+            self._stack[-1][1] = True
+            self._newline(len(self._stack))
+        self._generator.startElement(name, attrs)
+        self._stack.append([name, False])
+
+    def end(self):
+        """ Close the last open element. """
+
+        (name, has_children) = self._stack.pop()
+        if has_children:
+            self._newline(len(self._stack))
+        self._generator.endElement(name)
+
+    def element(self, name, text, attrs=None, uid=None):
+        """ Write a leaf element with a text value.
+
+        Args:
+            name (str): Name of the element
+            text (str): Text of the element
+            attrs (dict): Attributes of the element
+            uid (str): uID of the element
+        """
+
+        self.start(name, attrs, uid)
+        self._generator.characters(text)
+        self.end()
+
+    def vector(self, name, values, format_string='%g'):
+        """ Write a vector element, as TIXI 'addFloatVector'.
+
+        Args:
+            name (str): Name of the element
+            values (list, ndarray): Values of the vector
+            format_string (str): Format of each value
+        """
+
+        text = format_float_vector(values, format_string)
+        self.element(name, text, {'mapType': 'vector'})
+
+    def header(self, name, creator, version, description, cpacsVersion):
+        """ Write the CPACS header, as TIXI 'addCpacsHeader'. """
+
+        self.start('header')
+        self.element('name', name)
+        self.element('description', description)
+        self.element('creator', creator)
+        self.element('timestamp', time.strftime('%Y-%m-%dT%H:%M:%S'))
+        self.element('version', version)
+        self.element('cpacsVersion', cpacsVersion)
+        self.end()
+
+    def close(self):
+        """ Close all open elements and flush (or close) the output. """
+
+        while self._stack:
+            self.end()
+        self._generator.endDocument()
+        self._file.write('\n')
+
+        if self._own_file:
+            self._file.close()
+            log.info('Output CPACS file has been saved at: %s', self.output)
+        else:
+            self._file.flush()
+
+    def _newline(self, depth):
+        if self.indent:
+            self._generator.ignorableWhitespace('\n' + self.indent * depth)
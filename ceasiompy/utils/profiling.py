@@ -0,0 +1,417 @@
+"""
+CEASIOMpy: Conceptual Aircraft Design Software
+
+Developed for CFS ENGINEERING, 1015 Lausanne, Switzerland
+
+Opt-in profiling of the CPACS analyses and transformations. The stages of
+the analyses (functions decorated with 'profiled') record their wall time
+and the number of TIXI and TIGL calls made during the stage, broken down by
+API function. The results are returned as a report (dict) or written as a
+Chrome trace (JSON, to open in chrome://tracing or https://ui.perfetto.dev).
+
+Profiling is enabled for a block of code:
+
+    with profiling() as profiler:
+        geometry_eval(cpacs_in, NAME)
+    report = profiler.report()
+
+or for a whole process with the environment variable CEASIOMPY_PROFILE set to
+the path of the Chrome trace, written when the process exits ('{pid}' in the
+path is replaced by the process id).
+
+When profiling is not enabled a stage only costs one test and the TIXI/TIGL
+handles are not wrapped. Only the handles created while profiling is
+enabled are counted. The TIGL calls counted are the ones evaluated by TIGL,
+the results read from a CachedTigl are not counted. A counted handle is a
+CountingProxy, use 'unwrap_handle' to test the type of a handle.
+
+Only the stages run in the profiling process are recorded. The worker
+processes of fuse_geom_eval (workers > 1) and transformer_parallel do not
+report to the profiler of the caller: with the 'fork' start method their
+stages are lost, with the 'spawn' method and CEASIOMPY_PROFILE set each
+worker writes its own trace (use '{pid}' in the path to keep them apart).
+The call of fuse_geom_eval is still recorded as one stage of the caller.
+
+Python version: >=3.6
+
+| Author : CEASIOMpy contributors
+| Creation: 2026-10-18
+| Last modifiction: 2026-10-18
+
+"""
+
+#==============================================================================
+#   IMPORTS
+#==============================================================================
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from ceasiompy.utils.ceasiomlogger import get_logger
+
+log = get_logger(__file__.split('.')[0])
+
+
+#==============================================================================
+#   CLASSES
+#==============================================================================
+
+class Profiler:
+    """ Class to record the stages of an analysis.
+
+    Each stage is recorded as an event (dict) with its name, its start and
+    end time [ns], its depth, its thread, the TIXI/TIGL calls made in the
+    stage itself ('calls') and in the stage and its sub-stages
+    ('inclusive_calls'). The calls made outside of any stage are counted in
+    'unstaged_calls'.
+
+    Attributes:
+        events (list): Events of the finished stages, in order of end
+        unstaged_calls (Counter): Calls made outside of any stage
+
+    """
+
+    def __init__(self):
+        self.events = []
+        self.unstaged_calls = Counter()
+        self.start = time.perf_counter_ns()
+        self.end = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        """ Return the stack of the running stages of the current thread. """
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def stage(self, name):
+        """ Record the code of the 'with' block as a stage.
+
+        Args:
+            name (str): Name of the stage
+
+        Yields:
+            event (dict): Event of the stage
+        """
+
+        stack = self._stack()
+        event = {'name': name, 'start': time.perf_counter_ns(), 'end': None,
+                 'depth': len(stack), 'tid': threading.get_ident(),
+                 'calls': Counter(), 'inclusive_calls': Counter(),
+                 'child_time': 0}
+        stack.append(event)
+        try:
+            yield event
+        finally:
+            event['end'] = time.perf_counter_ns()
+            stack.pop()
+            event['inclusive_calls'].update(event['calls'])
+            if stack:
+                parent = stack[-1]
+                parent['child_time'] += event['end'] - event['start']
+                parent['inclusive_calls'].update(event['inclusive_calls'])
+            with self._lock:
+                self.events.append(event)
+
+    def count(self, api, function):
+        """ Count a call of a TIXI or TIGL function in the running stage.
+
+        Args:
+            api (str): 'tixi' or 'tigl'
+            function (str): Name of the function
+        """
+
+        stack = self._stack()
+        if stack:
+            stack[-1]['calls'][api + '.' + function] += 1
+        else:
+            with self._lock:
+                self.unstaged_calls[api + '.' + function] += 1
+
+    def stop(self):
+        """ Set the end of the profiling (the report is still available). """
+
+        if self.end is None:
+            self.end = time.perf_counter_ns()
+
+    def report(self):
+        """ Return the report of the recorded stages.
+
+        Returns:
+            report (dict): With the keys
+                * 'wall_time': Time [s] from the start of the profiling to its
+                  end (or to now if it is still running)
+                * 'stages': For each stage name, the number of runs ('count')
+                  the total, self (without sub-stages) and max time [s] and
+                  the TIXI/TIGL calls of the stage itself ('calls') and with
+                  its sub-stages ('inclusive_calls'), by function
+                * 'calls': Total TIXI/TIGL calls by function
+                * 'events': The stages in order of start, with their start
+                  [s] from the start of the profiling, time [s] and depth
+        """
+
+        end = self.end if self.end is not None else time.perf_counter_ns()
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e['start'])
+            total_calls = Counter(self.unstaged_calls)
+
+        stages = {}
+        for event in events:
+            duration = event['end'] - event['start']
+            stage = stages.setdefault(event['name'], {
+                'count': 0, 'total_time': 0.0, 'self_time': 0.0,
+                'max_time': 0.0, 'calls': Counter(),
+                'inclusive_calls': Counter()})
+            stage['count'] += 1
+            stage['total_time'] += duration*1e-9
+            stage['self_time'] += (duration - event['child_time'])*1e-9
+            stage['max_time'] = max(stage['max_time'], duration*1e-9)
+            stage['calls'].update(event['calls'])
+            stage['inclusive_calls'].update(event['inclusive_calls'])
+            total_calls.update(event['calls'])
+
+        for stage in stages.values():
+            stage['calls'] = dict(stage['calls'])
+            stage['inclusive_calls'] = dict(stage['inclusive_calls'])
+
+        return {'wall_time': (end - self.start)*1e-9,
+                'stages': stages,
+                'calls': dict(total_calls),
+                'events': [{'name': event['name'],
+                            'start': (event['start'] - self.start)*1e-9,
+                            'time': (event['end'] - event['start'])*1e-9,
+                            'depth': event['depth'],
+                            'calls': dict(event['calls'])}
+                           for event in events]}
+
+    def chrome_trace(self, path=None):
+        """ Return (and write) the stages in the Chrome trace event format.
+
+        Each stage is a complete event ('ph': 'X') with its TIXI/TIGL calls
+        in its arguments.
+
+        Args:
+            path (str): If given, path of the JSON file to write
+
+        Returns:
+            trace (dict): Chrome trace of the stages
+        """
+
+        pid = os.getpid()
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e['start'])
+
+        trace_events = [{'name': event['name'], 'cat': 'ceasiompy',
+                         'ph': 'X', 'pid': pid, 'tid': event['tid'],
+                         'ts': (event['start'] - self.start)/1000,
+                         'dur': (event['end'] - event['start'])/1000,
+                         'args': dict(event['calls'])}
+                        for event in events]
+        trace = {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+        if path:
+            with open(path, 'w') as f:
+                json.dump(trace, f)
+            log.info('Chrome trace written to %s', path)
+
+        return trace
+
+
+class CountingProxy:
+    """ Class to count the calls of a TIXI or TIGL handle.
+
+    The calls of the public methods of the handle are counted in the
+    running stage of the active profiler, then forwarded to the handle. The
+    other attributes are read from the handle.
+
+    """
+
+    def __init__(self, handle, api):
+        self._counted_handle = handle
+        self._counted_api = api
+
+    def __repr__(self):
+        return '<CountingProxy {} of {!r}>'.format(self._counted_api,
+                                                   self._counted_handle)
+
+    def __reduce__(self):
+        return (CountingProxy, (self._counted_handle, self._counted_api))
+
+    def __getattr__(self, name):
+        if name in ('_counted_handle', '_counted_api'):
+            # Not set yet (copy, unpickling), do not look up recursively
+            raise AttributeError(name)
+
+        attr = getattr(self._counted_handle, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        api = self._counted_api
+
+        @functools.wraps(attr)
+        def counted(*args, **kwargs):
+            profiler = _profiler
+            if profiler is not None:
+                profiler.count(api, name)
+            return attr(*args, **kwargs)
+
+        # Stored on the proxy, the next calls do not go through __getattr__
+        self.__dict__[name] = counted
+        return counted
+
+
+#==============================================================================
+#   FUNCTIONS
+#==============================================================================
+
+# Active profiler of the process, None if profiling is not enabled
+_profiler = None
+
+
+def get_profiler():
+    """ Return the active profiler, None if profiling is not enabled. """
+
+    return _profiler
+
+
+def start_profiling():
+    """ Enable the profiling for the process and return its profiler. """
+
+    global _profiler
+
+    _profiler = Profiler()
+    return _profiler
+
+
+def stop_profiling():
+    """ Disable the profiling and return the profiler which was active. """
+
+    global _profiler
+
+    (profiler, _profiler) = (_profiler, None)
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+@contextmanager
+def profiling(trace_path=None):
+    """ Enable the profiling for the code of the 'with' block.
+
+    Args:
+        trace_path (str): If given, the Chrome trace is written to this path
+                          at the end of the block
+
+    Yields:
+        profiler (Profiler): Profiler of the block
+    """
+
+    global _profiler
+
+    previous = _profiler
+    profiler = start_profiling()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _profiler = previous
+        if trace_path:
+            profiler.chrome_trace(trace_path)
+
+
+@contextmanager
+def stage(name):
+    """ Record the code of the 'with' block as a stage, if profiling. """
+
+    profiler = _profiler
+    if profiler is None:
+        yield None
+        return
+    with profiler.stage(name) as event:
+        yield event
+
+
+def profiled(name=None):
+    """ Decorator to record each call of a function as a stage.
+
+    Args:
+        name (str): Name of the stage, '<module>.<function>' if None
+    """
+
+    def decorator(function):
+        stage_name = name or (function.__module__.rsplit('.', 1)[-1] + '.'
+                              + function.__qualname__)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return function(*args, **kwargs)
+            with profiler.stage(stage_name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def profile_handle(handle, api):
+    """ Return a counting proxy of a TIXI or TIGL handle, if profiling.
+
+    Args:
+        handle: TIXI or TIGL handle
+        api (str): 'tixi' or 'tigl'
+
+    Returns:
+        handle: CountingProxy of the handle, or the handle itself if
+                profiling is not enabled
+    """
+
+    if _profiler is None:
+        return handle
+    return CountingProxy(handle, api)
+
+
+def unwrap_handle(handle):
+    """ Return the handle counted by a CountingProxy, or the handle itself.
+
+    Args:
+        handle: TIXI or TIGL handle, or CountingProxy of one
+
+    Returns:
+        handle: Handle without its counting proxy
+    """
+
+    if isinstance(handle, CountingProxy):
+        return handle._counted_handle
+    return handle
+
+
+def _write_env_trace(path):
+    profiler = stop_profiling()
+    if profiler is not None:
+        profiler.chrome_trace(path.replace('{pid}', str(os.getpid())))
+
+
+if os.environ.get('CEASIOMPY_PROFILE'):
+    start_profiling()
+    atexit.register(_write_env_trace, os.environ['CEASIOMPY_PROFILE'])
+
+
+#==============================================================================
+#    MAIN
+#==============================================================================
+
+if __name__ == '__main__':
+
+    log.info('Nothing to execute!')
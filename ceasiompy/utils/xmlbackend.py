@@ -0,0 +1,430 @@
+"""
+CEASIOMpy: Conceptual Aircraft Design Software
+
+Developed for CFS ENGINEERING, 1015 Lausanne, Switzerland
+
+CPACS document engine based on lxml. The class 'LxmlTixi' has the same
+methods (names, arguments and behaviour) as the TIXI handle for the subset
+of TIXI used by CEASIOMpy, so the pure XML manipulations can run on it
+without TIXI. The XPath expressions are compiled once and cached.
+
+A TIXI handle is still required to build a TIGL handle, see CpacsSession.
+
+Python version: >=3.6
+
+| Author : CEASIOMpy contributors
+| Creation: 2026-10-18
+| Last modifiction: 2026-10-18
+
+"""
+
+#==============================================================================
+#   IMPORTS
+#==============================================================================
+
+import time
+import warnings
+
+import numpy as np
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+from ceasiompy.utils.ceasiomlogger import get_logger
+
+log = get_logger(__file__.split('.')[0])
+
+
+#==============================================================================
+#   CLASSES
+#==============================================================================
+
+class LxmlTixiException(Exception):
+    """ Exception raised by LxmlTixi, equivalent of a TIXI error code. """
+
+
+class LxmlTixi:
+    """ Class of a CPACS document edited with lxml, used like a TIXI handle.
+
+    The document is created with 'create', 'open' or 'openString' and saved
+    with 'save', as with TIXI. As TIXI, element paths which do not match
+    exactly one element raise an error, blank text nodes are not kept and
+    the saved file is indented.
+
+    Attributes:
+        tree (ElementTree): lxml tree of the document (None when closed)
+        namespaces (dict): Namespaces registered for the XPath expressions
+
+    """
+
+    def __init__(self):
+        if etree is None:
+            raise ImportError('lxml is required for the lxml XML backend')
+        self.tree = None
+        self.namespaces = {}
+        self._xpaths = {}
+
+    # Document ----------------------------------------------------------------
+
+    def create(self, rootElementName):
+        self.tree = etree.ElementTree(etree.Element(rootElementName))
+
+    def open(self, xmlFilename, recursive=False):
+        parser = etree.XMLParser(remove_blank_text=True)
+        try:
+            self.tree = etree.parse(xmlFilename, parser)
+        except (OSError, etree.XMLSyntaxError) as e:
+            raise LxmlTixiException('Cannot open ' + str(xmlFilename)
+                                    + ': ' + str(e))
+
+    def openString(self, xmlImportString):
+        parser = etree.XMLParser(remove_blank_text=True)
+        if isinstance(xmlImportString, str):
+            xmlImportString = xmlImportString.encode('utf-8')
+        self.tree = etree.ElementTree(etree.fromstring(xmlImportString,
+                                                      parser))
+
+    def exportDocumentAsString(self):
+        return etree.tostring(self.tree, encoding='unicode')
+
+    def save(self, fileName):
+        root = self.tree.getroot()
+        etree.indent(root, space='  ')
+        self.tree.write(fileName, encoding='utf-8', xml_declaration=True,
+                        pretty_print=True)
+
+    def close(self):
+        self.tree = None
+        self._xpaths.clear()
+
+    @property
+    def root(self):
+        """ Root element of the document. """
+
+        return self.tree.getroot()
+
+    # Namespaces and schema ---------------------------------------------------
+
+    def registerNamespace(self, namespaceURI, prefix):
+        self.namespaces[prefix] = namespaceURI
+        self._xpaths.clear()
+
+    def declareNamespace(self, elementPath, namespaceURI, prefix):
+        element = self._element(elementPath)
+        if element.nsmap.get(prefix) == namespaceURI:
+            return
+
+        # The namespaces of an lxml element cannot be changed, the element
+        # is replaced by a copy which declares the new one
+        nsmap = dict(element.nsmap)
+        nsmap[prefix] = namespaceURI
+        new_element = etree.Element(element.tag, attrib=dict(element.attrib),
+                                    nsmap=nsmap)
+        new_element.text = element.text
+        new_element.tail = element.tail
+        new_element.extend(list(element))
+        parent = element.getparent()
+        if parent is None:
+            # The new root gets the siblings of the old one (comments and
+            # processing instructions) and a new tree
+            for sibling in reversed(list(element.itersiblings(preceding=True))):
+                new_element.addprevious(sibling)
+            for sibling in reversed(list(element.itersiblings())):
+                new_element.addnext(sibling)
+            self.tree = etree.ElementTree(new_element)
+        else:
+            parent.replace(element, new_element)
+
+    def schemaValidateFromFile(self, xsdFilename):
+        schema = etree.XMLSchema(etree.parse(xsdFilename))
+        if not schema.validate(self.tree):
+            raise LxmlTixiException('Document is not valid: '
+                                    + str(schema.error_log.last_error))
+
+    # Checks and counts -------------------------------------------------------
+
+    def checkElement(self, elementPath):
+        return len(self._find(elementPath)) > 0
+
+    def checkAttribute(self, elementPath, attributeName):
+        element = self._element(elementPath)
+        return self._attribute_name(element, attributeName) in element.attrib
+
+    def getNamedChildrenCount(self, elementPath, childName):
+        element = self._element(elementPath)
+        return sum(1 for child in element if child.tag == childName)
+
+    def getNumberOfChilds(self, elementPath):
+        return len(self._child_names(self._element(elementPath)))
+
+    def getChildNodeName(self, parentElementPath, index):
+        names = self._child_names(self._element(parentElementPath))
+        if not 1 <= index <= len(names):
+            raise LxmlTixiException('Index ' + str(index) + ' out of range '
+                                    + 'for ' + parentElementPath)
+        return names[index-1]
+
+    def xPathEvaluateNodeNumber(self, xPathExpression):
+        return len(self._find(xPathExpression))
+
+    # Creation ----------------------------------------------------------------
+
+    def createElement(self, parentPath, elementName):
+        etree.SubElement(self._element(parentPath), elementName)
+
+    def createElementAtIndex(self, parentPath, elementName, index):
+        parent = self._element(parentPath)
+        children = [child for child in parent
+                    if isinstance(child.tag, str)]
+        if not 1 <= index <= len(children)+1:
+            raise LxmlTixiException('Index ' + str(index) + ' out of range '
+                                    + 'for ' + parentPath)
+        element = etree.Element(elementName)
+        if index <= len(children):
+            children[index-1].addprevious(element)
+        else:
+            parent.append(element)
+
+    def removeElement(self, elementPath):
+        element = self._element(elementPath)
+        element.getparent().remove(element)
+
+    def addTextElement(self, parentPath, elementName, text):
+        element = etree.SubElement(self._element(parentPath), elementName)
+        element.text = text
+
+    def addDoubleElement(self, parentPath, elementName, number, format):
+        self.addTextElement(parentPath, elementName,
+                            self._format(number, format, '%g'))
+
+    def addIntegerElement(self, parentPath, elementName, number, format):
+        self.addTextElement(parentPath, elementName,
+                            self._format(number, format, '%d'))
+
+    def addFloatVector(self, parentPath, elementName, vector, numElements,
+                       format):
+        self.addTextElement(parentPath, elementName,
+                            self._vector_text(vector, numElements, format))
+        # As TIXI, vectors are marked with their CPACS map type
+        self._find(parentPath)[0][-1].set('mapType', 'vector')
+
+    def addTextAttribute(self, elementPath, attributeName, attributeValue):
+        element = self._element(elementPath)
+        element.set(self._attribute_name(element, attributeName),
+                    attributeValue)
+
+    def addCpacsHeader(self, name, creator, version, description,
+                       cpacsVersion):
+        self.createElement('/cpacs', 'header')
+        header_path = '/cpacs/header'
+        self.addTextElement(header_path, 'name', name)
+        self.addTextElement(header_path, 'description', description)
+        self.addTextElement(header_path, 'creator', creator)
+        self.addTextElement(header_path, 'timestamp',
+                            time.strftime('%Y-%m-%dT%H:%M:%S'))
+        self.addTextElement(header_path, 'version', version)
+        self.addTextElement(header_path, 'cpacsVersion', cpacsVersion)
+
+    # Getters -----------------------------------------------------------------
+
+    def getTextElement(self, elementPath):
+        element = self._element(elementPath)
+        return element.text if element.text is not None else ''
+
+    def getDoubleElement(self, elementPath):
+        return float(self._value(elementPath))
+
+    def getIntegerElement(self, elementPath):
+        return int(self._value(elementPath))
+
+    def getBooleanElement(self, elementPath):
+        value = self._value(elementPath).strip().lower()
+        if value not in ('true', 'false', '1', '0'):
+            raise LxmlTixiException(elementPath + ' is not a boolean')
+        return value in ('true', '1')
+
+    def getTextAttribute(self, elementPath, attributeName):
+        element = self._element(elementPath)
+        value = element.get(self._attribute_name(element, attributeName))
+        if value is None:
+            raise LxmlTixiException('No attribute ' + attributeName + ' at '
+                                    + elementPath)
+        return value
+
+    def getAttributeName(self, elementPath, attrIndex):
+        names = list(self._element(elementPath).attrib)
+        if not 1 <= attrIndex <= len(names):
+            raise LxmlTixiException('Index ' + str(attrIndex) + ' out of '
+                                    + 'range for ' + elementPath)
+        return names[attrIndex-1]
+
+    def getVectorSize(self, vectorPath):
+        return len(self._vector(vectorPath))
+
+    def getFloatVector(self, vectorPath, eNumber):
+        return tuple(self._vector(vectorPath)[:eNumber])
+
+    # Updates -----------------------------------------------------------------
+
+    def updateTextElement(self, elementPath, text):
+        self._element(elementPath).text = text
+
+    def updateDoubleElement(self, elementPath, number, format):
+        self.updateTextElement(elementPath,
+                               self._format(number, format, '%g'))
+
+    def updateIntegerElement(self, elementPath, number, format):
+        self.updateTextElement(elementPath,
+                               self._format(number, format, '%d'))
+
+    def updateFloatVector(self, path, vector, numElements, format):
+        self.updateTextElement(path,
+                               self._vector_text(vector, numElements, format))
+
+    # UIDs --------------------------------------------------------------------
+
+    def uIDCheckExists(self, uID):
+        return len(self._compiled('//*[@uID=$uid]')(self.tree, uid=uID)) > 0
+
+    def uIDGetXPath(self, uID):
+        elements = self._compiled('//*[@uID=$uid]')(self.tree, uid=uID)
+        if not elements:
+            raise LxmlTixiException('uID ' + uID + ' not found')
+        return self.tree.getpath(elements[0])
+
+    def uIDSetToXPath(self, xPath, uID):
+        self._element(xPath).set('uID', uID)
+
+    # Internal functions ------------------------------------------------------
+
+    def _compiled(self, path):
+        """ Return the compiled XPath expression of a path. """
+
+        xpath = self._xpaths.get(path)
+        if xpath is None:
+            try:
+                xpath = etree.XPath(path, namespaces=self.namespaces,
+                                    smart_strings=False)
+            except etree.XPathSyntaxError as e:
+                raise LxmlTixiException('Invalid XPath ' + path + ': '
+                                        + str(e))
+            self._xpaths[path] = xpath
+        return xpath
+
+    def _find(self, path):
+        if self.tree is None:
+            raise LxmlTixiException('The document is not open')
+        result = self._compiled(path)(self.tree)
+        if not isinstance(result, list):
+            raise LxmlTixiException(path + ' is not a node set')
+        return result
+
+    def _element(self, path):
+        """ Return the only element matching a path. """
+
+        elements = self._find(path)
+        if not elements:
+            raise LxmlTixiException('Element not found: ' + path)
+        if len(elements) > 1:
+            raise LxmlTixiException('Element path not unique: ' + path)
+        return elements[0]
+
+    def _value(self, path):
+        text = self._element(path).text
+        if text is None or not text.strip():
+            raise LxmlTixiException('No value at ' + path)
+        return text
+
+    def _vector(self, path):
+        try:
+            return parse_float_vector(self._value(path)).tolist()
+        except ValueError as e:
+            raise LxmlTixiException(path + ': ' + str(e))
+
+    def _attribute_name(self, element, attributeName):
+        """ Return the lxml ('{uri}name') name of a prefixed attribute. """
+
+        if ':' not in attributeName:
+            return attributeName
+        (prefix, name) = attributeName.split(':', 1)
+        uri = element.nsmap.get(prefix, self.namespaces.get(prefix))
+        if uri is None:
+            raise LxmlTixiException('Unknown namespace prefix: ' + prefix)
+        return '{' + uri + '}' + name
+
+    @staticmethod
+    def _child_names(element):
+        """ Return the names of the child nodes as given by TIXI. """
+
+        names = []
+        if element.text and element.text.strip():
+            names.append('#text')
+        for child in element:
+            if isinstance(child.tag, str):
+                names.append(child.tag)
+            elif child.tag is etree.Comment:
+                names.append('#comment')
+            if child.tail and child.tail.strip():
+                names.append('#text')
+        return names
+
+    @staticmethod
+    def _format(number, format, default):
+        return (format or default) % number
+
+    @staticmethod
+    def _vector_text(vector, numElements, format):
+        return format_float_vector(np.asarray(vector, dtype=float)[:numElements],
+                                   format or '%g')
+
+
+#==============================================================================
+#   FUNCTIONS
+#==============================================================================
+
+def parse_float_vector(text):
+    """ Parse the text of a CPACS vector (';'-separated floats).
+
+    The text is parsed by numpy in one call, no list of strings is built.
+
+    Args:
+        text (str): Text of the vector, a trailing ';' is allowed
+
+    Returns:
+        vector (ndarray): Values of the vector
+    """
+
+    text = text.strip()
+    if text.endswith(';'):
+        text = text[:-1]
+    if not text:
+        raise ValueError('Empty vector')
+
+    # numpy only warns when it cannot parse the whole text
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            vector = np.fromstring(text, dtype=float, sep=';')
+        except (ValueError, DeprecationWarning):
+            raise ValueError('Invalid float vector: ' + text[:50])
+    return vector
+
+
+def format_float_vector(vector, format='%g'):
+    """ Format a vector of floats as the text of a CPACS vector.
+
+    The format of one value is repeated and applied to all the values at
+    once, as numpy 'savetxt' does for a row.
+
+    Args:
+        vector (list, tuple, ndarray): Values of the vector
+        format (str): Format of each value
+
+    Returns:
+        text (str): Values separated by ';'
+    """
+
+    values = np.asarray(vector, dtype=float).ravel().tolist()
+    return ';'.join([format] * len(values)) % tuple(values)
@@ -2,7 +2,7 @@
 #   fuselage rescaling length function
 
 # Import the functions
-from simplifiedgeometry import transformer, cpacs_generate
+from simplifiedgeometry import transformer, transformer_batch, transformer_parallel, cpacs_generate
 
 
 # ----------------------
@@ -20,6 +20,24 @@ fuse_length_out = 30
 # Run the resizing function
 transformer(cpacs_in, cpacs_out, geometry_dict={'fuse_length': fuse_length_out})
 
+# By default the current fuselage length is read directly from the
+# positionings of the CPACS file. To evaluate it with the full TiGL
+# geometry analysis instead, use:
+# transformer(cpacs_in, cpacs_out, geometry_dict={'fuse_length': 30},
+#             use_tigl=True)
+
+# To write several resized variants of the same aircraft, the input file
+# is parsed and analysed only once with:
+# transformer_batch(cpacs_in, [{'fuse_length': 25}, {'fuse_length': 35}],
+#                   'cpacs/test_cpacs_{fuse_length}.xml')
+
+# Several input files can be transformed on a pool of worker processes,
+# the results are returned as soon as each job is done:
+# jobs = [(cpacs_in, 'cpacs/test_cpacs_25.xml', {'fuse_length': 25}),
+#         (cpacs_in, 'cpacs/test_cpacs_35.xml', {'fuse_length': 35})]
+# for job, result, error in transformer_parallel(jobs, max_workers=2):
+#     print(job[1], result, error)
+
 # done!
 
 
@@ -40,4 +58,27 @@ tail_frac = 0.05
 # generate the fuselage
 cpacs_generate(aircraftname, tot_len, nose_frac, tail_frac)
 
+# The number of sections (6 by default) and of points of the circular
+# profile (82 by default) can be increased for high-fidelity fuselages:
+# cpacs_generate(aircraftname, tot_len, num_sections=200, num_points=164)
+
+# The file is checked against the CPACS schema (compiled once per process)
+# before it is saved. To generate many files, the validation can be done in
+# a background thread (validation='deferred') or skipped (validation='skip'):
+# future = cpacs_generate(aircraftname, tot_len, validation='deferred')
+# future.result()  # raises CpacsValidationError if the file is not valid
+
+# For large families of fuselages with the same number of sections, the
+# document can be built once as a template, each file is then written by
+# patching the name and the lengths of the template:
+# from simplifiedgeometry import FuselageTemplate
+# template = FuselageTemplate(num_sections=6)
+# for i, length in enumerate([18, 20, 22]):
+#     template.generate(f'{aircraftname}_{i}', length, nose_frac, tail_frac)
+
+# To generate many files, the streaming mode writes the same file without
+# building the document in memory first (it is not validated):
+# from simplifiedgeometry import cpacs_generate_stream
+# cpacs_generate_stream(aircraftname, tot_len, nose_frac, tail_frac)
+
 # done!
@@ -1,13 +1,26 @@
 import os
+import time
 import numpy as np
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
 
 from ceasiompy.utils.WB.ConvGeometry import geometry
-from ceasiompy.utils.cpacsfunctions import aircraft_name, open_tixi, close_tixi, add_uid
-from tixi3 import tixi3wrapper as tixi
+from ceasiompy.utils.cpacsfunctions import CpacsSession, get_aircraft_name, close_tixi, add_uid, new_tixi, add_float_array
+from ceasiompy.utils.cpacsfunctions import xml_tree, find_nodes, get_child_nodes, get_node_values, set_node_values
+from ceasiompy.utils.cpacswriter import CpacsStreamWriter
+from ceasiompy.utils.cpacsvalidator import get_validator, VALIDATION_MODES
+from ceasiompy.utils.profiling import profiled
+
+# Default number of sections and of profile points of the generated fuselages
+NUM_SECTIONS = 6
+NUM_PROFILE_POINTS = 82
 
 # currently only works for fuse_length
 
-def transformer(input_file, output_file='output_cpacs.xml', geometry_dict={}):
+@profiled()
+def transformer(input_file, output_file='output_cpacs.xml', geometry_dict={},
+                use_tigl=False):
     """Transforms a CPACS aircraft geometry by rescaling individual sections
 
     Parameters
@@ -20,23 +33,343 @@ def transformer(input_file, output_file='output_cpacs.xml', geometry_dict={}):
         A dictionary of aircraft geometry parameters with the values
             that the output CPACS file should have
         dict keywords: fuselage_length, wing_span
+    use_tigl : bool, default = False
+        If True, the current fuselage length is evaluated by the full TiGL
+            geometry analysis (geometry_eval) instead of being resolved
+            directly from the positionings of the CPACS file
     """
 
     fuse_length_change = geometry_dict.get('fuse_length', 'None')
 
-    name = aircraft_name(input_file)
-    ag = geometry.geometry_eval(input_file, name)
-    fuse_length = ag.fuse_length[0]
-    scale = fuse_length_change/fuse_length
-
-    tixi_handle = open_tixi(input_file)
-    tixi_handle = section_transformer(tixi_handle, scale, ag.fuse_sec_nb[0])
-    tixi_handle = positioning_transformer(tixi_handle, scale)
-    close_tixi(tixi_handle, output_file)
+    # The analysis and the transformation share one session, so the input
+    # file is parsed once and the TiGL handle is built once (if needed)
+    session = CpacsSession(input_file)
+    try:
+        fuse_length, sec_uids = fuselage_reference(session, use_tigl)
+        scale = fuse_length_change/fuse_length
+
+        # Both transformations edit the same tree, the document is
+        # exported and reloaded only once (and the TiGL handle closed)
+        with session.xml_tree():
+            tixi_handle = section_transformer(session.tixi, scale, sec_uids)
+            tixi_handle = positioning_transformer(tixi_handle, scale)
+    except Exception:
+        session.close()
+        raise
+    session.close(output_file)
     return 'done'
 
 
-def section_transformer(tixi_handle, scale, num_sec):
+@profiled()
+def transformer_batch(input_file, geometry_dicts,
+                      output_pattern='output_cpacs_{index}.xml',
+                      use_tigl=False):
+    """Transforms a CPACS aircraft geometry into several rescaled variants
+
+    The input file is parsed and analysed only once, each variant is then
+    written from a copy of the in-memory document.
+
+    Parameters
+    ----------
+    input_file : str
+        The location of the CPACS file
+    geometry_dicts : list of dict
+        One dictionary of aircraft geometry parameters per output file,
+            see transformer for the keywords
+    output_pattern : str
+        Pattern of the output file names, formatted with the keywords of
+            the geometry dictionary of the variant and its index ('index'
+            takes precedence over a geometry keyword of the same name),
+            e.g. 'cpacs/fuse_{fuse_length}.xml'
+            (default output_cpacs_{index}.xml)
+    use_tigl : bool, default = False
+        If True, the current fuselage length is evaluated by the full TiGL
+            geometry analysis (geometry_eval)
+
+    Returns
+    -------
+    output_files : list of str
+        The names of the output files, in the order of geometry_dicts
+    """
+
+    session = CpacsSession(input_file)
+    try:
+        fuse_length, sec_uids = fuselage_reference(session, use_tigl)
+        cpacs_string = session.tixi.exportDocumentAsString()
+    finally:
+        session.close()
+
+    output_files = []
+    for index, geometry_dict in enumerate(geometry_dicts):
+        scale = geometry_dict.get('fuse_length', 'None')/fuse_length
+        fields = dict(geometry_dict, index=index)
+        output_file = output_pattern.format(**fields)
+
+        # Clone the source document instead of reading the file again
+        tixi_handle = new_tixi()
+        tixi_handle.openString(cpacs_string)
+        with xml_tree(tixi_handle):
+            tixi_handle = section_transformer(tixi_handle, scale, sec_uids)
+            tixi_handle = positioning_transformer(tixi_handle, scale)
+        close_tixi(tixi_handle, output_file)
+        output_files.append(output_file)
+
+    return output_files
+
+
+def transformer_parallel(jobs, max_workers=None, mp_context=None,
+                         use_tigl=False, max_pending=None):
+    """Runs transformer on several CPACS files with a pool of processes
+
+    TIXI and TiGL handles cannot be shared between threads, so each job is
+    run in its own worker process. The workers import the CPACS libraries
+    (tixi3 and tigl3, when installed) once when they start and are reused
+    for all the following jobs.
+
+    Parameters
+    ----------
+    jobs : iterable of tuple
+        The jobs to run, as (input_file, output_file, geometry_dict),
+            see transformer for the meaning of each item
+    max_workers : int, optional
+        The number of worker processes (default os.cpu_count())
+    mp_context : multiprocessing context, optional
+        The context used to start the workers, e.g.
+            multiprocessing.get_context('spawn')
+    use_tigl : bool, default = False
+        Passed to transformer for every job
+    max_pending : int, optional
+        The maximum number of jobs submitted to the workers and not yet
+            yielded (default 2*max_workers), jobs is read as they complete
+
+    Yields
+    ------
+    job : tuple
+        The job as it was given
+    result : str or None
+        The value returned by transformer, None if the job failed
+    error : Exception or None
+        The exception raised by the job, None if it succeeded
+
+    The results are yielded as soon as each job completes, so their order
+    is not the order of jobs. If the iteration is stopped early (break,
+    exception or close), the jobs not started yet are cancelled and the
+    generator does not wait for the running ones.
+    """
+
+    if max_pending is None:
+        max_pending = 2*(max_workers or os.cpu_count() or 1)
+    max_pending = max(max_pending, 1)
+
+    jobs = iter(jobs)
+    pending = {}
+    executor = ProcessPoolExecutor(max_workers=max_workers,
+                                   mp_context=mp_context,
+                                   initializer=_warm_worker)
+    try:
+        while True:
+            for job in islice(jobs, max_pending - len(pending)):
+                pending[executor.submit(_run_job, job, use_tigl)] = job
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                error = future.exception()
+                if error is None:
+                    yield job, future.result(), None
+                else:
+                    yield job, None, error
+    finally:
+        # Same as shutdown(cancel_futures=True), which needs Python 3.9
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def _warm_worker():
+    """Internal function.
+    Imports the TIXI and TiGL libraries when a worker process starts
+    """
+
+    import ceasiompy.utils.cpacsfunctions
+
+
+def _run_job(job, use_tigl=False):
+    """Internal function.
+    Runs one transformer job in a worker process
+    """
+
+    input_file, output_file, geometry_dict = job
+    return transformer(input_file, output_file, geometry_dict, use_tigl)
+
+
+@profiled()
+def fuselage_reference(session, use_tigl=False):
+    """Internal function.
+    Gets the current length and the sections of the fuselage
+
+    Parameters
+    ----------
+    session : CpacsSession
+        The session of the CPACS file to be changed
+    use_tigl : bool, default = False
+        If True, runs the full TiGL geometry analysis (geometry_eval),
+            otherwise the values are resolved from the XML only
+
+    Returns
+    -------
+    fuse_length : float
+        The length of the fuselage
+    sec_uids : list of str
+        The uIDs of the sections making up the fuselage
+    """
+
+    # The aircraft name is always looked up so that both paths write the
+    # same header to the output file
+    name = get_aircraft_name(session.tixi)
+    fuse_length, sec_uids = fuselage_sections_from_positionings(session.tixi)
+    if use_tigl:
+        ag = geometry.geometry_eval(session.cpacs_path, name, session)
+        fuse_length = ag.fuse_length[0]
+
+    return fuse_length, sec_uids
+
+
+def fuselage_length_from_positionings(tixi_handle):
+    """Internal function.
+    Evaluates the fuselage length and number of sections without TiGL
+
+    See fuselage_sections_from_positionings
+
+    Returns
+    -------
+    fuse_length : float
+        The length of the fuselage
+    num_sec : int
+        The number of sections making up the fuselage
+    """
+    fuse_length, sec_uids = fuselage_sections_from_positionings(tixi_handle)
+    return fuse_length, len(sec_uids)
+
+
+def fuselage_sections_from_positionings(tixi_handle):
+    """Internal function.
+    Evaluates the fuselage length and its sections without TiGL
+
+    The x position of each section is the sum of the positionings chain
+    leading to it (x = length * sin(sweepAngle), as in TiGL) plus the
+    x translation of the section and of its element. The length is the
+    distance between the first and the last section used by the segments,
+    scaled by the fuselage x scaling. Rotations are not considered and the
+    fuselage profiles are assumed to lie in the y-z plane, as for the
+    fuselages this tool generates and resizes.
+
+    The sections making up the fuselage are the ones connected by the
+    segments (all the sections if there is no segment), whatever their
+    order in the document.
+
+    Parameters
+    ----------
+    tixi_handle : tixi handle object
+        A tixi handle to the cpacs file
+
+    Returns
+    -------
+    fuse_length : float
+        The length of the fuselage
+    sec_uids : list of str
+        The uIDs of the sections making up the fuselage, in document order
+    """
+    fuse_xpath = '/cpacs/vehicles/aircraft/model/fuselages/fuselage'
+    fuse_scale = _get_double_or_default(tixi_handle,
+                    fuse_xpath + '/transformation/scaling/x', 1.0)
+
+    # x offset of each section and owner section of each element
+    sec_offset = {}
+    elem_section = {}
+    sections_xpath = fuse_xpath + '/sections'
+    num_sec = tixi_handle.getNamedChildrenCount(sections_xpath, 'section')
+    for i in range(1, num_sec+1):
+        sec_xpath = sections_xpath + f'/section[{i}]'
+        sec_uid = tixi_handle.getTextAttribute(sec_xpath, 'uID')
+        sec_trans = _get_double_or_default(tixi_handle,
+                        sec_xpath + '/transformation/translation/x', 0.0)
+        sec_scale = _get_double_or_default(tixi_handle,
+                        sec_xpath + '/transformation/scaling/x', 1.0)
+        elem_xpath = sec_xpath + '/elements/element[1]'
+        elem_trans = _get_double_or_default(tixi_handle,
+                        elem_xpath + '/transformation/translation/x', 0.0)
+        sec_offset[sec_uid] = sec_trans + sec_scale*elem_trans
+        num_elem = tixi_handle.getNamedChildrenCount(sec_xpath + '/elements',
+                                                     'element')
+        for j in range(1, num_elem+1):
+            elem_uid = tixi_handle.getTextAttribute(
+                sec_xpath + f'/elements/element[{j}]', 'uID')
+            elem_section[elem_uid] = sec_uid
+
+    # x increment given by each positioning to its 'to' section
+    positionings = {}
+    pos_xpath = fuse_xpath + '/positionings'
+    if tixi_handle.checkElement(pos_xpath):
+        num_pos = tixi_handle.getNamedChildrenCount(pos_xpath, 'positioning')
+        for i in range(1, num_pos+1):
+            xpath = pos_xpath + f'/positioning[{i}]'
+            length = tixi_handle.getDoubleElement(xpath + '/length')
+            sweep = _get_double_or_default(tixi_handle,
+                                           xpath + '/sweepAngle', 0.0)
+            to_uid = tixi_handle.getTextElement(xpath + '/toSectionUID')
+            from_uid = None
+            if tixi_handle.checkElement(xpath + '/fromSectionUID'):
+                from_uid = tixi_handle.getTextElement(xpath
+                                                      + '/fromSectionUID')
+            positionings[to_uid] = (from_uid,
+                                    length*np.sin(np.radians(sweep)))
+
+    # Resolve the positionings chain once for every section
+    pos_x = {}
+    for sec_uid in sec_offset:
+        chain = []
+        uid = sec_uid
+        while uid and uid not in pos_x and uid not in chain:
+            chain.append(uid)
+            uid = positionings.get(uid, (None, 0.0))[0]
+        x = pos_x.get(uid, 0.0)
+        for uid in reversed(chain):
+            x += positionings.get(uid, (None, 0.0))[1]
+            pos_x[uid] = x
+
+    # Only the sections used by the segments make up the fuselage
+    used = set()
+    seg_xpath = fuse_xpath + '/segments'
+    if tixi_handle.checkElement(seg_xpath):
+        num_seg = tixi_handle.getNamedChildrenCount(seg_xpath, 'segment')
+        for i in range(1, num_seg+1):
+            xpath = seg_xpath + f'/segment[{i}]'
+            for tag in ['fromElementUID', 'toElementUID']:
+                elem_uid = tixi_handle.getTextElement(xpath + '/' + tag)
+                used.add(elem_section[elem_uid])
+    if not used:
+        used = set(sec_offset)
+
+    sec_uids = [uid for uid in sec_offset if uid in used]
+    sec_x = [pos_x[uid] + sec_offset[uid] for uid in sec_uids]
+    fuse_length = float(abs(fuse_scale) * (max(sec_x) - min(sec_x)))
+
+    return fuse_length, sec_uids
+
+
+def _get_double_or_default(tixi_handle, xpath, default):
+    """Internal function.
+    Returns the value at xpath, or the default if the element does not exist
+    """
+    if tixi_handle.checkElement(xpath):
+        return tixi_handle.getDoubleElement(xpath)
+    return default
+
+
+@profiled()
+def section_transformer(tixi_handle, scale, sec_uids):
     """Internal Function.
     Rescales the section scaling parameter for the fuselage
     Also translates each section in the z-axis so that sections
@@ -48,8 +381,9 @@ def section_transformer(tixi_handle, scale, num_sec):
         A tixi handle to the cpacs file to be changed
     scale : num
         The value of the scale factor
-    num_sec : num
-        The number of sections making up the fuselage
+    sec_uids : list of str
+        The uIDs of the sections making up the fuselage, the other
+            sections are not changed
 
     Returns
     -------
@@ -57,29 +391,23 @@ def section_transformer(tixi_handle, scale, num_sec):
         The now edited tixi handle
     """
     sections_xpath = '/cpacs/vehicles/aircraft/model/fuselages/\
-                        fuselage/sections/'
-    for i in np.arange(num_sec):
-        scaling_xpath = sections_xpath +\
-            f'section[{i+1}]/transformation/scaling/'
-        translate_xpath = sections_xpath +\
-            f'section[{i+1}]/transformation/translation/z'
-
-        # get current values
-        x_val = tixi_handle.getDoubleElement(scaling_xpath+'x')
-        y_val = tixi_handle.getDoubleElement(scaling_xpath+'y')
-        z_val = tixi_handle.getDoubleElement(scaling_xpath+'z')
-        z_val_elem = tixi_handle.getDoubleElement(translate_xpath)
-
-        # update current values
-        tixi_handle.updateDoubleElement(scaling_xpath+'x', x_val*scale, '%.8f')
-        tixi_handle.updateDoubleElement(scaling_xpath+'y', y_val*scale, '%.8f')
-        tixi_handle.updateDoubleElement(scaling_xpath+'z', z_val*scale, '%.8f')
-        tixi_handle.updateDoubleElement(translate_xpath, z_val_elem*scale,
-                                        '%.8f')
+                        fuselage[1]/sections/section'
+    value_paths = ['transformation/scaling/x', 'transformation/scaling/y',
+                   'transformation/scaling/z', 'transformation/translation/z']
+
+    # All the values of one kind are read and updated at once
+    with xml_tree(tixi_handle) as root:
+        sec_uids = set(sec_uids)
+        sections = [section for section in find_nodes(root, sections_xpath)
+                    if section.get('uID') in sec_uids]
+        for path in value_paths:
+            nodes = get_child_nodes(sections, path)
+            set_node_values(nodes, get_node_values(nodes)*scale, '%.8f')
 
     return tixi_handle
 
 
+@profiled()
 def positioning_transformer(tixi_handle, scale):
     """Internal function.
     Rescales the length of each fuselage segment
@@ -98,19 +426,17 @@ def positioning_transformer(tixi_handle, scale):
     """
 
     positionings_xpath = '/cpacs/vehicles/aircraft/model/fuselages/\
-                            fuselage/positionings'
-    num_pos = tixi_handle.getNamedChildrenCount(positionings_xpath,
-                                                'positioning')
-    for i in np.arange(num_pos):
-        length_xpath = positionings_xpath + f'/positioning[{i+1}]/length'
-        # get current values
-        length = tixi_handle.getDoubleElement(length_xpath)
-        # update current values
-        tixi_handle.updateDoubleElement(length_xpath, length*scale, '%.8f')
+                            fuselage[1]/positionings/positioning'
+    with xml_tree(tixi_handle) as root:
+        positionings = find_nodes(root, positionings_xpath)
+        nodes = get_child_nodes(positionings, 'length')
+        set_node_values(nodes, get_node_values(nodes)*scale, '%.8f')
     return tixi_handle
 
 
-def cpacs_generate(aircraftname, tot_len, nose_frac=0.1, tail_frac=0.1):
+def cpacs_generate(aircraftname, tot_len, nose_frac=0.1, tail_frac=0.1,
+                   validation='sync', num_sections=NUM_SECTIONS,
+                   num_points=NUM_PROFILE_POINTS):
     """Generates a new CPACS file with a fuselage defined in it
 
     Parameters
@@ -123,27 +449,357 @@ def cpacs_generate(aircraftname, tot_len, nose_frac=0.1, tail_frac=0.1):
         Fraction of the total length that comprises the nose section
     tail_frac : float, default = 0.1
         Fraction of the total length that comprises the tail section
+    validation : str, default = 'sync'
+        Validation against the CPACS schema: 'sync' before the file is
+            saved, 'deferred' in a background thread once it is saved, or
+            'skip' for trusted output
+    num_sections : int, default = 6
+        Number of sections of the fuselage (at least 4)
+    num_points : int, default = 82
+        Number of points of the circular fuselage profile (at least 3)
+
+    Returns
+    -------
+    future : Future or None
+        With deferred validation, the result of the validation (its result
+            method raises CpacsValidationError if the file is not valid)
 
     Outputs
     -------
     A CPACS file named aircraftname.xml
     """
 
+    check_validation_mode(validation)
+    check_resolution(num_sections, num_points)
+
     # Instantiate class and create handle for it
-    tixi_handle = tixi.Tixi3()
-    tixi.Tixi3.create(tixi_handle, rootElementName='cpacs')
+    tixi_handle = new_tixi()
+    tixi_handle.create(rootElementName='cpacs')
 
     # Generate CPACS XML tag structure
     tixi_handle = generate_cpacs_structure(tixi_handle, aircraftname)
 
     # Create fuselage
     tixi_handle = build_fuselage(tixi_handle, tot_len, nose_frac, tail_frac,
-                                    'Fuselage')
+                                    'Fuselage', num_sections, num_points)
 
     # Check that CPACS file matches schema
-    tixi_handle.schemaValidateFromFile('cpacs_schema.xsd')
+    if validation == 'sync':
+        get_validator().validate(tixi_handle)
+
+    output_file = f"cpacs/{aircraftname}.xml"
+    close_tixi(tixi_handle, output_file)
 
-    close_tixi(tixi_handle, f"cpacs/{aircraftname}.xml")
+    if validation == 'deferred':
+        return get_validator().submit(output_file)
+    return None
+
+
+def cpacs_generate_stream(aircraftname, tot_len, nose_frac=0.1,
+                          tail_frac=0.1, output=None, validation='skip',
+                          num_sections=NUM_SECTIONS,
+                          num_points=NUM_PROFILE_POINTS):
+    """Generates a new CPACS file with a fuselage defined in it, streaming mode
+
+    The CPACS file is the same as the one of cpacs_generate, but it is
+    written element by element with a CpacsStreamWriter instead of being
+    built as a tixi document first, so the memory used does not depend on
+    the number of sections. By default the file is not validated against
+    the schema.
+
+    Parameters
+    ----------
+    aircraftname : str
+        The name of the aircraft and filename of the output CPACS file
+    tot_len : float
+        Total length of the fuselage
+    nose_frac : float, default = 0.1
+        Fraction of the total length that comprises the nose section
+    tail_frac : float, default = 0.1
+        Fraction of the total length that comprises the tail section
+    output : str or file object, default = None
+        Location of the output CPACS file, or a file object (or buffer) to
+            write it to. By default the file is cpacs/aircraftname.xml
+    validation : str, default = 'skip'
+        Validation of the written file against the CPACS schema: 'sync',
+            'deferred' (in a background thread) or 'skip'. Only a file
+            given by its location can be validated
+    num_sections : int, default = 6
+        Number of sections of the fuselage (at least 4)
+    num_points : int, default = 82
+        Number of points of the circular fuselage profile (at least 3)
+
+    Returns
+    -------
+    future : Future or None
+        With deferred validation, the result of the validation
+
+    Outputs
+    -------
+    A CPACS file named aircraftname.xml (or the given output)
+    """
+
+    check_validation_mode(validation)
+    check_resolution(num_sections, num_points)
+    if output is None:
+        output = f"cpacs/{aircraftname}.xml"
+    if validation != 'skip' and not isinstance(output, (str, os.PathLike)):
+        raise ValueError('Only a CPACS file given by its location can be '
+                         'validated')
+
+    name = 'Fuselage'
+    profile_id = 'fuselageCircleProfileID'
+
+    with CpacsStreamWriter(output) as writer:
+        writer.start('cpacs', {
+            'xmlns:xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+            'xsi:noNamespaceSchemaLocation': 'cpacs_schema.xsd'})
+        writer.header(name=aircraftname, creator='Noah Sadaka',
+                      version='N/A', description='...', cpacsVersion='3.2')
+        writer.start('vehicles')
+        writer.start('aircraft')
+        writer.start('model', uid='CPACSaircraft')
+        writer.element('description', '...')
+        writer.element('name', 'Generated Fuselage')
+        writer.start('reference')
+        writer.element('area', '%f' % 1)
+        writer.element('length', '%f' % 1)
+        writer.start('point', uid='fuse_point1')
+        for axis in ['x', 'y', 'z']:
+            writer.element(axis, '%f' % 0.0)
+        writer.end()
+        writer.end()
+
+        writer.start('fuselages')
+        writer.start('fuselage', uid='Fuselage_1ID')
+        writer.element('description', 'Generic Fuselage')
+        writer.element('name', 'fuselage_1')
+        stream_transformation(writer, 'Fuselage_1ID_transformation1')
+
+        writer.start('sections')
+        for i in range(1, num_sections+1):
+            stream_section(writer, name, profile_id, i,
+                           i == 1 or i == num_sections)
+        writer.end()
+
+        writer.start('positionings')
+        for i in range(1, num_sections+1):
+            pos_uid = f"{name}_positioning{i}ID"
+            writer.start('positioning', uid=pos_uid)
+            writer.element('name', f"{name}_positioning{i}")
+            writer.element('dihedralAngle', '%g' % 0)
+            writer.element('sweepAngle', '%g' % 90)
+            writer.element('toSectionUID', f"{name}_section{i}ID")
+            length = positioning_length(i, num_sections, tot_len, nose_frac,
+                                        tail_frac)
+            writer.element('length', '%g' % length)
+            if i > 1:
+                writer.element('fromSectionUID', f"{name}_section{i-1}ID")
+            writer.end()
+        writer.end()
+
+        writer.start('segments')
+        for i in range(1, num_sections):
+            segment_name = f"{name}_segment{i}"
+            writer.start('segment', uid=segment_name+'ID')
+            writer.element('name', segment_name)
+            writer.element('fromElementUID',
+                           f"{name}section{i}ID_element1ID")
+            writer.element('toElementUID',
+                           f"{name}section{i+1}ID_element1ID")
+            writer.end()
+        writer.end()
+
+        # fuselage, fuselages, model, aircraft
+        for i in range(4):
+            writer.end()
+
+        writer.start('profiles')
+        writer.start('fuselageProfiles')
+        writer.start('fuselageProfile', uid=profile_id)
+        writer.element('name', 'Circle')
+        writer.element('description', 'Profile build up from set of points on circle where dimensions are 1 ... -1')
+        writer.start('pointList')
+        for axis, vec in zip(['x', 'y', 'z'], circle_profile_points(num_points)):
+            writer.vector(axis, vec, '%.12f')
+
+    if validation == 'sync':
+        get_validator().validate(output)
+    elif validation == 'deferred':
+        return get_validator().submit(output)
+    return None
+
+
+class FuselageTemplate:
+    """Template of the CPACS files generated by cpacs_generate
+
+    The whole CPACS document (header, model, reference, sections, elements,
+    transformations, positionings, segments and circle profile) is built
+    once. Each aircraft is then generated by patching the name, the
+    timestamp and the positioning lengths of the template and writing it,
+    which is much cheaper than building the document again. The generated
+    uIDs do not depend on the aircraft, so they are the ones of the
+    template.
+
+    The template is validated against the CPACS schema when it is built,
+    the generated files are not validated again. A template must not be
+    shared between threads.
+
+    Parameters
+    ----------
+    num_sections : int, default = 6
+        Number of sections of the fuselage (at least 4)
+    num_points : int, default = 82
+        Number of points of the circular fuselage profile (at least 3)
+    validate : bool, default = True
+        If True, the template is validated against the CPACS schema
+    """
+
+    def __init__(self, num_sections=NUM_SECTIONS,
+                 num_points=NUM_PROFILE_POINTS, validate=True):
+        check_resolution(num_sections, num_points)
+        self.num_sections = num_sections
+        self.num_points = num_points
+
+        # The template is an lxml document, its nodes are patched directly
+        tixi_handle = new_tixi('lxml')
+        tixi_handle.create(rootElementName='cpacs')
+        tixi_handle = generate_cpacs_structure(tixi_handle, 'template')
+        tixi_handle = build_fuselage(tixi_handle, 1.0, 0.1, 0.1, 'Fuselage',
+                                     num_sections, num_points)
+        if validate:
+            get_validator().validate(tixi_handle)
+        self.tixi_handle = tixi_handle
+
+        root = tixi_handle.root
+        self._name = root.find('header/name')
+        self._timestamp = root.find('header/timestamp')
+        self._lengths = root.findall('vehicles/aircraft/model/fuselages/'
+                                     'fuselage/positionings/positioning/'
+                                     'length')
+
+    def generate(self, aircraftname, tot_len, nose_frac=0.1, tail_frac=0.1,
+                 output=None):
+        """Generates a CPACS file from the template, as cpacs_generate
+
+        Parameters
+        ----------
+        aircraftname : str
+            The name of the aircraft and filename of the output CPACS file
+        tot_len : float
+            Total length of the fuselage
+        nose_frac : float, default = 0.1
+            Fraction of the total length that comprises the nose section
+        tail_frac : float, default = 0.1
+            Fraction of the total length that comprises the tail section
+        output : str or file object, default = None
+            Location of the output CPACS file, or a file object to write it
+                to. By default the file is cpacs/aircraftname.xml
+
+        Returns
+        -------
+        output : str or file object
+            The output CPACS file
+        """
+
+        self._name.text = aircraftname
+        self._timestamp.text = time.strftime('%Y-%m-%dT%H:%M:%S')
+        for i, node in enumerate(self._lengths, 1):
+            node.text = '%g' % positioning_length(i, self.num_sections,
+                                                  tot_len, nose_frac,
+                                                  tail_frac)
+
+        if output is None:
+            output = f"cpacs/{aircraftname}.xml"
+        if isinstance(output, (str, os.PathLike)):
+            dir_path = os.path.dirname(output)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+        self.tixi_handle.save(output)
+        return output
+
+
+def check_resolution(num_sections, num_points):
+    """Internal function.
+    Raises a ValueError if the fuselage has too few sections or profile points
+    """
+
+    if num_sections < 4:
+        raise ValueError(f"A fuselage needs at least 4 sections, "
+                         f"{num_sections} given")
+    if num_points < 3:
+        raise ValueError(f"A fuselage profile needs at least 3 points, "
+                         f"{num_points} given")
+
+
+def check_validation_mode(validation):
+    """Internal function.
+    Raises a ValueError if the validation mode is unknown
+    """
+
+    if validation not in VALIDATION_MODES:
+        raise ValueError(f"Unknown validation mode '{validation}', "
+                         f"expected one of {VALIDATION_MODES}")
+
+
+def stream_transformation(writer, uid_name, scaling=(1, 1, 1)):
+    """Internal function.
+    Writes a transformation element with a streaming writer
+
+    Parameters
+    ----------
+    writer : CpacsStreamWriter
+        The writer of the cpacs file to be created
+    uid_name : str
+        uID of the transformation, used to generate the other uIDs
+    scaling : tuple, default = (1, 1, 1)
+        Scaling factors along x, y and z
+    """
+
+    writer.start('transformation', uid=uid_name)
+    for i in ['rotation', 'scaling', 'translation']:
+        attrs = {'refType': 'absLocal'} if i == 'translation' else None
+        writer.start(i, attrs, uid=f"{uid_name}_{i}1")
+        values = scaling if i == 'scaling' else (0, 0, 0)
+        for axis, value in zip(['x', 'y', 'z'], values):
+            writer.element(axis, '%d' % value)
+        writer.end()
+    writer.end()
+
+
+def stream_section(writer, name, profile_id, section_num, end_section=False):
+    """Internal function.
+    Writes a section with a streaming writer, as add_section (or
+    add_end_section for the first and last sections)
+
+    Parameters
+    ----------
+    writer : CpacsStreamWriter
+        The writer of the cpacs file to be created
+    name : str
+        section name, used to generate a UID
+    profile_id : str
+        profile ID used for this section
+    section_num : int
+        number corresponding to which section this is
+    end_section : bool, default = False
+        If True, the section is reduced to a point
+    """
+
+    writer.start('section', uid=f"{name}_section{section_num}ID")
+    writer.element('name', name)
+    stream_transformation(writer,
+                          f"{name}section{section_num}ID_transformation1")
+    writer.start('elements')
+    element_uid = f"{name}section{section_num}ID_element1ID"
+    writer.start('element', uid=element_uid)
+    writer.element('name', f"{name}section{section_num}element1")
+    writer.element('profileUID', profile_id)
+    scaling = (1, 0, 0) if end_section else (1, 1, 1)
+    stream_transformation(writer, f"{element_uid}_transformation1", scaling)
+    writer.end()
+    writer.end()
+    writer.end()
 
 
 def generate_cpacs_structure(tixi_handle, aircraftname):
@@ -236,7 +892,8 @@ def generate_cpacs_structure(tixi_handle, aircraftname):
     return tixi_handle
 
 
-def build_fuselage(tixi_handle, tot_len, nose_frac, tail_frac, name):
+def build_fuselage(tixi_handle, tot_len, nose_frac, tail_frac, name,
+                   num_sections=NUM_SECTIONS, num_points=NUM_PROFILE_POINTS):
     """ Internal function, generate fuselage geometry
 
     Parameters
@@ -251,27 +908,23 @@ def build_fuselage(tixi_handle, tot_len, nose_frac, tail_frac, name):
         Fraction of the total length that comprises the tail section
     name : str
         section name, used to generate a UID
+    num_sections : int, default = 6
+        Number of sections of the fuselage
+    num_points : int, default = 82
+        Number of points of the circular fuselage profile
 
     Returns
     -------
     tixi_handle : tixi handle object
     """
 
-    profile_id, tixi_handle = add_circular_fuse_profile(tixi_handle)
+    profile_id, tixi_handle = add_circular_fuse_profile(tixi_handle,
+                                                        num_points)
 
     # Create lengths of each section
-    nose_len = nose_frac * tot_len
-    tail_len = tail_frac * tot_len
-    main_len = tot_len - nose_len - tail_len
-    num_sections = 6
-    pos_len_vec = []
-    pos_len_vec.append(0)
-    pos_len_vec.append(nose_len)
-    num_middle_sections = num_sections - 2
-    len_middle_sections = main_len / num_middle_sections
-    for i in range(num_middle_sections-1):
-        pos_len_vec.append(len_middle_sections)
-    pos_len_vec.append(tail_len)
+    pos_len_vec = [positioning_length(i, num_sections, tot_len, nose_frac,
+                                      tail_frac)
+                   for i in range(1, num_sections+1)]
 
     for i in range(1, num_sections+1):
         if i == 1 or i == num_sections:
@@ -290,6 +943,43 @@ def build_fuselage(tixi_handle, tot_len, nose_frac, tail_frac, name):
     return tixi_handle
 
 
+def positioning_length(pos_num, num_sections, tot_len, nose_frac, tail_frac):
+    """ Internal function, length of a positioning of the generated fuselage
+
+    The first positioning has no length, the second one spans the nose, the
+    last one the tail, and the main section is shared by the num_sections-3
+    others, so the lengths of all the positionings add up to tot_len.
+
+    Parameters
+    ----------
+    pos_num : int
+        number corresponding to positioning index
+    num_sections : int
+        Number of sections of the fuselage
+    tot_len : float
+        Total length of the fuselage
+    nose_frac : float
+        Fraction of the total length that comprises the nose section
+    tail_frac : float
+        Fraction of the total length that comprises the tail section
+
+    Returns
+    -------
+    length : float
+    """
+
+    nose_len = nose_frac * tot_len
+    tail_len = tail_frac * tot_len
+    main_len = tot_len - nose_len - tail_len
+    if pos_num == 1:
+        return 0
+    if pos_num == 2:
+        return nose_len
+    if pos_num == num_sections:
+        return tail_len
+    return main_len / (num_sections - 3)
+
+
 def add_positioning(tixi_handle, name, length, to_section_uid, from_section_uid, pos_num):
     """ Internal function, add positionings to CPACS file
 
@@ -492,7 +1182,7 @@ def add_end_section(tixi_handle, name, profile_id, section_num):
     return section_uid, element_uid, tixi_handle
 
 
-def add_circular_fuse_profile(tixi_handle):
+def add_circular_fuse_profile(tixi_handle, num_points=NUM_PROFILE_POINTS):
     """Internal function.
     Adds a circular profile to the CPACS file
 
@@ -500,6 +1190,8 @@ def add_circular_fuse_profile(tixi_handle):
     ----------
     tixi_handle : tixi handle object
         A tixi handle to the cpacs file to be created
+    num_points : int, default = 82
+        Number of points of the profile
 
     Returns
     -------
@@ -523,11 +1215,40 @@ def add_circular_fuse_profile(tixi_handle):
     base_path += '/pointList'
 
     # Add points
-    x_vec = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
-    y_vec = [0.0, 0.0774924206719, 0.154518792808, 0.230615870742, 0.305325997695, 0.378199858172, 0.4487991802, 0.516699371152, 0.581492071288, 0.642787609687, 0.700217347767, 0.753435896328, 0.802123192755, 0.84598642592, 0.884761797177, 0.91821610688, 0.946148156876, 0.968389960528, 0.984807753012, 0.995302795793, 0.999811970449, 0.998308158271, 0.990800403365, 0.977333858251, 0.957989512315, 0.932883704732, 0.902167424781, 0.866025403784, 0.824675004109, 0.778364911924, 0.727373641573, 0.672007860556, 0.612600545193, 0.549508978071, 0.483112599297, 0.413810724505, 0.342020143326, 0.268172612761, 0.192712260548, 0.116092914125, 0.0387753712568, -0.0387753712568, -0.116092914125, -0.192712260548, -0.268172612761, -0.342020143326, -0.413810724505, -0.483112599297, -0.549508978071, -0.612600545193, -0.672007860556, -0.727373641573, -0.778364911924, -0.824675004109, -0.866025403784, -0.902167424781, -0.932883704732, -0.957989512315, -0.977333858251, -0.990800403365, -0.998308158271, -0.999811970449, -0.995302795793, -0.984807753012, -0.968389960528, -0.946148156876, -0.91821610688, -0.884761797177, -0.84598642592, -0.802123192755, -0.753435896328, -0.700217347767, -0.642787609687, -0.581492071288, -0.516699371152, -0.4487991802, -0.378199858172, -0.305325997695, -0.230615870742, -0.154518792808, -0.0774924206719, 0.0]
-    z_vec = [1.0, 0.996992941168, 0.987989849477, 0.97304487058, 0.952247885338, 0.925723969269, 0.893632640323, 0.85616689953, 0.813552070263, 0.766044443119, 0.713929734558, 0.657521368569, 0.597158591703, 0.533204432802, 0.466043519703, 0.396079766039, 0.323733942058, 0.249441144058, 0.173648177667, 0.0968108707032, 0.0193913317718, -0.0581448289105, -0.13533129975, -0.211703872229, -0.286803232711, -0.360177724805, -0.431386065681, -0.5, -0.565606875487, -0.627812124672, -0.686241637869, -0.740544013109, -0.790392669519, -0.835487811413, -0.875558231302, -0.910362940966, -0.939692620786, -0.963370878616, -0.981255310627, -0.993238357742, -0.999247952504, -0.999247952504, -0.993238357742, -0.981255310627, -0.963370878616, -0.939692620786, -0.910362940966, -0.875558231302, -0.835487811413, -0.790392669519, -0.740544013109, -0.686241637869, -0.627812124672, -0.565606875487, -0.5, -0.431386065681, -0.360177724805, -0.286803232711, -0.211703872229, -0.13533129975, -0.0581448289105, 0.0193913317718, 0.0968108707032, 0.173648177667, 0.249441144058, 0.323733942058, 0.396079766039, 0.466043519703, 0.533204432802, 0.597158591703, 0.657521368569, 0.713929734558, 0.766044443119, 0.813552070263, 0.85616689953, 0.893632640323, 0.925723969269, 0.952247885338, 0.97304487058, 0.987989849477, 0.996992941168, 1.0]
-    tixi_handle.addFloatVector(base_path, 'x', x_vec, len(x_vec), '%.12f')
-    tixi_handle.addFloatVector(base_path, 'y', y_vec, len(y_vec), '%.12f')
-    tixi_handle.addFloatVector(base_path, 'z', z_vec, len(z_vec), '%.12f')
+    for axis, vec in zip(['x', 'y', 'z'], circle_profile_points(num_points)):
+        add_float_array(tixi_handle, base_path + '/' + axis, vec, '%.12f')
 
     return profile_id, tixi_handle
+
+
+@lru_cache(maxsize=None)
+def circle_profile_points(num_points=NUM_PROFILE_POINTS):
+    """Internal function.
+    Points of the circular fuselage profile, from the top and clockwise
+
+    The points are evenly spaced on the unit circle and the first point is
+    repeated at the end to close the profile. The arrays are cached for each
+    number of points, so they are read-only.
+
+    Parameters
+    ----------
+    num_points : int, default = 82
+        Number of points of the profile
+
+    Returns
+    -------
+    x_vec, y_vec, z_vec : ndarray
+        Coordinates of the profile points
+    """
+
+    theta = np.linspace(0.0, 2*np.pi, num_points)
+    x_vec = np.zeros(num_points)
+    y_vec = np.sin(theta)
+    z_vec = np.cos(theta)
+    # Exact closing point, sin(2*pi) would be written as -0.000000000000
+    y_vec[-1] = 0.0
+    z_vec[-1] = 1.0
+
+    for vec in (x_vec, y_vec, z_vec):
+        vec.setflags(write=False)
+    return x_vec, y_vec, z_vec
@@ -0,0 +1,199 @@
+"""Tests of the CPACS functions"""
+
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+import simplifiedgeometry as sg
+from ceasiompy.utils import cpacsfunctions as cpsf
+from ceasiompy.utils.cpacsfunctions import open_tixi, new_tixi, xml_tree
+
+FUSELAGE_XPATH = '/cpacs/vehicles/aircraft/model/fuselages/fuselage'
+
+DOCUMENT = """<?xml version="1.0" encoding="utf-8"?>
+<!-- before the root -->
+<?xml-stylesheet type="text/xsl" href="cpacs.xsl"?>
+<cpacs xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" \
+xmlns:ext="http://example.org/ext" xsi:noNamespaceSchemaLocation="cpacs.xsd">
+  <!-- header comment -->
+  <header><name>test</name><?tool keep me?></header>
+  <ext:data ext:unit="m"><ext:value>1.5</ext:value></ext:data>
+  <vehicles><length>2.0</length></vehicles>
+</cpacs>
+"""
+
+
+class StringTixi:
+    """TIXI stub holding its document as a string, like a TIXI handle"""
+
+    def __init__(self, document):
+        self.document = document
+
+    def exportDocumentAsString(self):
+        return self.document
+
+    def close(self):
+        self.document = None
+
+    def openString(self, document):
+        self.document = document
+
+
+def canonical(document):
+    if document.startswith('<?xml '):
+        document = document[document.index('?>')+2:]
+    return ET.canonicalize(document, with_comments=True, strip_text=True)
+
+
+def test_xml_tree_round_trip_keeps_the_document():
+    tixi = StringTixi(DOCUMENT)
+    with xml_tree(tixi) as root:
+        root.find('vehicles/length').text = '3.0'
+
+    assert 'ns0' not in tixi.document
+    assert '<ext:value>1.5</ext:value>' in tixi.document
+    assert '<?xml-stylesheet' in tixi.document
+    assert '<!-- before the root -->' in tixi.document
+    assert canonical(tixi.document) == canonical(
+        DOCUMENT.replace('<length>2.0</length>', '<length>3.0</length>'))
+
+
+def test_xml_tree_round_trip_without_lxml(monkeypatch):
+    monkeypatch.setattr(cpsf, 'etree', None)
+    tixi = StringTixi(DOCUMENT)
+    with xml_tree(tixi) as root:
+        root.find('vehicles/length').text = '3.0'
+
+    # The comments and processing instructions outside of the root element
+    # are lost with ElementTree
+    assert 'ns0' not in tixi.document
+    assert '<ext:value>1.5</ext:value>' in tixi.document
+    assert '<!-- header comment -->' in tixi.document
+    assert '<?tool keep me?>' in tixi.document
+    expected = DOCUMENT[DOCUMENT.index('<cpacs'):]
+    assert canonical(tixi.document) == canonical(
+        expected.replace('<length>2.0</length>', '<length>3.0</length>'))
+
+
+def scale_by_xpath(tixi_handle, scale):
+    """Section and positioning scaling before the bulk transformers"""
+    sections_xpath = FUSELAGE_XPATH + '/sections/'
+    num_sec = tixi_handle.getNamedChildrenCount(FUSELAGE_XPATH + '/sections',
+                                                'section')
+    for i in np.arange(num_sec):
+        scaling_xpath = sections_xpath +\
+            f'section[{i+1}]/transformation/scaling/'
+        translate_xpath = sections_xpath +\
+            f'section[{i+1}]/transformation/translation/z'
+        for xpath in [scaling_xpath + 'x', scaling_xpath + 'y',
+                      scaling_xpath + 'z', translate_xpath]:
+            value = tixi_handle.getDoubleElement(xpath)
+            tixi_handle.updateDoubleElement(xpath, value*scale, '%.8f')
+
+    positionings_xpath = FUSELAGE_XPATH + '/positionings'
+    num_pos = tixi_handle.getNamedChildrenCount(positionings_xpath,
+                                                'positioning')
+    for i in np.arange(num_pos):
+        length_xpath = positionings_xpath + f'/positioning[{i+1}]/length'
+        length = tixi_handle.getDoubleElement(length_xpath)
+        tixi_handle.updateDoubleElement(length_xpath, length*scale, '%.8f')
+
+
+@pytest.mark.parametrize('scale', [0.5, 1.0, 1/3, 7.25])
+@pytest.mark.parametrize('backend', ['lxml', 'string'])
+def test_transformers_same_as_xpath_updates(tmp_path, monkeypatch, scale,
+                                            backend):
+    monkeypatch.chdir(tmp_path)
+    sg.cpacs_generate('parity', 30.0, validation='skip', num_sections=8)
+    reference = open_tixi(str(tmp_path/'cpacs'/'parity.xml'), 'lxml')
+    document = reference.exportDocumentAsString()
+    sec_uids = sg.fuselage_sections_from_positionings(reference)[1]
+    scale_by_xpath(reference, scale)
+
+    if backend == 'lxml':
+        tixi_handle = open_tixi(str(tmp_path/'cpacs'/'parity.xml'), 'lxml')
+    else:
+        tixi_handle = StringTixi(document)
+    with xml_tree(tixi_handle):
+        sg.section_transformer(tixi_handle, scale, sec_uids)
+        sg.positioning_transformer(tixi_handle, scale)
+
+    result = new_tixi('lxml')
+    result.openString(tixi_handle.exportDocumentAsString())
+    assert (result.exportDocumentAsString()
+            == reference.exportDocumentAsString())
+
+
+def probe_add_uid(tixi, xpath, uid):
+    """uID assignment of add_uid before the uID registry"""
+    uid_new = uid
+    i = 0
+    while tixi.uIDCheckExists(uid_new):
+        i = i + 1
+        uid_new = uid + str(i)
+    tixi.uIDSetToXPath(xpath, uid_new)
+
+
+UID_DOCUMENT = """<cpacs><vehicles>
+  <wing uID="wing"><name>w</name><sections>
+    <section uID="sec1"><name>a</name></section>
+    <section uID="sec3"><name>b</name></section>
+  </sections></wing>
+  <target/>
+</vehicles></cpacs>"""
+
+
+def test_add_uid_same_as_probe_loop():
+    rng = np.random.default_rng(0)
+    tixis = [new_tixi('lxml'), new_tixi('lxml')]
+    for tixi in tixis:
+        tixi.openString(UID_DOCUMENT)
+        for i in range(40):
+            tixi.createElement('/cpacs/vehicles/target', 'e')
+
+    for step in range(200):
+        xpath = f'/cpacs/vehicles/target/e[{rng.integers(1, 41)}]'
+        if step > 100 and step % 7 == 0:
+            # Duplicated uID replaced, the original still uses it
+            xpath = f'/cpacs/vehicles/copy/sections/section[{rng.integers(1, 3)}]'
+        uid = str(rng.choice(['sec', 'sec1', 'sec11', 'wing', 'new', 'e']))
+        cpsf.add_uid(tixis[0], xpath, uid)
+        probe_add_uid(tixis[1], xpath, uid)
+        assert (tixis[0].exportDocumentAsString()
+                == tixis[1].exportDocumentAsString())
+
+        if step == 100:
+            # The copied uIDs are set without add_uid
+            for tixi in tixis:
+                tixi.createElement('/cpacs/vehicles', 'copy')
+                cpsf.copy_branch(tixi, '/cpacs/vehicles/wing',
+                                 '/cpacs/vehicles/copy')
+
+
+def test_add_uid_after_copy_branch():
+    tixi = new_tixi('lxml')
+    tixi.openString(UID_DOCUMENT)
+    cpsf.add_uid(tixi, '/cpacs/vehicles/target', 'target')
+
+    tixi.createElement('/cpacs/vehicles', 'copy')
+    cpsf.copy_branch(tixi, '/cpacs/vehicles/wing', '/cpacs/vehicles/copy')
+    assert tixi.getTextAttribute('/cpacs/vehicles/copy', 'uID') == 'wing'
+
+    tixi.createElement('/cpacs/vehicles', 'other')
+    cpsf.add_uid(tixi, '/cpacs/vehicles/other', 'wing')
+    assert tixi.getTextAttribute('/cpacs/vehicles/other', 'uID') == 'wing1'
+
+
+def test_add_uid_replacing_a_duplicated_uid():
+    tixis = [new_tixi('lxml'), new_tixi('lxml')]
+    for (tixi, add) in zip(tixis, [cpsf.add_uid, probe_add_uid]):
+        tixi.openString(UID_DOCUMENT)
+        tixi.createElement('/cpacs/vehicles', 'copy')
+        cpsf.copy_branch(tixi, '/cpacs/vehicles/wing', '/cpacs/vehicles/copy')
+        # 'sec1' is still used by the original section
+        add(tixi, '/cpacs/vehicles/copy/sections/section[1]', 'copy_sec1')
+        add(tixi, '/cpacs/vehicles/target', 'sec1')
+    assert tixis[0].getTextAttribute('/cpacs/vehicles/target', 'uID') == 'sec11'
+    assert (tixis[0].exportDocumentAsString()
+            == tixis[1].exportDocumentAsString())
@@ -0,0 +1,118 @@
+"""Tests of the conventional fuselage geometry analysis on a TIGL stub"""
+
+import math
+
+import numpy as np
+import pytest
+
+from ceasiompy.utils.InputClasses.Conventional.aircraftgeometryclass\
+    import AircraftGeometry
+from ceasiompy.utils.WB.ConvGeometry.Fuselage.fusegeom import fuse_geom_eval
+from ceasiompy.utils.WB.geometryfunctions import SYMMETRY_FACTORS
+
+# Fuselages (x start, segment lengths, section radii, y center, symmetry),
+# each section is a circle centered at z = 1.0
+FUSELAGES = [(0.0, [2, 3, 20, 5, 4], [0.01, 1.0, 2.0, 2.0, 1.5, 0.2], 0.0, 2),
+             (10.0, [1, 2, 1], [0.1, 0.5, 0.5, 0.1], 6.0, 3),
+             (3.0, [1, 1], [0.1, 0.3, 0.1], -2.0, 0)]
+Z_CENTER = 1.0
+
+
+class FuselageTigl:
+    """TIGL stub of fuselages made of circular sections along x"""
+
+    def __init__(self, fuselages):
+        self.fuselages = fuselages
+
+    def fuselageGetSymmetry(self, i):
+        return self.fuselages[i-1][4]
+
+    def fuselageGetSectionCount(self, i):
+        return len(self.fuselages[i-1][1]) + 1
+
+    def fuselageGetSegmentCount(self, i):
+        return len(self.fuselages[i-1][1])
+
+    def fuselageGetVolume(self, i):
+        return 10.0 * i
+
+    def fuselageGetSegmentVolume(self, i, k):
+        return float(k + i)
+
+    def fuselageGetStartSectionAndElementIndex(self, i, k):
+        return (k, 1)
+
+    def fuselageGetEndSectionAndElementIndex(self, i, k):
+        return (k+1, 1)
+
+    def configurationGetLength(self):
+        return 50.0
+
+    def _radius(self, i, k, eta):
+        radii = self.fuselages[i-1][2]
+        return radii[k-1]*(1-eta) + radii[k]*eta
+
+    def fuselageGetPoint(self, i, k, eta, zeta):
+        (x0, lengths, _, y_center, _) = self.fuselages[i-1]
+        x = x0 + sum(lengths[:k-1]) + lengths[k-1]*eta
+        radius = self._radius(i, k, eta)
+        angle = 2*math.pi*zeta
+        return (x, y_center + radius*math.sin(angle),
+                Z_CENTER + radius*math.cos(angle))
+
+    def fuselageGetCircumference(self, i, k, eta):
+        return 2*math.pi*self._radius(i, k, eta)
+
+
+class FuselageTixi:
+
+    def getNamedChildrenCount(self, xpath, name):
+        return len(FUSELAGES)
+
+
+class FuselageSession:
+
+    def __init__(self):
+        self.tixi = FuselageTixi()
+        self.tigl = FuselageTigl(FUSELAGES)
+
+
+def test_all_fuselages():
+    ag = fuse_geom_eval(AircraftGeometry(), 'stub.xml', FuselageSession())
+
+    assert ag.fus_nb == 3
+    assert ag.fuse_nb == 5
+    for (i, (_, lengths, radii, _, _)) in enumerate(FUSELAGES):
+        assert ag.fuse_length[i] == pytest.approx(sum(lengths))
+        assert ag.fuse_sec_width[:len(radii),i]\
+            == pytest.approx(2*np.array(radii), abs=1e-3)
+        assert ag.fuse_mean_widths[i]\
+            == pytest.approx(2*np.mean(radii), abs=1e-3)
+
+    # The scalar is the one of the main fuselage, as before
+    assert np.ndim(ag.fuse_mean_width) == 0
+    assert ag.fuse_mean_width == ag.fuse_mean_widths[0]
+
+
+def test_symmetric_fuselage_columns():
+    ag = fuse_geom_eval(AircraftGeometry(), 'stub.xml', FuselageSession())
+
+    col = 0
+    for (x0, lengths, _, y_center, sym) in FUSELAGES:
+        sec_x = x0 + np.concatenate(([0.0], np.cumsum(lengths)))
+        seg_x = (sec_x[:-1] + sec_x[1:]) / 2
+        seg_nb = len(lengths)
+        expected = np.column_stack((seg_x, np.full(seg_nb, y_center),
+                                    np.full(seg_nb, Z_CENTER)))
+        points = ag.fuse_center_seg_point
+        assert points[:seg_nb,col,:] == pytest.approx(expected)
+        assert not points[seg_nb:,col,:].any()
+        if sym:
+            col += 1
+            assert points[:seg_nb,col,:]\
+                == pytest.approx(expected * SYMMETRY_FACTORS[sym])
+            assert ag.fuse_center_sec_point[:seg_nb+1,col,:]\
+                == pytest.approx(ag.fuse_center_sec_point[:seg_nb+1,col-1,:]
+                                 * SYMMETRY_FACTORS[sym])
+        col += 1
+    assert col == ag.fuse_nb
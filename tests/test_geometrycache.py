@@ -0,0 +1,94 @@
+"""Tests of the on-disk cache of the geometry analysis results"""
+
+import os
+
+import pytest
+
+import simplifiedgeometry as sg
+from ceasiompy.utils.cpacsfunctions import open_tixi
+from ceasiompy.utils.WB.geometrycache import GeometryCache
+
+LENGTH_XPATH = ('/cpacs/vehicles/aircraft/model/fuselages/fuselage'
+                '/positionings/positioning[2]/length')
+
+
+class ExportedTixi:
+    """TIXI stub which only exports its document, like a TIXI handle"""
+
+    def __init__(self, tixi):
+        self.document = tixi.exportDocumentAsString()
+
+    def exportDocumentAsString(self):
+        return self.document
+
+
+@pytest.fixture
+def tixi(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sg.cpacs_generate('cache', 30.0, validation='skip')
+    return open_tixi(str(tmp_path/'cpacs'/'cache.xml'), 'lxml')
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return GeometryCache(str(tmp_path/'geometry_cache'), 1024**2)
+
+
+@pytest.mark.parametrize('backend', [lambda t: t, ExportedTixi])
+def test_key_depends_on_vehicles_only(cache, tixi, backend):
+    key = cache.key(backend(tixi), 'analysis', 1)
+    assert cache.key(backend(tixi), 'analysis', 1) == key
+    assert cache.key(backend(tixi), 'analysis', 2) != key
+
+    tixi.updateTextElement('/cpacs/header/name', 'Renamed aircraft')
+    assert cache.key(backend(tixi), 'analysis', 1) == key
+
+    tixi.updateDoubleElement(LENGTH_XPATH, 4.0, '%g')
+    assert cache.key(backend(tixi), 'analysis', 1) != key
+
+
+def test_key_leaves_the_document_unchanged(cache, tixi):
+    document = tixi.exportDocumentAsString()
+    cache.key(tixi, 'analysis')
+    assert tixi.exportDocumentAsString() == document
+
+
+def test_hit_and_miss(cache, tixi):
+    key = cache.key(tixi, 'analysis')
+    assert cache.get(key) is None
+
+    cache.put(key, {'fuse_length': 30.0})
+    assert cache.get(key) == {'fuse_length': 30.0}
+
+    tixi.updateDoubleElement(LENGTH_XPATH, 4.0, '%g')
+    assert cache.get(cache.key(tixi, 'analysis')) is None
+
+
+def test_unreadable_file_is_a_miss(cache):
+    cache.put('key', [1, 2, 3])
+    with open(os.path.join(cache.cache_dir, 'key.pkl'), 'wb') as f:
+        f.write(b'not a pickle')
+    assert cache.get('key') is None
+    assert not os.path.exists(os.path.join(cache.cache_dir, 'key.pkl'))
+
+
+def test_eviction_of_least_recently_used(cache):
+    result = bytes(300 * 1024)
+    for (index, key) in enumerate(['a', 'b', 'c']):
+        cache.put(key, result)
+        os.utime(os.path.join(cache.cache_dir, key + '.pkl'),
+                 (1000 + index, 1000 + index))
+
+    # 'a' read last, 'b' is then the least recently used
+    assert cache.get('a') == result
+    cache.put('d', result)
+
+    assert cache.get('b') is None
+    for key in ['a', 'c', 'd']:
+        assert cache.get(key) == result
+
+
+def test_clear(cache):
+    cache.put('a', 1)
+    cache.clear()
+    assert cache.get('a') is None
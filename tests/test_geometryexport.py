@@ -0,0 +1,27 @@
+"""Tests of the export of the geometry results"""
+
+import numpy as np
+import pytest
+
+from ceasiompy.utils.WB.geometryexport import append_npz, read_npz, write_npz
+
+
+def test_append_npz_different_columns(tmp_path):
+    path = str(tmp_path / 'geometry.npz')
+    append_npz(path, [{'name': 'a', 'x': 1.5}])
+    append_npz(path, [{'name': 'b', 'y': [1.0, 2.0]}])
+    append_npz(path, [{'name': 'c', 'y': [[3.0], [4.0]], 'z': 2}])
+
+    columns = read_npz(path)
+    assert list(columns['name']) == ['a', 'b', 'c']
+    assert columns['x'] == [1.5, None, None]
+    assert columns['y'][0] is None
+    np.testing.assert_array_equal(columns['y'][1], [1.0, 2.0])
+    np.testing.assert_array_equal(columns['y'][2], [[3.0], [4.0]])
+    assert columns['z'] == [None, None, 2]
+
+
+def test_write_npz_rejects_objects(tmp_path):
+    with pytest.raises(TypeError):
+        write_npz(str(tmp_path / 'geometry.npz'),
+                  [{'name': 'a', 'x': {'not': 'a number'}}])
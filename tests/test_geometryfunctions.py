@@ -0,0 +1,135 @@
+"""Tests of the geometry functions shared by the geometry analyses"""
+
+import numpy as np
+import pytest
+
+from ceasiompy.utils.WB.geometryfunctions import cabin_width_factor,\
+                                                section_half_widths
+
+
+def decrement_loop(sec_width, seg_length, mean_width, fuse_length, corr,
+                   eligible=None):
+    """Width factor search of the geometry analyses before cabin_width_factor
+    """
+    if eligible is None:
+        eligible = [True] * len(sec_width)
+    while True:
+        cabin_length = 0
+        for (w, l, e) in zip(sec_width, seg_length, eligible):
+            if w >= corr * mean_width and e:
+                cabin_length += l
+        if corr > 0.0 and cabin_length < 0.20 * fuse_length:
+            corr -= 0.05
+        else:
+            return corr
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_same_as_decrement_loop(seed):
+    rng = np.random.default_rng(seed)
+    seg_nb = int(rng.integers(1, 30))
+    sec_width = rng.uniform(0.0, 6.0, seg_nb)
+    # Lengths in quarters of a meter, their sums are exact in any order
+    seg_length = rng.integers(1, 40, seg_nb) / 4
+    if seed % 3 == 0:
+        # Ties between widths and between the cabin length and its target
+        sec_width = np.round(sec_width)
+    mean_width = float(np.mean(sec_width)) if seed % 5 else 2.0
+    fuse_length = float(np.sum(seg_length)) * rng.choice([0.5, 1.0, 5.0, 10.0])
+    eligible = rng.random(seg_nb) < 0.7 if seed % 2 else None
+    corr = float(rng.choice([1.25, 1.3]))
+
+    expected = decrement_loop(sec_width, seg_length, mean_width, fuse_length,
+                              corr, eligible)
+    result = cabin_width_factor(sec_width, seg_length, mean_width,
+                                fuse_length, corr, eligible)
+    assert result == expected
+
+
+def test_no_eligible_segment():
+    assert cabin_width_factor([1.0, 2.0], [1.0, 1.0], 1.5, 10.0, 1.25,
+                              [False, False]) \
+        == decrement_loop([1.0, 2.0], [1.0, 1.0], 1.5, 10.0, 1.25,
+                          [False, False])
+
+
+class ProfileTigl:
+    """TIGL stub with one section profile, piecewise linear in zeta"""
+
+    def __init__(self, zetas, ys, zs, center=(5.0, 0.3, -0.2)):
+        self.zetas = zetas
+        self.ys = ys
+        self.zs = zs
+        self.center = center
+        self.calls = 0
+
+    def fuselageGetPoint(self, fus_nb, seg_index, eta, zeta):
+        self.calls += 1
+        return (self.center[0],
+                self.center[1] + float(np.interp(zeta, self.zetas, self.ys)),
+                self.center[2] + float(np.interp(zeta, self.zetas, self.zs)))
+
+
+def ellipse_profile(a, b, phase, n=400):
+    theta = np.linspace(0.0, 2*np.pi, n + 1) + phase
+    return (np.linspace(0.0, 1.0, n + 1), a*np.cos(theta), b*np.sin(theta))
+
+
+def notch_profile():
+    # Box profile with, on the negative side, a notch crossing the center
+    # plane twice within one interval of the ZETA_SAMPLES samples
+    notch = 31.5/64
+    vertices = [(0.0, 0.0, -1.0), (0.125, 1.0, -1.0), (0.25, 1.0, 1.0),
+                (0.375, -0.2, 1.0), (0.45, -0.2, 0.03),
+                (notch - 0.006, -0.5, 0.03), (notch, -0.55, -0.03),
+                (notch + 0.006, -0.6, 0.03), (0.55, -0.8, 0.03),
+                (0.6, -1.0, 1.0), (0.75, -1.0, -1.0), (1.0, 0.0, -1.0)]
+    return tuple(np.array(v) for v in zip(*vertices))
+
+
+def zeta_scan(tigl, center, axis=1):
+    """Half widths search of the geometry analyses before section_half_widths
+    """
+    plane = 3 - axis
+    hw1 = 0
+    hw2 = 0
+    for zeta in np.arange(0.0, 1.0, 0.001):
+        point = tigl.fuselageGetPoint(1, 1, 1.0, zeta)
+        if abs(point[plane]-center[plane]) < 0.01:
+            if (point[axis] > center[axis] and hw1 == 0):
+                hw1 = abs(point[axis]-center[axis])
+            elif (point[axis] < center[axis] and hw2 == 0):
+                hw2 = abs(point[axis]-center[axis])
+                break
+    return hw1, hw2
+
+
+PROFILES = {'circle': ellipse_profile(2.0, 2.0, -np.pi/2),
+            'ellipse': ellipse_profile(1.5, 2.5, -np.pi/2),
+            'rotated start': ellipse_profile(1.8, 1.2, 0.3),
+            'notch': notch_profile()}
+
+
+@pytest.mark.parametrize('name', PROFILES)
+@pytest.mark.parametrize('axis', [1, 2])
+def test_half_widths_same_as_zeta_scan(name, axis):
+    # The scan accepts the points within 0.01 m of the center plane, the
+    # half widths agree within this band
+    tigl = ProfileTigl(*PROFILES[name])
+    (hw1, hw2, point1, point2) = section_half_widths(tigl, 1, 1, 1.0,
+                                                     tigl.center, axis)
+    assert (hw1, hw2) == pytest.approx(zeta_scan(tigl, tigl.center, axis),
+                                       abs=0.01)
+    if hw1:
+        assert point1[axis] - tigl.center[axis] == pytest.approx(hw1)
+    if hw2:
+        assert point2[axis] - tigl.center[axis] == pytest.approx(-hw2)
+
+
+def test_half_widths_double_crossing():
+    tigl = ProfileTigl(*notch_profile())
+    (hw1, hw2, _, _) = section_half_widths(tigl, 1, 1, 1.0, tigl.center)
+    assert hw1 == pytest.approx(1.0)
+    # First crossing of the notch, not the side of the box at 1.0 m
+    assert hw2 == pytest.approx(0.525, abs=1e-3)
+    assert tigl.calls < 200
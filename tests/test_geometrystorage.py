@@ -0,0 +1,95 @@
+"""Tests of the compact storage of the geometry classes"""
+
+import numpy as np
+import pytest
+
+from ceasiompy.utils.InputClasses.geometrystorageclass import RaggedArray
+from ceasiompy.utils.InputClasses.Conventional.aircraftgeometryclass\
+    import AircraftGeometry
+from ceasiompy.utils.InputClasses.Unconventional.aircraftgeometryclass\
+    import AircraftWingGeometry, AircraftFuseGeometry
+from ceasiompy.utils.WB.ConvGeometry.Fuselage.fusegeom import fuse_geom_eval
+
+from test_fusegeom import FuselageSession
+
+
+def assert_same_geometry(geometry, loaded):
+    assert type(loaded) is type(geometry)
+    for name in geometry._slot_names():
+        expected = getattr(geometry, name)
+        value = getattr(loaded, name)
+        assert np.shape(value) == np.shape(expected), name
+        np.testing.assert_array_equal(value, expected, err_msg=name)
+
+
+def round_trip(geometry, tmp_path, compressed=False):
+    path = str(tmp_path/'geometry.npz')
+    geometry.compact().to_npz(path, compressed)
+    return type(geometry).from_npz(path)
+
+
+@pytest.mark.parametrize('compressed', [False, True])
+def test_conventional_round_trip(tmp_path, compressed):
+    ag = fuse_geom_eval(AircraftGeometry(), 'stub.xml', FuselageSession())
+    ag.wing_nb = 2
+    ag.wing_seg_nb = [3, 1]
+    ag.wing_seg_vol = np.array([[1.0, 4.0], [2.0, 0.0], [3.0, 0.0]])
+
+    loaded = round_trip(ag, tmp_path, compressed)
+
+    assert_same_geometry(ag, loaded)
+    assert loaded.fuse_mean_width == ag.fuse_mean_widths[0]
+
+
+def test_unconventional_round_trip(tmp_path):
+    afg = AircraftFuseGeometry(2)
+    afg.fuse_sec_nb = [4, 2]
+    afg.fuse_seg_nb = [3, 1]
+    afg.fuse_length = [20.0, 5.0]
+    afg.fuse_mean_width = [2.5, 1.0]
+    afg.fuse_sec_width = np.array([[1.0, 0.5], [3.0, 1.5], [3.0, 0.0],
+                                   [1.0, 0.0]])
+    afg.fuse_sec_height = afg.fuse_sec_width * 1.1
+    afg.fuse_seg_length = np.array([[5.0, 5.0], [10.0, 0.0], [5.0, 0.0]])
+    afg.fuse_center_seg_point = np.arange(18.0).reshape(3, 2, 3)
+
+    awg = AircraftWingGeometry()
+    awg.wing_nb = 1
+    awg.wing_seg_nb = [2]
+    awg.wing_span = [30.0]
+    awg.wing_seg_vol = np.array([[4.0], [2.0]])
+    awg.cabin_span = 8.5
+
+    assert_same_geometry(afg, round_trip(afg, tmp_path))
+    assert_same_geometry(awg, round_trip(awg, tmp_path))
+
+
+def test_round_trip_without_parts(tmp_path):
+    awg = AircraftWingGeometry()
+    awg.wing_seg_vol = np.zeros((0, 0))
+
+    loaded = round_trip(awg, tmp_path)
+
+    assert_same_geometry(awg, loaded)
+
+
+def test_ragged_array_without_parts():
+    for ragged in [RaggedArray.from_padded(np.zeros((0, 0, 3)), []),
+                   RaggedArray.from_list([])]:
+        assert len(ragged) == 0
+        assert list(ragged) == []
+        assert ragged.offsets.tolist() == [0]
+    assert RaggedArray.from_padded(np.zeros((0, 0, 3)), []).to_padded().shape\
+        == (0, 0, 3)
+
+
+def test_ragged_array_index():
+    ragged = RaggedArray.from_list([[1.0, 2.0], [], [3.0]])
+
+    assert ragged[0].tolist() == [1.0, 2.0]
+    assert ragged[1].tolist() == []
+    assert ragged[-1].tolist() == [3.0]
+    assert ragged.counts.tolist() == [2, 0, 1]
+    for i in [3, -4]:
+        with pytest.raises(IndexError):
+            ragged[i]
@@ -0,0 +1,153 @@
+"""Tests of the profiling of the stages and of the TIXI/TIGL calls"""
+
+import json
+import pickle
+
+import pytest
+
+import simplifiedgeometry as sg
+from ceasiompy.utils import profiling
+from ceasiompy.utils.cpacsfunctions import open_tixi, xml_tree
+from ceasiompy.utils.xmlbackend import LxmlTixi
+
+
+@pytest.fixture(autouse=True)
+def no_profiler(monkeypatch):
+    # The tests do not depend on CEASIOMPY_PROFILE
+    monkeypatch.setattr(profiling, '_profiler', None)
+
+
+class Handle:
+    """Handle stub with a method and an attribute, like a TIXI handle"""
+
+    version = '3.0'
+
+    def __init__(self, value):
+        self.value = value
+
+    def getDouble(self, xpath):
+        return self.value
+
+
+@profiling.profiled('outer')
+def outer(handle):
+    handle.getDouble('/a')
+    with profiling.stage('inner'):
+        handle.getDouble('/b')
+        handle.getDouble('/c')
+    inner_function(handle)
+
+
+@profiling.profiled()
+def inner_function(handle):
+    handle.getDouble('/d')
+
+
+def run(n=2):
+    with profiling.profiling() as profiler:
+        handle = profiling.profile_handle(Handle(1.0), 'tixi')
+        handle.getDouble('/unstaged')
+        for _ in range(n):
+            outer(handle)
+    return profiler
+
+
+def test_not_profiling():
+    handle = Handle(1.0)
+    assert profiling.get_profiler() is None
+    assert profiling.profile_handle(handle, 'tixi') is handle
+    with profiling.stage('stage') as event:
+        assert event is None
+    assert outer(handle) is None
+
+
+def test_report():
+    report = run(2).report()
+
+    assert set(report) == {'wall_time', 'stages', 'calls', 'events'}
+    stages = report['stages']
+    assert set(stages) == {'outer', 'inner',
+                           'test_profiling.inner_function'}
+    assert all(stage['count'] == 2 for stage in stages.values())
+
+    assert stages['outer']['calls'] == {'tixi.getDouble': 2}
+    assert stages['outer']['inclusive_calls'] == {'tixi.getDouble': 8}
+    assert stages['inner']['calls'] == {'tixi.getDouble': 4}
+    assert stages['inner']['inclusive_calls'] == {'tixi.getDouble': 4}
+    # The unstaged call is in the total
+    assert report['calls'] == {'tixi.getDouble': 9}
+
+    for stage in stages.values():
+        assert 0 <= stage['self_time'] <= stage['total_time']
+        assert stage['max_time'] <= stage['total_time']
+    assert stages['outer']['total_time'] <= report['wall_time']
+    assert stages['outer']['self_time'] < stages['outer']['total_time']
+
+    events = report['events']
+    assert [event['name'] for event in events] == \
+        ['outer', 'inner', 'test_profiling.inner_function']*2
+    assert [event['depth'] for event in events] == [0, 1, 1]*2
+    assert events == sorted(events, key=lambda event: event['start'])
+
+
+def test_chrome_trace(tmp_path):
+    profiler = run(1)
+    path = tmp_path/'trace.json'
+    trace = profiler.chrome_trace(str(path))
+
+    with open(str(path)) as f:
+        assert json.load(f) == trace
+    assert trace['displayTimeUnit'] == 'ms'
+    events = trace['traceEvents']
+    assert [event['name'] for event in events] == \
+        ['outer', 'inner', 'test_profiling.inner_function']
+    assert all(event['ph'] == 'X' for event in events)
+    assert events[1]['args'] == {'tixi.getDouble': 2}
+    (outer_event, inner_event) = events[:2]
+    assert outer_event['ts'] <= inner_event['ts']
+    assert inner_event['ts'] + inner_event['dur'] <= \
+        outer_event['ts'] + outer_event['dur']
+
+
+def test_profiling_restores_previous_profiler():
+    with profiling.profiling() as profiler:
+        with profiling.profiling() as nested:
+            assert profiling.get_profiler() is nested
+        assert profiling.get_profiler() is profiler
+    assert profiling.get_profiler() is None
+    assert profiler.end is not None
+
+
+def test_counting_proxy():
+    handle = Handle(2.0)
+    proxy = profiling.CountingProxy(handle, 'tixi')
+
+    assert not isinstance(proxy, Handle)
+    assert profiling.unwrap_handle(proxy) is handle
+    assert profiling.unwrap_handle(handle) is handle
+    assert proxy.version == '3.0'
+    assert proxy.getDouble('/a') == 2.0
+    assert repr(proxy) == '<CountingProxy tixi of {!r}>'.format(handle)
+
+    copy = pickle.loads(pickle.dumps(proxy))
+    assert isinstance(copy, profiling.CountingProxy)
+    assert profiling.unwrap_handle(copy).value == 2.0
+    assert copy.getDouble('/a') == 2.0
+
+
+def test_profiled_lxml_handle(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sg.cpacs_generate('profiled', 30.0, validation='skip')
+
+    with profiling.profiling() as profiler:
+        tixi = open_tixi(str(tmp_path/'cpacs'/'profiled.xml'), 'lxml')
+        assert isinstance(profiling.unwrap_handle(tixi), LxmlTixi)
+        with xml_tree(tixi) as root:
+            # The tree of the lxml backend is edited in place
+            assert root is profiling.unwrap_handle(tixi).root
+        with profiling.stage('read'):
+            tixi.getTextElement('/cpacs/header/name')
+
+    assert profiler.report()['stages']['read']['calls'] == \
+        {'tixi.getTextElement': 1}
+
@@ -0,0 +1,77 @@
+"""Tests of the generation of CPACS fuselages"""
+
+import pytest
+
+import simplifiedgeometry as sg
+from ceasiompy.utils.cpacsfunctions import open_tixi
+
+
+def generated_length(path):
+    tixi_handle = open_tixi(str(path), 'lxml')
+    fuse_length, num_sec = sg.fuselage_length_from_positionings(tixi_handle)
+    return fuse_length, num_sec
+
+
+@pytest.mark.parametrize('num_sections', [4, 6, 50])
+def test_generated_length(tmp_path, monkeypatch, num_sections):
+    monkeypatch.chdir(tmp_path)
+    tot_len = 30.0
+
+    sg.cpacs_generate('dom', tot_len, validation='skip',
+                      num_sections=num_sections)
+    sg.cpacs_generate_stream('stream', tot_len, num_sections=num_sections)
+    template = sg.FuselageTemplate(num_sections=num_sections, validate=False)
+    template.generate('template', tot_len)
+
+    for name in ['dom', 'stream', 'template']:
+        fuse_length, num_sec = generated_length(tmp_path/'cpacs'/f'{name}.xml')
+        assert fuse_length == pytest.approx(tot_len)
+        assert num_sec == num_sections
+
+
+def test_positioning_lengths_sum():
+    for num_sections in range(4, 20):
+        lengths = [sg.positioning_length(i, num_sections, 12.5, 0.2, 0.15)
+                   for i in range(1, num_sections+1)]
+        assert sum(lengths) == pytest.approx(12.5)
+
+
+def test_too_few_sections():
+    with pytest.raises(ValueError):
+        sg.check_resolution(3, 82)
+
+
+def test_transformer_batch_matches_transformer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sg.cpacs_generate('source', 30.0, validation='skip')
+    source = str(tmp_path/'cpacs'/'source.xml')
+    geometry_dicts = [{'fuse_length': 20.0}, {'fuse_length': 42.5},
+                      {'fuse_length': 30.0, 'index': 'ignored'}]
+
+    output_files = sg.transformer_batch(source, geometry_dicts,
+                                        str(tmp_path/'batch_{index}.xml'))
+
+    assert output_files == [str(tmp_path/f'batch_{i}.xml') for i in range(3)]
+    for index, geometry_dict in enumerate(geometry_dicts):
+        single = str(tmp_path/f'single_{index}.xml')
+        sg.transformer(source, single, geometry_dict)
+        with open(single) as f_single, open(output_files[index]) as f_batch:
+            assert f_batch.read() == f_single.read()
+        fuse_length, _ = generated_length(output_files[index])
+        assert fuse_length == pytest.approx(geometry_dict['fuse_length'])
+
+
+def test_default_generated_positionings(tmp_path, monkeypatch):
+    # The main body was shared by num_sections-2 positionings instead of
+    # num_sections-3 up to the fix of positioning_length: the default
+    # fuselage of 30 m had the lengths 0, 3, 6, 6, 6, 3 (24 m)
+    monkeypatch.chdir(tmp_path)
+    sg.cpacs_generate('default', 30.0, validation='skip')
+
+    tixi_handle = open_tixi(str(tmp_path/'cpacs'/'default.xml'), 'lxml')
+    xpath = ('/cpacs/vehicles/aircraft/model/fuselages/fuselage/positionings'
+             '/positioning[{}]/length')
+    lengths = [tixi_handle.getDoubleElement(xpath.format(i))
+               for i in range(1, sg.NUM_SECTIONS+1)]
+    assert sg.NUM_SECTIONS == 6
+    assert lengths == pytest.approx([0.0, 3.0, 8.0, 8.0, 8.0, 3.0])
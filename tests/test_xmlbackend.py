@@ -0,0 +1,111 @@
+"""Tests of the lxml XML backend against the behaviour of TIXI"""
+
+import pytest
+
+from ceasiompy.utils.cpacsfunctions import new_tixi
+from ceasiompy.utils.xmlbackend import parse_float_vector,\
+                                       format_float_vector
+
+DOCUMENT = """<?xml version="1.0" encoding="utf-8"?>
+<!-- CPACS test document -->
+<cpacs>
+  <header><name>test</name></header>
+  <vehicles>
+    <section uID="s1"><x>1.0</x></section>
+    <section uID="s2"><x>2.0</x></section>
+    <section uID="s3"><x>3.0</x></section>
+  </vehicles>
+</cpacs>
+"""
+
+
+@pytest.fixture(params=['lxml', 'tixi'])
+def tixi(request):
+    if request.param == 'tixi':
+        pytest.importorskip('tixi3')
+    tixi_handle = new_tixi(request.param)
+    tixi_handle.openString(DOCUMENT)
+    return tixi_handle
+
+
+def test_xpath_indexing(tixi):
+    assert tixi.getNamedChildrenCount('/cpacs/vehicles', 'section') == 3
+    assert tixi.getDoubleElement('/cpacs/vehicles/section[2]/x') == 2.0
+    assert tixi.getTextAttribute('/cpacs/vehicles/section[3]', 'uID') == 's3'
+    assert tixi.xPathEvaluateNodeNumber('/cpacs/vehicles/section') == 3
+    assert tixi.checkElement('/cpacs/vehicles/section[3]')
+    assert not tixi.checkElement('/cpacs/vehicles/section[4]')
+    assert tixi.uIDGetXPath('s2') == '/cpacs/vehicles/section[2]'
+
+
+def test_path_must_match_one_element(tixi):
+    with pytest.raises(Exception):
+        tixi.getDoubleElement('/cpacs/vehicles/section/x')
+    with pytest.raises(Exception):
+        tixi.getDoubleElement('/cpacs/vehicles/section[4]/x')
+
+
+def test_element_positions(tixi):
+    tixi.addTextElement('/cpacs/vehicles', 'last', 'text')
+    tixi.createElementAtIndex('/cpacs/vehicles', 'first', 1)
+    tixi.createElementAtIndex('/cpacs/vehicles', 'third', 3)
+    tixi.createElement('/cpacs/vehicles/section[1]', 'y')
+
+    names = [tixi.getChildNodeName('/cpacs/vehicles', i+1)
+             for i in range(tixi.getNumberOfChilds('/cpacs/vehicles'))]
+    assert names == ['first', 'section', 'third', 'section', 'section',
+                     'last']
+    assert tixi.getTextElement('/cpacs/vehicles/last') == 'text'
+    assert tixi.getChildNodeName('/cpacs/vehicles/section[1]', 2) == 'y'
+
+    tixi.removeElement('/cpacs/vehicles/third')
+    assert not tixi.checkElement('/cpacs/vehicles/third')
+
+
+def test_number_formats(tixi):
+    tixi.addDoubleElement('/cpacs/header', 'a', 1.5, '%.3f')
+    tixi.addDoubleElement('/cpacs/header', 'b', 0.1, None)
+    tixi.addIntegerElement('/cpacs/header', 'c', 7, '%d')
+    tixi.updateDoubleElement('/cpacs/vehicles/section[1]/x', 2/3, '%.8f')
+
+    assert tixi.getTextElement('/cpacs/header/a') == '1.500'
+    assert tixi.getTextElement('/cpacs/header/b') == '0.1'
+    assert tixi.getIntegerElement('/cpacs/header/c') == 7
+    assert tixi.getTextElement('/cpacs/vehicles/section[1]/x') == '0.66666667'
+
+
+def test_float_vectors(tixi):
+    tixi.addFloatVector('/cpacs/header', 'v', [1.0, 2.5, -3.0], 3, '%g')
+
+    assert tixi.getTextElement('/cpacs/header/v') == '1;2.5;-3'
+    assert tixi.getTextAttribute('/cpacs/header/v', 'mapType') == 'vector'
+    assert tixi.getVectorSize('/cpacs/header/v') == 3
+    assert tixi.getFloatVector('/cpacs/header/v', 2) == (1.0, 2.5)
+
+    tixi.updateFloatVector('/cpacs/header/v', [0.25, 0.5], 2, '%.2f')
+    assert tixi.getTextElement('/cpacs/header/v') == '0.25;0.50'
+
+
+def test_declare_namespace(tixi):
+    uri = 'http://www.w3.org/2001/XMLSchema-instance'
+    tixi.declareNamespace('/cpacs', uri, 'xsi')
+    tixi.addTextAttribute('/cpacs', 'xsi:noNamespaceSchemaLocation',
+                          'cpacs.xsd')
+    tixi.declareNamespace('/cpacs/header', 'http://example.org/ext', 'ext')
+
+    document = tixi.exportDocumentAsString()
+    assert 'xmlns:xsi="' + uri + '"' in document
+    assert 'xsi:noNamespaceSchemaLocation="cpacs.xsd"' in document
+    assert 'xmlns:ext="http://example.org/ext"' in document
+    assert '<!-- CPACS test document -->' in document
+    assert tixi.getTextElement('/cpacs/header/name') == 'test'
+    assert tixi.getDoubleElement('/cpacs/vehicles/section[2]/x') == 2.0
+
+
+def test_float_vector_text():
+    assert format_float_vector([1.0, 2.5], '%.1f') == '1.0;2.5'
+    assert parse_float_vector('1;2.5;3;').tolist() == [1.0, 2.5, 3.0]
+    with pytest.raises(ValueError):
+        parse_float_vector('1;a;3')
+    with pytest.raises(ValueError):
+        parse_float_vector(' ')